@@ -1,49 +1,27 @@
 #!/usr/bin/env python3
 """
 Script para criar produtos e preços Stripe automaticamente
+
+Usa a API do Stripe em processo (ver stripe_catalog.py); a chave de teste
+vem de STRIPE_TEST_API_KEY (ambiente ou .env.local) e tem de ser sk_test_...
+(STRIPE_API_KEY é a chave live, usada por create-stripe-live-products.py).
+
+Cria sempre produtos novos; para reconciliar o catálogo sem duplicados:
+    python3 stripe_catalog.py sync --catalog test
 """
 
-import subprocess
-import json
-
-# Pacotes de créditos DUA Premium
-PACKS = [
-    {
-        "name": "DUA Premium - Pack Basic",
-        "description": "350 créditos para IA",
-        "credits": 350,
-        "pack_id": "basic",
-        "price_eur": 10.00
-    },
-    {
-        "name": "DUA Premium - Pack Standard",
-        "description": "550 créditos para IA (+10% bônus)",
-        "credits": 550,
-        "pack_id": "standard",
-        "price_eur": 15.00
-    },
-    {
-        "name": "DUA Premium - Pack Plus",
-        "description": "1150 créditos para IA (+15% bônus)",
-        "credits": 1150,
-        "pack_id": "plus",
-        "price_eur": 30.00
-    },
-    {
-        "name": "DUA Premium - Pack Pro",
-        "description": "2400 créditos para IA (+20% bônus)",
-        "credits": 2400,
-        "pack_id": "pro",
-        "price_eur": 60.00
-    },
-    {
-        "name": "DUA Premium - Pack Premium",
-        "description": "6250 créditos para IA (+25% bônus)",
-        "credits": 6250,
-        "pack_id": "premium",
-        "price_eur": 150.00
-    }
-]
+import itertools
+
+import sys
+
+from stripe_catalog import PACKS, StripeCatalog, check_key_mode, load_api_key
+
+# Só em modo de teste: estes preços não são os do catálogo live
+test_key = load_api_key(names=("STRIPE_TEST_API_KEY",))
+try:
+    check_key_mode(test_key, "test")
+except ValueError as error:
+    sys.exit(f"❌ {error}")
 
 print("💳 Criando produtos Stripe para DUA Premium...\n")
 
@@ -57,50 +35,24 @@ CREATED_PRODUCTS = {
     }
 }
 
-for i, pack in enumerate(PACKS, start=2):
-    print(f"[{i}/6] Criando {pack['name']}...")
-    
-    # Criar produto
-    product_cmd = [
-        "stripe", "products", "create",
-        "--name", pack["name"],
-        "--description", pack["description"],
-        "-d", f"metadata[credits]={pack['credits']}",
-        "-d", f"metadata[pack_id]={pack['pack_id']}"
-    ]
-    
-    try:
-        result = subprocess.run(product_cmd, capture_output=True, text=True, check=True)
-        product_data = json.loads(result.stdout)
-        product_id = product_data["id"]
-        print(f"  ✓ Produto criado: {product_id}")
-        
-        # Criar preço
-        price_cents = int(pack["price_eur"] * 100)
-        price_cmd = [
-            "stripe", "prices", "create",
-            "--product", product_id,
-            "--unit-amount", str(price_cents),
-            "--currency", "eur",
-            "-d", f"metadata[credits]={pack['credits']}",
-            "-d", f"metadata[pack_id]={pack['pack_id']}"
-        ]
-        
-        result = subprocess.run(price_cmd, capture_output=True, text=True, check=True)
-        price_data = json.loads(result.stdout)
-        price_id = price_data["id"]
-        print(f"  ✓ Preço criado: {price_id} (€{pack['price_eur']:.2f})\n")
-        
-        CREATED_PRODUCTS[pack["pack_id"]] = {
-            "product_id": product_id,
-            "price_id": price_id,
-            "credits": pack["credits"],
-            "price_eur": pack["price_eur"]
-        }
-        
-    except subprocess.CalledProcessError as e:
-        print(f"  ❌ Erro: {e.stderr}\n")
-        continue
+progress = itertools.count(2)
+
+
+def report(pack, data, error):
+    print(f"[{next(progress)}/6] {pack.name}")
+    if error is not None:
+        print(f"  ❌ Erro: {error}\n")
+        return
+    print(f"  ✓ Produto criado: {data['product_id']}")
+    print(f"  ✓ Preço criado: {data['price_id']} (€{pack.price_eur:.2f})\n")
+
+
+# Produtos e preços criados em paralelo, numa única sessão HTTP
+with StripeCatalog(test_key) as catalog:
+    created, errors = catalog.create_all(PACKS, on_done=report)
+
+for pack_id, data in created.items():
+    CREATED_PRODUCTS[pack_id] = {key: data[key] for key in ("product_id", "price_id", "credits", "price_eur")}
 
 # Gerar arquivo .env
 print("\n📝 Gerando arquivo stripe-products.env...")
@@ -0,0 +1,201 @@
+"""
+Servidor Gemini API falso (generateContent) para testes locais.
+
+Responde a `POST /{versão}/models/{modelo}:generateContent` no formato da
+Gemini API, com uma imagem PNG gerada localmente em `inlineData` (e uma
+parte de texto, quando `responseModalities` a inclui), sem gastar créditos:
+
+- o tamanho da imagem segue `imageConfig.aspectRatio` (1:1 por omissão)
+- a cor da imagem depende só do prompt: o mesmo pedido dá os mesmos bytes
+- `latency` / `error_rate` / `error_status` simulam atrasos e erros (429)
+- `requests` e `input_bytes` contam os pedidos e os bytes das imagens
+  de entrada recebidas
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    python fake_gemini_server.py --port 8090 --latency 0.5
+
+    async with FakeGeminiServer() as server:
+        client = genai.Client(api_key="test", http_options=types.HttpOptions(base_url=server.base_url))
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import random
+import struct
+import zlib
+from aiohttp import web
+from typing import Any, Dict, List, Optional, Tuple
+
+# aspectRatio -> (largura, altura), como na documentação do Gemini 2.5 Flash Image
+ASPECT_SIZES: Dict[str, Tuple[int, int]] = {
+    "1:1": (1024, 1024),
+    "2:3": (832, 1248),
+    "3:2": (1248, 832),
+    "3:4": (864, 1184),
+    "4:3": (1184, 864),
+    "4:5": (896, 1152),
+    "5:4": (1152, 896),
+    "9:16": (768, 1344),
+    "16:9": (1344, 768),
+    "21:9": (1536, 672),
+}
+
+ERROR_STATUSES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def solid_png(width: int, height: int, rgb: Tuple[int, int, int]) -> bytes:
+    """PNG RGB de uma só cor, construído sem PIL."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(rgb) * width
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(row * height, 6)),
+        chunk(b"IEND", b""),
+    ])
+
+
+class FakeGeminiServer:
+    """Servidor aiohttp que imita o generateContent da Gemini API.
+
+    Args:
+      host: interface onde o servidor escuta
+      port: porta local (0 = escolher uma porta livre)
+      latency: atraso de cada resposta, em segundos
+      error_rate: fração de pedidos que falham com `error_status`
+      error_status: código HTTP devolvido nas falhas simuladas
+      seed: semente do gerador aleatório (resultados reprodutíveis)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self.input_bytes = 0
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application(client_max_size=64 * 1024 ** 2)
+        self.app.router.add_post("/{version}/models/{model}:generateContent", self._generate_content)
+
+    async def __aenter__(self) -> "FakeGeminiServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Inicia o servidor HTTP."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        """URL base a passar em `types.HttpOptions(base_url=...)`."""
+        return f"http://{self.host}:{self.port}"
+
+    def _error(self, status: int, message: str) -> web.Response:
+        body = {"error": {"code": status, "message": message, "status": ERROR_STATUSES.get(status, "UNKNOWN")}}
+        return web.json_response(body, status=status)
+
+    async def _generate_content(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if not request.headers.get("x-goog-api-key") and "key" not in request.query:
+            return self._error(403, "Method doesn't allow unregistered callers")
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return self._error(self.error_status, "Simulated error")
+
+        payload = await request.json()
+        prompt = ""
+        for content in payload.get("contents") or []:
+            for part in content.get("parts") or []:
+                if "text" in part:
+                    prompt += part["text"]
+                inline = part.get("inlineData") or part.get("inline_data")
+                if inline:
+                    self.input_bytes += len(base64.b64decode(inline.get("data", "")))
+
+        config = payload.get("generationConfig") or {}
+        modalities = [m.upper() for m in config.get("responseModalities") or ["TEXT", "IMAGE"]]
+        aspect_ratio = (config.get("imageConfig") or {}).get("aspectRatio") or "1:1"
+        if aspect_ratio not in ASPECT_SIZES:
+            return self._error(400, f"Unsupported aspect ratio: {aspect_ratio}")
+
+        parts: List[Dict[str, Any]] = []
+        if "TEXT" in modalities:
+            parts.append({"text": f"Here is your image: {prompt[:60]}"})
+        if "IMAGE" in modalities:
+            rgb = tuple(hashlib.sha256(prompt.encode("utf-8")).digest()[:3])
+            image = solid_png(*ASPECT_SIZES[aspect_ratio], rgb)
+            parts.append({"inlineData": {"mimeType": "image/png", "data": base64.b64encode(image).decode("ascii")}})
+
+        return web.json_response({
+            "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": len(prompt.split()), "candidatesTokenCount": 1290},
+            "modelVersion": request.match_info["model"],
+        })
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FakeGeminiServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    await server.start()
+    print(f"Fake Gemini API listening on {server.base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor Gemini API falso para testes locais")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Servidor Suno API falso para testes locais e benchmarks.
+
+Implementa todos os caminhos usados em `suno_api_examples.py` (geração,
+record-info, letras, WAV, stems, vídeo, capa, créditos e uploads) com
+respostas no formato da Suno, sem gastar créditos reais. O comportamento é
+configurável:
+
+- `latency` / `jitter`: atraso de cada resposta (segundos)
+- `error_rate`: fração de pedidos que falham com `error_status` (ex.: 503)
+- `completion_delay`: segundos até uma tarefa passar a SUCCESS; as tarefas de
+  geração passam por TEXT_SUCCESS e FIRST_SUCCESS pelo caminho
+- quando o pedido inclui `callBackUrl`, o servidor faz POST do callback de
+  conclusão para esse URL, como a Suno
+
+Os uploads são consumidos em streaming (o corpo nunca fica todo em memória).
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    python fake_suno_server.py --port 8080 --latency 0.05 --error-rate 0.01
+
+    async with FakeSunoServer(completion_delay=1.0) as server:
+        client = AsyncSunoClient(api_key="test", base_url=server.base_url)
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from aiohttp import ClientSession, ClientTimeout, web
+from typing import Any, Dict, Optional
+
+# Caminho de geração -> endpoint (tipo de tarefa) criado
+TASK_PATHS: Dict[str, str] = {
+    "/generate": "generate",
+    "/generate/extend": "generate",
+    "/generate/upload-cover": "generate",
+    "/generate/upload-extend": "generate",
+    "/generate/add-instrumental": "generate",
+    "/generate/add-vocals": "generate",
+    "/suno/cover/generate": "cover",
+    "/lyrics": "lyrics",
+    "/wav/generate": "wav",
+    "/vocal-removal/generate": "vocal-removal",
+    "/mp4/generate": "mp4",
+}
+
+# Caminho record-info -> endpoint consultado
+RECORD_INFO_PATHS: Dict[str, str] = {
+    "/generate/record-info": "generate",
+    "/suno/cover/record-info": "cover",
+    "/lyrics/record-info": "lyrics",
+    "/wav/record-info": "wav",
+    "/vocal-removal/record-info": "vocal-removal",
+    "/mp4/record-info": "mp4",
+}
+
+UPLOAD_PATHS = ("/api/file-base64-upload", "/api/file-stream-upload", "/api/file-url-upload")
+
+API_PREFIX = "/api/v1"
+
+
+class _FakeTask:
+    def __init__(self, endpoint: str, payload: Dict[str, Any], completion_delay: float):
+        self.task_id = uuid.uuid4().hex
+        self.endpoint = endpoint
+        self.payload = payload
+        self.created = time.monotonic()
+        self.completion_delay = completion_delay
+
+    def progress(self) -> float:
+        if self.completion_delay <= 0:
+            return 1.0
+        return (time.monotonic() - self.created) / self.completion_delay
+
+    def data(self) -> Dict[str, Any]:
+        """`data` de record-info no estado atual da tarefa."""
+        progress = self.progress()
+        data: Dict[str, Any] = {"taskId": self.task_id, "param": self.payload}
+        if self.endpoint in ("generate", "lyrics"):
+            if progress >= 1:
+                data["status"] = "SUCCESS"
+            elif self.endpoint == "generate" and progress >= 2 / 3:
+                data["status"] = "FIRST_SUCCESS"
+            elif self.endpoint == "generate" and progress >= 1 / 3:
+                data["status"] = "TEXT_SUCCESS"
+            else:
+                data["status"] = "PENDING"
+        elif self.endpoint == "cover":
+            data["successFlag"] = 1 if progress >= 1 else 0
+        else:
+            data["successFlag"] = "SUCCESS" if progress >= 1 else "PENDING"
+        if progress >= 1:
+            data["response"] = self.result()
+        return data
+
+    def result(self) -> Dict[str, Any]:
+        base = f"https://fake.suno.local/{self.endpoint}/{self.task_id}"
+        if self.endpoint == "generate":
+            return {"sunoData": [
+                {"id": f"{self.task_id}-{i}", "audioUrl": f"{base}/{i}.mp3", "imageUrl": f"{base}/{i}.jpg", "duration": 120.0}
+                for i in range(2)
+            ]}
+        if self.endpoint == "lyrics":
+            return {"data": [{"text": "[Verse]\nfake lyrics", "title": "Fake", "status": "complete"}]}
+        if self.endpoint == "wav":
+            return {"audioWavUrl": f"{base}.wav"}
+        if self.endpoint == "vocal-removal":
+            return {"vocalUrl": f"{base}/vocals.mp3", "instrumentalUrl": f"{base}/instrumental.mp3"}
+        if self.endpoint == "mp4":
+            return {"videoUrl": f"{base}.mp4"}
+        return {"images": [f"{base}/1.png", f"{base}/2.png"]}
+
+
+class FakeSunoServer:
+    """Servidor aiohttp que imita a Suno API.
+
+    Args:
+      host: interface onde o servidor escuta
+      port: porta local (0 = escolher uma porta livre)
+      latency: atraso base de cada resposta, em segundos
+      jitter: atraso adicional aleatório (0..jitter) por resposta
+      error_rate: fração de pedidos que falham com `error_status`
+      error_status: código HTTP devolvido nas falhas simuladas
+      completion_delay: segundos até uma tarefa ficar concluída
+      credits: saldo inicial reportado por /generate/credit
+      seed: semente do gerador aleatório (resultados reprodutíveis)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        completion_delay: float = 5.0,
+        credits: int = 100000,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.completion_delay = completion_delay
+        self.credits = credits
+        self.requests = 0
+        self.errors = 0
+        self.callbacks_sent = 0
+        self.tasks: Dict[str, _FakeTask] = {}
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[ClientSession] = None
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._inflight: set = set()
+
+        self.app = web.Application(client_max_size=1024 ** 3)
+        for path in TASK_PATHS:
+            self.app.router.add_post(API_PREFIX + path, self._create_task)
+        for path in RECORD_INFO_PATHS:
+            self.app.router.add_get(API_PREFIX + path, self._record_info)
+        self.app.router.add_get(API_PREFIX + "/generate/credit", self._credit)
+        self.app.router.add_post(API_PREFIX + "/generate/get-timestamped-lyrics", self._timestamped_lyrics)
+        self.app.router.add_post(API_PREFIX + "/style/generate", self._boost_style)
+        self.app.router.add_post(API_PREFIX + "/generate/generate-persona", self._persona)
+        for path in UPLOAD_PATHS:
+            self.app.router.add_post(path, self._upload)
+
+    async def __aenter__(self) -> "FakeSunoServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Inicia o servidor HTTP."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Para o servidor e cancela os callbacks agendados."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in list(self._inflight):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        """URL base a passar a SunoClient/AsyncSunoClient."""
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    async def _simulate(self, request: web.Request) -> Optional[web.Response]:
+        """Aplica latência, autenticação e erros simulados; retorna a resposta de erro, se houver."""
+        self.requests += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"code": 401, "msg": "Unauthorized"}, status=401)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"code": self.error_status, "msg": "Simulated error"}, status=self.error_status)
+        return None
+
+    def _ok(self, data: Any) -> web.Response:
+        return web.json_response({"code": 200, "msg": "success", "data": data})
+
+    async def _create_task(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        payload = await request.json()
+        endpoint = TASK_PATHS[request.path[len(API_PREFIX):]]
+        if endpoint == "generate":
+            self.credits -= 12
+        task = _FakeTask(endpoint, payload, self.completion_delay)
+        self.tasks[task.task_id] = task
+        callback_url = payload.get("callBackUrl")
+        if callback_url:
+            self._timers[task.task_id] = asyncio.get_running_loop().call_later(
+                max(self.completion_delay, 0), self._schedule_callback, task, callback_url
+            )
+        return self._ok({"taskId": task.task_id})
+
+    async def _record_info(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        task = self.tasks.get(request.query.get("taskId", ""))
+        if task is None or task.endpoint != RECORD_INFO_PATHS[request.path[len(API_PREFIX):]]:
+            return web.json_response({"code": 404, "msg": "Task not found"})
+        return self._ok(task.data())
+
+    async def _credit(self, request: web.Request) -> web.Response:
+        return await self._simulate(request) or self._ok(self.credits)
+
+    async def _timestamped_lyrics(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        words = [
+            {"word": word, "startS": i * 0.5, "endS": i * 0.5 + 0.4, "success": True, "palign": 0}
+            for i, word in enumerate("fake lyrics for a fake song".split())
+        ]
+        return self._ok({"alignedWords": words, "waveformData": [], "hootCer": 0.0, "isStreamed": False})
+
+    async def _boost_style(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        payload = await request.json()
+        return self._ok({"taskId": uuid.uuid4().hex, "result": f"{payload.get('content', '')}, boosted", "successFlag": "1"})
+
+    async def _persona(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        payload = await request.json()
+        return self._ok({"personaId": uuid.uuid4().hex, "name": payload.get("name"), "description": payload.get("description")})
+
+    async def _upload(self, request: web.Request) -> web.Response:
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        # Consumir o corpo em blocos, sem o guardar
+        size = 0
+        async for chunk in request.content.iter_chunked(256 * 1024):
+            size += len(chunk)
+        file_id = uuid.uuid4().hex
+        return self._ok({
+            "fileId": file_id,
+            "fileName": file_id,
+            "downloadUrl": f"https://fake.suno.local/uploads/{file_id}",
+            "fileSize": size,
+        })
+
+    def _schedule_callback(self, task: _FakeTask, url: str) -> None:
+        self._timers.pop(task.task_id, None)
+        sender = asyncio.get_running_loop().create_task(self._send_callback(task, url))
+        self._inflight.add(sender)
+        sender.add_done_callback(self._inflight.discard)
+
+    async def _send_callback(self, task: _FakeTask, url: str) -> None:
+        data = task.data()
+        data["task_id"] = task.task_id
+        data["callbackType"] = "complete"
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(timeout=ClientTimeout(total=10))
+        try:
+            async with self._session.post(url, json={"code": 200, "msg": "success", "data": data}) as response:
+                await response.read()
+            self.callbacks_sent += 1
+        except Exception:
+            # Tal como a Suno, um callback falhado não é repetido
+            pass
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FakeSunoServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        completion_delay=args.completion_delay,
+        seed=args.seed,
+    )
+    await server.start()
+    print(f"Fake Suno API listening on {server.base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor Suno API falso para testes locais")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--completion-delay", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
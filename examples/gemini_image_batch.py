@@ -0,0 +1,449 @@
+"""
+Geração de imagens em lote com o Gemini 2.5 Flash Image.
+
+O exemplo de `app/videostudio/criar/Gemini 2.py` faz um generate_content por
+prompt, um de cada vez, e grava cada imagem com `part.as_image().save(...)`:
+o PIL descodifica o PNG devolvido pela API só para o voltar a codificar. O
+`GeminiImageBatch`:
+
+- lê os pedidos de um ficheiro JSONL, uma linha de cada vez
+- envia-os em paralelo pelo cliente assíncrono do SDK (`client.aio`), com
+  um número limitado de workers e retry com backoff em 429/5xx
+- grava os bytes de `inline_data` diretamente no disco, com a extensão do
+  mime type; o PIL só é usado quando se pede outro formato (`format`)
+- acrescenta uma linha por pedido a um manifesto JSONL (ficheiros e texto)
+- com uma `GenerationCache` (`--cache-dir`), pedidos repetidos (mesmo
+  modelo, prompt, configuração e imagens de referência) são servidos do
+  disco, sem nova chamada ao modelo; pedidos idênticos em simultâneo no
+  mesmo lote partilham uma só chamada
+- com `--max-side`, as imagens de referência passam pelo `ImagePreprocessor`
+  (redução, remoção de metadados, cache pelo hash de origem) antes do envio
+
+Cada linha de entrada tem `prompt` e, opcionalmente, `id`,
+`response_modalities` (ex.: ["Image"]), `aspect_ratio` (ex.: "16:9"),
+`images` (imagens de referência para edição/composição), `format`
+("png", "jpeg" ou "webp") e `cache` (false = gerar sempre de novo).
+O `id` dá o nome aos ficheiros de saída: fica só com letras, dígitos, `.`,
+`_` e `-` (sem pastas), e ids repetidos no lote recebem um sufixo (`-2`, ...).
+
+Requisitos:
+- pip install google-genai
+- pip install pillow (apenas para conversão de formato e `--max-side`)
+
+Exemplo:
+    export GEMINI_API_KEY=...
+    python gemini_image_batch.py prompts.jsonl out/ --concurrency 8 --cache-dir ~/.cache/dua-generations
+
+    # contra o servidor falso
+    python fake_gemini_server.py --port 8090 &
+    python gemini_image_batch.py prompts.jsonl out/ --api-key test --base-url http://127.0.0.1:8090
+"""
+import argparse
+import asyncio
+import io
+import json
+import mimetypes
+import os
+import re
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from google import genai
+from google.genai import errors, types
+
+from generation_cache import CachedGeneration, GenerationCache, generation_key
+
+if TYPE_CHECKING:
+    from gemini_image_prep import ImagePreprocessor
+
+DEFAULT_MODEL = "gemini-2.5-flash-image"
+
+# 429 = quota/rate limit (RESOURCE_EXHAUSTED)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+MIME_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+FORMAT_MIME = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "webp": "image/webp"}
+
+# Imagem gerada: (bytes, mime type)
+Output = Tuple[bytes, str]
+
+# Caracteres permitidos no id usado nos nomes dos ficheiros de saída
+UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class ImageJob(NamedTuple):
+    """Um pedido de geração (ou edição) de imagem."""
+
+    job_id: str
+    prompt: str
+    aspect_ratio: Optional[str] = None
+    response_modalities: Optional[Sequence[str]] = None
+    images: Sequence[str] = ()
+    output_format: Optional[str] = None
+    cache: bool = True
+
+
+def read_jobs(path: str) -> Iterator[ImageJob]:
+    """Itera os pedidos de um ficheiro JSONL, uma linha de cada vez."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            yield ImageJob(
+                job_id=str(item.get("id", f"line-{line_number}")),
+                prompt=item["prompt"],
+                aspect_ratio=item.get("aspect_ratio"),
+                response_modalities=item.get("response_modalities"),
+                images=tuple(item.get("images") or ()),
+                output_format=item.get("format"),
+                cache=bool(item.get("cache", True)),
+            )
+
+
+def safe_job_id(job_id: str) -> str:
+    """Id utilizável como nome de ficheiro dentro de `output_dir` (sem pastas nem `..`)."""
+    name = os.path.basename(job_id.replace("\\", "/"))
+    name = UNSAFE_ID_CHARS.sub("_", name).lstrip(".")
+    return name or "job"
+
+
+def build_config(job: ImageJob) -> Optional[types.GenerateContentConfig]:
+    """GenerateContentConfig com response_modalities e image_config.aspect_ratio, se pedidos."""
+    options: Dict[str, Any] = {}
+    if job.response_modalities:
+        options["response_modalities"] = list(job.response_modalities)
+    if job.aspect_ratio:
+        options["image_config"] = types.ImageConfig(aspect_ratio=job.aspect_ratio)
+    return types.GenerateContentConfig(**options) if options else None
+
+
+def image_part(path: str) -> types.Part:
+    """Imagem de referência enviada tal como está no disco (sem passar pelo PIL)."""
+    mime_type = mimetypes.guess_type(path)[0] or "image/png"
+    with open(path, "rb") as f:
+        return types.Part.from_bytes(data=f.read(), mime_type=mime_type)
+
+
+def job_key(model: str, job: ImageJob, images: Sequence[types.Part]) -> str:
+    """Chave de cache do pedido: o formato de saída não conta (a conversão é feita depois)."""
+    config = {"response_modalities": list(job.response_modalities or ()), "aspect_ratio": job.aspect_ratio}
+    return generation_key(model, job.prompt, config, [part.inline_data.data for part in images])
+
+
+def convert_image(data: bytes, output_format: str) -> bytes:
+    """Converte a imagem para outro formato (requer Pillow)."""
+    try:
+        from PIL import Image
+    except ImportError as error:
+        raise RuntimeError("image format conversion requires Pillow (pip install pillow)") from error
+    image = Image.open(io.BytesIO(data))
+    name = "JPEG" if output_format in ("jpeg", "jpg") else output_format.upper()
+    if name == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    image.save(out, format=name)
+    return out.getvalue()
+
+
+def write_file(path: str, data: bytes) -> None:
+    """Escreve num ficheiro temporário e renomeia (nunca fica um ficheiro meio escrito)."""
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class GeminiImageBatch:
+    """Executa pedidos de imagem ao Gemini em paralelo e grava os resultados.
+
+    Args:
+      client: cliente `genai.Client` (é usado `client.aio`)
+      output_dir: pasta onde as imagens são gravadas
+      model: modelo de imagem
+      concurrency: número máximo de pedidos em curso
+      output_format: formato pedido para todas as imagens (None = o da API)
+      max_retries: novas tentativas em 429/5xx
+      backoff: segundos antes da primeira nova tentativa (duplica a cada uma)
+      manifest_path: ficheiro JSONL de resultados (acrescentado)
+      cache: cache de resultados (None = chamar sempre o modelo)
+      preprocessor: pré-processamento das imagens de referência (None = enviar os ficheiros tal como estão)
+    """
+
+    def __init__(
+        self,
+        client: genai.Client,
+        output_dir: str,
+        model: str = DEFAULT_MODEL,
+        concurrency: int = 8,
+        output_format: Optional[str] = None,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        manifest_path: Optional[str] = None,
+        cache: Optional[GenerationCache] = None,
+        preprocessor: Optional["ImagePreprocessor"] = None,
+    ):
+        if output_format is not None and output_format not in FORMAT_MIME:
+            raise ValueError(f"unsupported output format: {output_format}")
+        self.client = client
+        self.output_dir = output_dir
+        self.model = model
+        self.concurrency = concurrency
+        self.output_format = output_format
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.manifest_path = manifest_path
+        self.cache = cache
+        self.preprocessor = preprocessor
+        self.counts = {"done": 0, "failed": 0, "images": 0, "converted": 0, "cached": 0, "shared": 0}
+        self._flights: Dict[str, asyncio.Future] = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    async def run(self, jobs: Iterable[ImageJob]) -> Dict[str, int]:
+        """Processa os pedidos; a fila limitada faz com que a leitura acompanhe o ritmo dos workers."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        seen: Set[str] = set()
+        manifest = open(self.manifest_path, "a", encoding="utf-8") if self.manifest_path else None
+
+        async def worker() -> None:
+            while True:
+                job = await queue.get()
+                if job is None:
+                    return
+                record = await self.generate(job)
+                if manifest is not None:
+                    manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    manifest.flush()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        # Se um worker morrer, a fila deixa de esvaziar: `put` levanta o erro em vez de bloquear
+        failed = asyncio.get_running_loop().create_future()
+
+        def on_worker_done(task: asyncio.Future) -> None:
+            if not task.cancelled() and task.exception() is not None and not failed.done():
+                failed.set_exception(task.exception())
+
+        for task in workers:
+            task.add_done_callback(on_worker_done)
+
+        async def put(item: Optional[ImageJob]) -> None:
+            putter = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait([putter, failed], return_when=asyncio.FIRST_COMPLETED)
+            if not putter.done():
+                putter.cancel()
+                failed.result()
+
+        try:
+            for job in jobs:
+                await put(job._replace(job_id=self._unique_id(job.job_id, seen)))
+            for _ in workers:
+                await put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            if failed.done():
+                failed.exception()
+            if manifest is not None:
+                manifest.close()
+        return self.counts
+
+    async def generate(self, job: ImageJob) -> Dict[str, Any]:
+        """Gera as imagens de um pedido; devolve o registo do manifesto (nunca levanta exceções de API)."""
+        try:
+            # Validado antes da chamada ao modelo: um formato inválido não gasta quota
+            output_format = job.output_format or self.output_format
+            if output_format is not None and output_format not in FORMAT_MIME:
+                raise ValueError(f"unsupported output format: {output_format}")
+            images = await self._image_parts(job)
+            key = job_key(self.model, job, images) if self.cache is not None and job.cache else None
+            hit, outputs, text, cached = await self._resolve(job, images, key)
+            if hit is not None:
+                files = await asyncio.to_thread(self._restore, job, hit)
+            else:
+                files = [await asyncio.to_thread(self._save, job, index, *output) for index, output in enumerate(outputs)]
+        except (errors.APIError, OSError, RuntimeError, ValueError) as error:
+            self.counts["failed"] += 1
+            return {"id": job.job_id, "status": "failure", "error": str(error)}
+        self.counts["done"] += 1
+        self.counts["images"] += len(files)
+        self.counts["cached"] += cached
+        return {"id": job.job_id, "status": "success", "files": files, "text": text, "cached": cached}
+
+    async def _resolve(
+        self,
+        job: ImageJob,
+        images: List[types.Part],
+        key: Optional[str],
+    ) -> Tuple[Optional[CachedGeneration], List[Output], str, bool]:
+        """Resultado do pedido: da cache, de um pedido idêntico em curso ou do modelo.
+
+        Retorna (resultado em cache, saídas novas, texto, se o modelo não foi chamado
+        por este pedido). Pedidos com a mesma chave no mesmo lote partilham uma só
+        chamada; o registo em curso é criado antes da consulta à cache e só é
+        removido depois de o resultado lá ser guardado, por isso não há janela
+        em que um pedido idêntico chame o modelo outra vez.
+        """
+        if key is None:
+            return (None, *await self._generate(job, images), False)
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.counts["shared"] += 1
+            # shield: o cancelamento de um seguidor não cancela a chamada partilhada
+            hit, outputs, text = await asyncio.shield(flight)
+            return hit, outputs, text, True
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                result: Tuple[Optional[CachedGeneration], List[Output], str] = (hit, [], hit.text)
+            else:
+                outputs, text = await self._generate(job, images)
+                if outputs:
+                    await asyncio.to_thread(self.cache.put, key, outputs, text)
+                result = (None, outputs, text)
+        except BaseException as error:
+            if isinstance(error, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(error)
+                # Evitar "exception was never retrieved" quando não há seguidores
+                flight.exception()
+            raise
+        finally:
+            self._flights.pop(key, None)
+        flight.set_result(result)
+        return (*result, hit is not None)
+
+    async def _generate(self, job: ImageJob, images: List[types.Part]) -> Tuple[List[Output], str]:
+        """Chama o modelo; retorna as imagens (bytes, mime type) e o texto da resposta."""
+        response = await self._call(job, [job.prompt, *images])
+        outputs: List[Output] = []
+        texts: List[str] = []
+        for part in response.parts or []:
+            if part.text is not None:
+                texts.append(part.text)
+            elif part.inline_data is not None and part.inline_data.data:
+                outputs.append((part.inline_data.data, part.inline_data.mime_type or "image/png"))
+        return outputs, "\n".join(texts)
+
+    async def _image_parts(self, job: ImageJob) -> List[types.Part]:
+        if self.preprocessor is None:
+            return await asyncio.to_thread(lambda: [image_part(path) for path in job.images])
+        # Todas as imagens do pedido são processadas em paralelo no pool do preprocessor
+        futures = await asyncio.to_thread(lambda: [self.preprocessor.submit(path) for path in job.images])
+        prepared = [await asyncio.wrap_future(future) for future in futures]
+        return [types.Part.from_bytes(data=image.data, mime_type=image.mime_type) for image in prepared]
+
+    async def _call(self, job: ImageJob, contents: List[Any]) -> types.GenerateContentResponse:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.client.aio.models.generate_content(
+                    model=self.model, contents=contents, config=build_config(job)
+                )
+            except errors.APIError as error:
+                if error.code not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(delay)
+            delay *= 2
+        raise AssertionError("unreachable")
+
+    def _unique_id(self, job_id: str, seen: Set[str]) -> str:
+        """Id seguro e único no lote: ids repetidos recebem um sufixo (-2, -3, ...)."""
+        base = candidate = safe_job_id(job_id)
+        suffix = 1
+        # casefold: em sistemas de ficheiros sem distinção de maiúsculas, "A" e "a" colidem
+        while candidate.casefold() in seen:
+            suffix += 1
+            candidate = f"{base}-{suffix}"
+        seen.add(candidate.casefold())
+        return candidate
+
+    def _output_path(self, job: ImageJob, index: int, mime_type: str) -> str:
+        extension = MIME_EXTENSIONS.get(mime_type) or (mimetypes.guess_extension(mime_type) or ".bin").lstrip(".")
+        return os.path.join(self.output_dir, f"{safe_job_id(job.job_id)}-{index}.{extension}")
+
+    def _target_mime(self, job: ImageJob, mime_type: str) -> Optional[str]:
+        """Mime type para o qual é preciso converter, ou None se os bytes servem tal como estão."""
+        output_format = job.output_format or self.output_format
+        if output_format and FORMAT_MIME[output_format] != mime_type:
+            return FORMAT_MIME[output_format]
+        return None
+
+    def _save(self, job: ImageJob, index: int, data: bytes, mime_type: str) -> str:
+        target = self._target_mime(job, mime_type)
+        if target is not None:
+            data = convert_image(data, job.output_format or self.output_format)
+            mime_type = target
+            self.counts["converted"] += 1
+        path = self._output_path(job, index, mime_type)
+        write_file(path, data)
+        return path
+
+    def _restore(self, job: ImageJob, hit: CachedGeneration) -> List[str]:
+        """Grava as imagens de um resultado em cache (cópia direta do blob, se não houver conversão)."""
+        files = []
+        for index, blob in enumerate(hit.blobs):
+            if self._target_mime(job, blob.mime_type) is None:
+                files.append(self.cache.copy_to(blob, self._output_path(job, index, blob.mime_type)))
+            else:
+                files.append(self._save(job, index, self.cache.read(blob), blob.mime_type))
+        return files
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, int]:
+    http_options = types.HttpOptions(base_url=args.base_url) if args.base_url else None
+    client = genai.Client(api_key=args.api_key, http_options=http_options)
+    cache = GenerationCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 ** 2) if args.cache_dir else None
+    preprocessor = None
+    if args.max_side:
+        from gemini_image_prep import ImagePreprocessor
+
+        preprocessor = ImagePreprocessor(max_side=args.max_side, disk_cache=cache)
+    batch = GeminiImageBatch(
+        client,
+        args.output_dir,
+        model=args.model,
+        concurrency=args.concurrency,
+        output_format=args.format,
+        manifest_path=args.manifest or os.path.join(args.output_dir, "manifest.jsonl"),
+        cache=cache,
+        preprocessor=preprocessor,
+    )
+    try:
+        return await batch.run(read_jobs(args.input))
+    finally:
+        await client.aio.aclose()
+        if preprocessor is not None:
+            preprocessor.close()
+        if cache is not None:
+            cache.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Geração de imagens em lote com o Gemini")
+    parser.add_argument("input", help="ficheiro JSONL de pedidos")
+    parser.add_argument("output_dir", help="pasta das imagens geradas")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--format", choices=sorted(FORMAT_MIME), help="converter todas as imagens para este formato")
+    parser.add_argument("--manifest", help="manifesto JSONL (por omissão, <output_dir>/manifest.jsonl)")
+    parser.add_argument("--max-side", type=int, default=0, help="reduzir as imagens de referência a N píxeis (0 = enviar os originais)")
+    parser.add_argument("--cache-dir", help="pasta da cache de resultados (por omissão, sem cache)")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="tamanho máximo da cache, em MB")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY"))
+    parser.add_argument("--base-url", help="URL base da API (ex.: o servidor falso)")
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("defina --api-key ou GEMINI_API_KEY")
+
+    counts = asyncio.run(_main(args))
+    print(json.dumps(counts), file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Pré-processamento das imagens de entrada do Gemini (edição e composição).
+
+Os exemplos de edição de `app/videostudio/criar/Gemini 2.py` passam o
+resultado de `Image.open(...)` diretamente em `contents`: uma foto de
+telemóvel de 12 MP é enviada em resolução total (com EXIF e GPS) em cada
+volta da edição, embora o modelo trabalhe a cerca de 1024 px. O
+`ImagePreprocessor`:
+
+- reduz a imagem para `max_side` píxeis no lado maior (com `draft` nos JPEG,
+  que descodifica já a uma escala reduzida, e `reducing_gap` no resize)
+- aplica a orientação EXIF e remove os metadados (EXIF, GPS, XMP, ICC)
+- volta a codificar em JPEG (ou PNG, se a imagem tiver transparência)
+- faz o trabalho num ThreadPoolExecutor (o Pillow liberta o GIL ao
+  descodificar, redimensionar e codificar)
+- guarda o resultado pelo SHA-256 dos bytes de origem (e das opções), numa
+  LRU em memória limitada por bytes e, opcionalmente, numa
+  `GenerationCache` em disco; pedidos simultâneos da mesma imagem partilham
+  o mesmo processamento
+
+Assim, numa composição com várias imagens ou em edições repetidas sobre a
+mesma foto, cada imagem é processada uma única vez.
+
+Requisitos:
+- pip install pillow
+
+Exemplo:
+    with ImagePreprocessor(max_side=1024) as prep:
+        images = prep.prepare_many(["dress.png", "model.png"])
+        parts = [types.Part.from_bytes(data=i.data, mime_type=i.mime_type) for i in images]
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from PIL import Image, ImageOps
+
+from generation_cache import GenerationCache, generation_key
+
+# Resolução de trabalho do Gemini 2.5 Flash Image (saídas de ~1024 px no lado maior)
+DEFAULT_MAX_SIDE = 1024
+DEFAULT_MEMORY_BYTES = 64 * 1024 ** 2
+
+Source = Union[str, bytes]
+
+
+class PreparedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    source_digest: str
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+class ImagePreprocessor:
+    """Reduz, limpa e volta a codificar imagens de entrada, com cache pelo hash de origem.
+
+    Args:
+      max_side: tamanho máximo do lado maior, em píxeis (imagens menores não são ampliadas)
+      quality: qualidade JPEG
+      workers: threads de processamento
+      memory_bytes: tamanho máximo da cache em memória
+      disk_cache: cache em disco partilhada entre execuções (opcional)
+    """
+
+    def __init__(
+        self,
+        max_side: int = DEFAULT_MAX_SIDE,
+        quality: int = 90,
+        workers: int = min(4, os.cpu_count() or 1),
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk_cache: Optional[GenerationCache] = None,
+    ):
+        self.max_side = max_side
+        self.quality = quality
+        self.memory_bytes = memory_bytes
+        self.disk_cache = disk_cache
+        self.counts = {"processed": 0, "memory_hits": 0, "disk_hits": 0, "shared": 0, "bytes_in": 0, "bytes_out": 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-prep")
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._memory_size = 0
+        self._pending: Dict[str, Future] = {}
+
+    def __enter__(self) -> "ImagePreprocessor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, source: Source) -> Future:
+        """Agenda o processamento de um caminho ou de bytes; retorna um Future de PreparedImage.
+
+        Em código assíncrono: `await asyncio.wrap_future(prep.submit(path))`.
+        """
+        data = self._read(source)
+        key = self._key(data)
+        with self._lock:
+            prepared = self._memory.get(key)
+            if prepared is not None:
+                self._memory.move_to_end(key)
+                self.counts["memory_hits"] += 1
+                future: Future = Future()
+                future.set_result(prepared)
+                return future
+            future = self._pending.get(key)
+            if future is not None:
+                self.counts["shared"] += 1
+                return future
+            future = self._pending[key] = self._executor.submit(self._prepare, key, data)
+        return future
+
+    def prepare(self, source: Source) -> PreparedImage:
+        return self.submit(source).result()
+
+    def prepare_many(self, sources: Sequence[Source]) -> List[PreparedImage]:
+        """Processa várias imagens em paralelo, mantendo a ordem."""
+        return [future.result() for future in [self.submit(source) for source in sources]]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _read(self, source: Source) -> bytes:
+        if isinstance(source, bytes):
+            return source
+        with open(source, "rb") as f:
+            return f.read()
+
+    def _key(self, data: bytes) -> str:
+        options = {"max_side": self.max_side, "quality": self.quality}
+        return generation_key("image-prep", "", options, [data])
+
+    def _prepare(self, key: str, data: bytes) -> PreparedImage:
+        try:
+            prepared = self._from_disk(key)
+            if prepared is None:
+                prepared = self._process(data)
+                if self.disk_cache is not None:
+                    self.disk_cache.put(
+                        key, [(prepared.data, prepared.mime_type)],
+                        data={"width": prepared.width, "height": prepared.height, "source": prepared.source_digest},
+                    )
+            with self._lock:
+                self._remember(key, prepared)
+            return prepared
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _from_disk(self, key: str) -> Optional[PreparedImage]:
+        if self.disk_cache is None:
+            return None
+        hit = self.disk_cache.get(key)
+        if hit is None or len(hit.blobs) != 1:
+            return None
+        blob = hit.blobs[0]
+        with self._lock:
+            self.counts["disk_hits"] += 1
+        return PreparedImage(self.disk_cache.read(blob), blob.mime_type, hit.data["width"], hit.data["height"], hit.data["source"])
+
+    def _process(self, data: bytes) -> PreparedImage:
+        image = Image.open(io.BytesIO(data))
+        if image.format == "JPEG":
+            # Descodifica diretamente a 1/2, 1/4 ou 1/8 da resolução, quando possível
+            image.draft("RGB", (self.max_side, self.max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+        # Sem `info`, o Pillow não copia EXIF, XMP, ICC nem texto PNG da origem
+        image.info.clear()
+        out = io.BytesIO()
+        if image.mode == "RGBA":
+            image.save(out, format="PNG", optimize=False, compress_level=6)
+            mime_type = "image/png"
+        else:
+            image.save(out, format="JPEG", quality=self.quality, optimize=True)
+            mime_type = "image/jpeg"
+
+        prepared = PreparedImage(out.getvalue(), mime_type, image.width, image.height, hashlib.sha256(data).hexdigest())
+        with self._lock:
+            self.counts["processed"] += 1
+            self.counts["bytes_in"] += len(data)
+            self.counts["bytes_out"] += len(prepared.data)
+        return prepared
+
+    def _remember(self, key: str, prepared: PreparedImage) -> None:
+        if key in self._memory:
+            return
+        self._memory[key] = prepared
+        self._memory_size += len(prepared.data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.data)
@@ -0,0 +1,304 @@
+"""
+Cache endereçada por conteúdo para resultados de geração (Gemini e Suno).
+
+Cada chamada ao Gemini 2.5 Flash Image custa créditos (5 por imagem, segundo
+`app/videostudio/criar/Gemini 2.py`), e os utilizadores repetem muitas vezes o
+mesmo prompt, a mesma proporção e a mesma imagem de referência. A
+`GenerationCache` guarda os resultados por um hash do pedido:
+
+- a chave é o SHA-256 de (modelo, prompt, configuração canonicalizada,
+  SHA-256 de cada imagem de entrada), ver `generation_key`
+- os bytes gerados ficam num blob store em disco, também pelo seu SHA-256
+  (`blobs/ab/abcdef...`): saídas idênticas de pedidos diferentes ocupam o
+  espaço uma só vez
+- um índice SQLite liga cada chave aos seus blobs (com contagem de
+  referências) e guarda a hora do último acesso
+- quando o total de blobs passa `max_bytes`, os resultados usados há mais
+  tempo são removidos (LRU), e com eles os blobs que deixam de ser referidos
+
+Quem usa a cache decide, pedido a pedido, se a consulta: o
+`GeminiImageBatch` aceita `"cache": false` numa linha e o `suno_batch.py`
+também.
+
+Exemplo:
+    cache = GenerationCache("~/.cache/dua-generations", max_bytes=2 * 1024 ** 3)
+    key = generation_key("gemini-2.5-flash-image", prompt, {"aspect_ratio": "16:9"}, [image_bytes])
+    hit = cache.get(key)
+    if hit is None:
+        cache.put(key, [(png_bytes, "image/png")], text="...")
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Escreve o conteúdo de um blob num ficheiro aberto em modo binário
+BlobWriter = Callable[[BinaryIO], Any]
+
+
+def _copy_into(source: str, out: BinaryIO, chunk_size: int) -> None:
+    with open(source, "rb") as f:
+        shutil.copyfileobj(f, out, chunk_size)
+
+
+class CachedBlob(NamedTuple):
+    digest: str
+    mime_type: str
+    size: int
+    path: str
+
+
+class CachedGeneration(NamedTuple):
+    """Resultado guardado: blobs de saída, texto e dados extra (ex.: o record-info da Suno)."""
+
+    key: str
+    blobs: List[CachedBlob]
+    text: str
+    data: Any
+
+
+def generation_key(
+    model: str,
+    prompt: str,
+    config: Optional[Dict[str, Any]] = None,
+    inputs: Sequence[bytes] = (),
+) -> str:
+    """SHA-256 de um pedido de geração.
+
+    Args:
+      model: nome do modelo
+      prompt: texto do prompt
+      config: restantes parâmetros (canonicalizados como JSON com chaves ordenadas)
+      inputs: bytes das imagens/ficheiros de entrada, pela ordem em que são enviados
+    """
+    canonical = json.dumps(
+        {"model": model, "prompt": prompt, "config": config or {}},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    digest = hashlib.sha256(canonical.encode("utf-8"))
+    for data in inputs:
+        digest.update(b"\n" + hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+class GenerationCache:
+    """Resultados de geração por chave, com blobs deduplicados e evicção LRU por tamanho.
+
+    Args:
+      directory: pasta da cache (índice SQLite e blobs)
+      max_bytes: tamanho máximo do blob store (None = sem limite)
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self._blob_dir = os.path.join(self.directory, "blobs")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "deduplicated": 0, "evictions": 0}
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, record TEXT, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER, refs INTEGER)")
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest[:2], digest)
+
+    def get(self, key: str) -> Optional[CachedGeneration]:
+        """Retorna o resultado guardado (e marca-o como usado), ou None."""
+        with self._lock:
+            row = self._db.execute("SELECT record FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            record = json.loads(row[0])
+            blobs = [
+                CachedBlob(blob["digest"], blob["mime_type"], blob["size"], self.blob_path(blob["digest"]))
+                for blob in record["blobs"]
+            ]
+            if not all(os.path.exists(blob.path) for blob in blobs):
+                # Blob apagado à mão: o resultado deixa de ser utilizável
+                self._remove(key)
+                self._counters["misses"] += 1
+                return None
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._counters["hits"] += 1
+        return CachedGeneration(key, blobs, record.get("text", ""), record.get("data"))
+
+    def put(
+        self,
+        key: str,
+        outputs: Sequence[Tuple[bytes, str]],
+        text: str = "",
+        data: Any = None,
+    ) -> CachedGeneration:
+        """Guarda um resultado: `outputs` são pares (bytes, mime type); `data` tem de ser serializável em JSON."""
+        entries = []
+        writers: Dict[str, BlobWriter] = {}
+        for content, mime_type in outputs:
+            digest = hashlib.sha256(content).hexdigest()
+            writers[digest] = lambda f, content=content: f.write(content)
+            path = self._store_blob(digest, writers[digest])
+            entries.append(CachedBlob(digest, mime_type, len(content), path))
+        return self._index(key, entries, text, data, writers)
+
+    def put_files(
+        self,
+        key: str,
+        paths: Sequence[Tuple[str, str]],
+        text: str = "",
+        data: Any = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> CachedGeneration:
+        """Como `put`, mas copia ficheiros já em disco (ex.: áudio descarregado) sem os ler inteiros para memória."""
+        entries = []
+        writers: Dict[str, BlobWriter] = {}
+        for source, mime_type in paths:
+            digest = hashlib.sha256()
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(chunk)
+            hexdigest = digest.hexdigest()
+            writers[hexdigest] = lambda f, source=source: _copy_into(source, f, chunk_size)
+            path = self._store_blob(hexdigest, writers[hexdigest])
+            entries.append(CachedBlob(hexdigest, mime_type, os.path.getsize(path), path))
+        return self._index(key, entries, text, data, writers)
+
+    def read(self, blob: CachedBlob) -> bytes:
+        with open(blob.path, "rb") as f:
+            return f.read()
+
+    def copy_to(self, blob: CachedBlob, destination: str) -> str:
+        """Copia um blob para `destination` (cópia, para que editar o ficheiro não altere a cache)."""
+        tmp_path = f"{destination}.part"
+        shutil.copyfile(blob.path, tmp_path)
+        os.replace(tmp_path, destination)
+        return destination
+
+    def invalidate(self, key: str) -> None:
+        """Remove um resultado (e os blobs que só ele referia)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._remove(key)
+            finally:
+                self._db.execute("COMMIT")
+
+    def clear(self) -> None:
+        """Esvazia a cache (índice e blobs)."""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM blobs")
+            shutil.rmtree(self._blob_dir, ignore_errors=True)
+            os.makedirs(self._blob_dir, exist_ok=True)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acertos/falhas, entradas e bytes em disco."""
+        with self._lock:
+            counters: Dict[str, Any] = dict(self._counters)
+            counters["entries"] = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            counters["blobs"] = self._db.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+            counters["bytes"] = self._total_bytes()
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _store_blob(self, digest: str, writer: BlobWriter) -> str:
+        """Grava o blob se ainda não existir (escrita atómica); retorna o caminho."""
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+            with open(tmp_path, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        return path
+
+    def _index(
+        self,
+        key: str,
+        entries: List[CachedBlob],
+        text: str,
+        data: Any,
+        writers: Dict[str, BlobWriter],
+    ) -> CachedGeneration:
+        record = json.dumps({
+            "blobs": [{"digest": blob.digest, "mime_type": blob.mime_type, "size": blob.size} for blob in entries],
+            "text": text,
+            "data": data,
+        }, ensure_ascii=False)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Primeiro as novas referências, depois a remoção do registo anterior:
+                # um blob comum aos dois (ex.: o mesmo resultado guardado de novo)
+                # nunca chega a zero referências
+                for blob in entries:
+                    updated = self._db.execute("UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (blob.digest,)).rowcount
+                    if updated:
+                        self._counters["deduplicated"] += 1
+                    else:
+                        self._db.execute("INSERT INTO blobs (digest, size, refs) VALUES (?, ?, 1)", (blob.digest, blob.size))
+                    # Outro put pode ter removido o ficheiro entre a escrita e este ponto
+                    self._store_blob(blob.digest, writers[blob.digest])
+                self._remove(key)
+                self._db.execute("INSERT INTO results (key, record, last_used) VALUES (?, ?, ?)", (key, record, time.time()))
+                self._counters["stores"] += 1
+                self._evict(keep=key)
+            finally:
+                self._db.execute("COMMIT")
+        return CachedGeneration(key, entries, text, data)
+
+    def _total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, keep: str) -> None:
+        if self.max_bytes is None:
+            return
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key FROM results WHERE key != ? ORDER BY last_used LIMIT 1", (keep,)
+            ).fetchone()
+            if row is None:
+                # Só resta o resultado acabado de guardar: fica, mesmo acima do limite
+                return
+            total -= self._remove(row[0])
+            self._counters["evictions"] += 1
+
+    def _remove(self, key: str) -> int:
+        """Remove um resultado e os blobs órfãos; retorna os bytes libertados."""
+        row = self._db.execute("SELECT record FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return 0
+        self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+        freed = 0
+        for blob in json.loads(row[0])["blobs"]:
+            self._db.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (blob["digest"],))
+            orphan = self._db.execute(
+                "SELECT size FROM blobs WHERE digest = ? AND refs <= 0", (blob["digest"],)
+            ).fetchone()
+            if orphan is not None:
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (blob["digest"],))
+                try:
+                    os.remove(self.blob_path(blob["digest"]))
+                except FileNotFoundError:
+                    pass
+                freed += orphan[0]
+        return freed
@@ -7,9 +7,15 @@ Requisitos:
 - Instale a biblioteca `requests` (ex.: pip install requests).
 
 As funções retornam o objeto Response da biblioteca requests.
+
+Todas as funções delegam num `SunoClient` partilhado (ver `suno_client.py`),
+que reutiliza as ligações HTTP entre chamadas. Para controlar o pool, os
+timeouts ou o retry, crie o seu próprio `SunoClient` ou use `set_client()`.
 """
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional
+
+from suno_client import SunoClient
 
 # Configuração básica
 API_BASE_URL = "https://api.sunoapi.org/api/v1"
@@ -22,6 +28,20 @@ HEADERS_FORM = {
     "Authorization": f"Bearer {API_KEY}"
 }
 
+_client: Optional[SunoClient] = None
+
+def get_client() -> SunoClient:
+    """Retorna o cliente partilhado, criando-o na primeira chamada."""
+    global _client
+    if _client is None:
+        _client = SunoClient(api_key=API_KEY, base_url=API_BASE_URL)
+    return _client
+
+def set_client(client: SunoClient) -> None:
+    """Substitui o cliente partilhado usado pelas funções deste módulo."""
+    global _client
+    _client = client
+
 # 1. Geração de música
 def generate_music(params: Dict[str, Any]) -> requests.Response:
     """Cria uma música com base nos parâmetros fornecidos.
@@ -37,8 +57,7 @@ def generate_music(params: Dict[str, Any]) -> requests.Response:
 
     Retorna: Response contendo o taskId.
     """
-    url = f"{API_BASE_URL}/generate"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().generate_music(params)
 
 # 2. Extensão de música
 def extend_music(params: Dict[str, Any]) -> requests.Response:
@@ -49,8 +68,7 @@ def extend_music(params: Dict[str, Any]) -> requests.Response:
       - defaultParamFlag (bool)
       - se defaultParamFlag=True: forneça prompt, style, title, continueAt, etc.
     """
-    url = f"{API_BASE_URL}/generate/extend"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().extend_music(params)
 
 # 3. Upload e cover de áudio
 def upload_cover(params: Dict[str, Any]) -> requests.Response:
@@ -63,8 +81,7 @@ def upload_cover(params: Dict[str, Any]) -> requests.Response:
       - prompt/style/title conforme modo
       - model, callBackUrl etc.
     """
-    url = f"{API_BASE_URL}/generate/upload-cover"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().upload_cover(params)
 
 # 4. Upload e extensão de áudio
 def upload_extend(params: Dict[str, Any]) -> requests.Response:
@@ -76,8 +93,7 @@ def upload_extend(params: Dict[str, Any]) -> requests.Response:
       - se defaultParamFlag=True: prompt, style, title, continueAt
       - callBackUrl, model etc.
     """
-    url = f"{API_BASE_URL}/generate/upload-extend"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().upload_extend(params)
 
 # 5. Adicionar instrumental
 def add_instrumental(params: Dict[str, Any]) -> requests.Response:
@@ -91,8 +107,7 @@ def add_instrumental(params: Dict[str, Any]) -> requests.Response:
       - callBackUrl (str)
       - modelo (opcional)
     """
-    url = f"{API_BASE_URL}/generate/add-instrumental"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().add_instrumental(params)
 
 # 6. Adicionar vocais
 def add_vocals(params: Dict[str, Any]) -> requests.Response:
@@ -106,8 +121,7 @@ def add_vocals(params: Dict[str, Any]) -> requests.Response:
       - negativeTags (str)
       - callBackUrl (str)
     """
-    url = f"{API_BASE_URL}/generate/add-vocals"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().add_vocals(params)
 
 # 7. Obter detalhes de uma tarefa (poll)
 def get_task_info(task_id: str) -> requests.Response:
@@ -116,8 +130,7 @@ def get_task_info(task_id: str) -> requests.Response:
     Args:
       task_id: ID da tarefa
     """
-    url = f"{API_BASE_URL}/generate/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_task_info(task_id)
 
 # 8. Obter letras com timestamps
 def get_timestamped_lyrics(params: Dict[str, Any]) -> requests.Response:
@@ -127,15 +140,12 @@ def get_timestamped_lyrics(params: Dict[str, Any]) -> requests.Response:
       - taskId (str)
       - audioId (str) ou musicIndex (int)
     """
-    url = f"{API_BASE_URL}/generate/get-timestamped-lyrics"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().get_timestamped_lyrics(params)
 
 # 9. Potenciar estilo musical
 def boost_music_style(content: str) -> requests.Response:
     """Gera um estilo potenciado (modelos V4_5+)."""
-    url = f"{API_BASE_URL}/style/generate"
-    payload = {"content": content}
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().boost_music_style(content)
 
 # 10. Gerar persona
 def generate_persona(params: Dict[str, Any]) -> requests.Response:
@@ -147,8 +157,7 @@ def generate_persona(params: Dict[str, Any]) -> requests.Response:
       - name (str)
       - description (str)
     """
-    url = f"{API_BASE_URL}/generate/generate-persona"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().generate_persona(params)
 
 # 11. Gerar capa de música
 def generate_music_cover(task_id: str, callback_url: str) -> requests.Response:
@@ -158,36 +167,27 @@ def generate_music_cover(task_id: str, callback_url: str) -> requests.Response:
       task_id: ID da música original
       callback_url: URL para receber o retorno
     """
-    url = f"{API_BASE_URL}/suno/cover/generate"
-    payload = {"taskId": task_id, "callBackUrl": callback_url}
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().generate_music_cover(task_id, callback_url)
 
 # 12. Obter detalhes da capa
 def get_music_cover_info(task_id: str) -> requests.Response:
-    url = f"{API_BASE_URL}/suno/cover/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_music_cover_info(task_id)
 
 # 13. Gerar letras
 def generate_lyrics(prompt: str, callback_url: str) -> requests.Response:
-    url = f"{API_BASE_URL}/lyrics"
-    payload = {"prompt": prompt, "callBackUrl": callback_url}
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().generate_lyrics(prompt, callback_url)
 
 # 14. Obter detalhes das letras
 def get_lyrics_info(task_id: str) -> requests.Response:
-    url = f"{API_BASE_URL}/lyrics/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_lyrics_info(task_id)
 
 # 15. Converter para WAV
 def convert_to_wav(task_id: str, audio_id: str, callback_url: str) -> requests.Response:
-    url = f"{API_BASE_URL}/wav/generate"
-    payload = {"taskId": task_id, "audioId": audio_id, "callBackUrl": callback_url}
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().convert_to_wav(task_id, audio_id, callback_url)
 
 # 16. Obter detalhes do WAV
 def get_wav_info(task_id: str) -> requests.Response:
-    url = f"{API_BASE_URL}/wav/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_wav_info(task_id)
 
 # 17. Separação de vocais / stems
 def vocal_removal(params: Dict[str, Any]) -> requests.Response:
@@ -199,70 +199,47 @@ def vocal_removal(params: Dict[str, Any]) -> requests.Response:
       - type (str): 'separate_vocal' ou 'split_stem'
       - callBackUrl (str)
     """
-    url = f"{API_BASE_URL}/vocal-removal/generate"
-    return requests.post(url, json=params, headers=HEADERS_JSON)
+    return get_client().vocal_removal(params)
 
 # 18. Obter detalhes da separação
 def get_vocal_removal_info(task_id: str) -> requests.Response:
-    url = f"{API_BASE_URL}/vocal-removal/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_vocal_removal_info(task_id)
 
 # 19. Criar vídeo musical
 def create_music_video(task_id: str, audio_id: str, callback_url: str, author: Optional[str] = None, domain_name: Optional[str] = None) -> requests.Response:
-    url = f"{API_BASE_URL}/mp4/generate"
-    payload = {
-        "taskId": task_id,
-        "audioId": audio_id,
-        "callBackUrl": callback_url
-    }
-    if author:
-        payload["author"] = author
-    if domain_name:
-        payload["domainName"] = domain_name
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().create_music_video(task_id, audio_id, callback_url, author, domain_name)
 
 # 20. Obter detalhes do vídeo
 def get_music_video_info(task_id: str) -> requests.Response:
-    url = f"{API_BASE_URL}/mp4/record-info?taskId={task_id}"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_music_video_info(task_id)
 
 # 21. Consultar saldo de créditos
 def get_remaining_credits() -> requests.Response:
-    url = f"{API_BASE_URL}/generate/credit"
-    return requests.get(url, headers=HEADERS_JSON)
+    return get_client().get_remaining_credits()
 
 # 22. Upload Base64
 def base64_upload(base64_data: str, upload_path: str, file_name: Optional[str] = None) -> requests.Response:
-    url = f"{API_BASE_URL.replace('/api/v1', '')}/api/file-base64-upload"
-    payload = {
-        "base64Data": base64_data,
-        "uploadPath": upload_path
-    }
-    if file_name:
-        payload["fileName"] = file_name
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().base64_upload(base64_data, upload_path, file_name)
 
 # 23. Upload via stream
-def stream_upload(file_path: str, upload_path: str, file_name: Optional[str] = None) -> requests.Response:
-    url = f"{API_BASE_URL.replace('/api/v1', '')}/api/file-stream-upload"
-    files = {"file": open(file_path, "rb")}
-    data = {
-        "uploadPath": upload_path
-    }
-    if file_name:
-        data["fileName"] = file_name
-    return requests.post(url, files=files, data=data, headers=HEADERS_FORM)
+def stream_upload(file_path: str, upload_path: str, file_name: Optional[str] = None, progress: Optional[Callable[[int, int], None]] = None) -> requests.Response:
+    return get_client().stream_upload(file_path, upload_path, file_name, progress)
 
 # 24. Upload via URL
 def url_upload(file_url: str, upload_path: str, file_name: Optional[str] = None) -> requests.Response:
-    url = f"{API_BASE_URL.replace('/api/v1', '')}/api/file-url-upload"
-    payload = {
-        "fileUrl": file_url,
-        "uploadPath": upload_path
-    }
-    if file_name:
-        payload["fileName"] = file_name
-    return requests.post(url, json=payload, headers=HEADERS_JSON)
+    return get_client().url_upload(file_url, upload_path, file_name)
+
+# 25. Upload com escolha automática (URL, Base64 ou stream)
+def upload(source: Any, upload_path: str, file_name: Optional[str] = None, progress: Optional[Callable[[int, int], None]] = None) -> requests.Response:
+    """Envia um ficheiro pelo endpoint de upload adequado ao seu tamanho e origem.
+
+    Args:
+      source: URL http(s), caminho, ficheiro binário aberto ou bytes
+      upload_path: pasta de destino
+      file_name: nome do ficheiro (opcional)
+      progress: função opcional chamada com (bytes_enviados, total)
+    """
+    return get_client().upload(source, upload_path, file_name, progress)
 
 if __name__ == "__main__":
     # Exemplo de uso: gerar música simples (modo não-personalizado)
@@ -0,0 +1,359 @@
+"""
+Cliente Suno API assíncrono (asyncio + aiohttp).
+
+Espelha os 24 endpoints de `suno_api_examples.py` com as mesmas assinaturas e
+payloads, mas como corrotinas. Todas as chamadas partilham um único pool de
+ligações, e um semáforo limita o número de pedidos em voo, permitindo que um
+só processo conduza milhares de tarefas concorrentes sem abrir milhares de
+sockets.
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Os métodos retornam um `AsyncSunoResponse`, com a mesma interface básica do
+Response da biblioteca requests (`status_code`, `headers`, `content`, `text`,
+`json()`), já com o corpo lido e a ligação devolvida ao pool, e com os
+campos de `SunoResult` (`task_id`, `status`, `audio_urls`, ...).
+
+Exemplo:
+    async with AsyncSunoClient(api_key="...", max_in_flight=200) as client:
+        responses = await asyncio.gather(*(client.generate_music(p) for p in prompts))
+"""
+import asyncio
+import os
+import time
+import aiohttp
+from typing import IO, Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+from suno_cache import CachedResponse, ResponseCache
+from suno_dedupe import RequestCoalescer
+from suno_client import API_BASE_URL, RETRY_STATUSES
+from suno_metrics import MetricsRecorder, RequestSample
+from suno_ratelimit import RateLimiter
+from suno_result import SunoResult
+
+
+class AsyncSunoResponse(SunoResult):
+    """Resposta já lida de um pedido assíncrono (JSON descodificado uma só vez)."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+def _metrics_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig que acumula tempo de ligação e bytes enviados em `trace_request_ctx`."""
+    async def on_connection_create_start(session, ctx, params) -> None:
+        ctx.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx["connect"] += time.perf_counter() - ctx.connect_started
+
+    async def on_request_chunk_sent(session, ctx, params) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx["sent"] += len(params.chunk)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    return trace_config
+
+
+class AsyncSunoClient:
+    """Cliente Suno API assíncrono com pool partilhado e concorrência limitada.
+
+    Args:
+      api_key: token Bearer da Suno API
+      base_url: URL base da API (ex.: https://api.sunoapi.org/api/v1)
+      pool_size: número máximo de ligações abertas (0 = ilimitado)
+      max_in_flight: número máximo de pedidos em curso em simultâneo
+      timeout: timeout total por pedido em segundos
+      max_retries: número máximo de novas tentativas em 405/429/5xx
+      backoff_factor: fator do backoff exponencial entre tentativas
+      cache: cache opcional para os endpoints de leitura (ver `suno_cache.py`)
+      rate_limiter: limitador opcional; os pedidos esperam localmente pela sua vez
+      metrics: recolha opcional de métricas por endpoint (ver `suno_metrics.py`)
+      dedupe: agrupamento opcional de pedidos de geração duplicados (ver `suno_dedupe.py`)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = API_BASE_URL,
+        pool_size: int = 100,
+        max_in_flight: int = 100,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        dedupe: Optional[RequestCoalescer] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.upload_base_url = self.base_url.replace("/api/v1", "")
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.dedupe = dedupe
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncSunoClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Sessão partilhada, criada no primeiro pedido (dentro do event loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._headers,
+                timeout=self.timeout,
+                trace_configs=[_metrics_trace_config()] if self.metrics is not None else None,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Fecha todas as ligações do pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, path: str, base_url: Optional[str] = None, data_factory: Optional[Callable[[], Tuple[Any, Sequence[IO[bytes]]]]] = None, **kwargs: Any) -> AsyncSunoResponse:
+        """Executa o pedido com retry.
+
+        `data_factory` recria o corpo em cada tentativa e devolve (corpo, ficheiros
+        abertos); os ficheiros são fechados no fim da tentativa (o aiohttp fecha-os
+        depois do envio, por isso não podem ser reutilizados num retry).
+        """
+        url = f"{base_url or self.base_url}{path}"
+        attempt = 0
+        trace = {"connect": 0.0, "sent": 0, "ttfb": 0.0} if self.metrics is not None else None
+        started = time.perf_counter()
+        while True:
+            files: Sequence[IO[bytes]] = ()
+            if data_factory is not None:
+                kwargs["data"], files = data_factory()
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(path)
+                async with self._semaphore:
+                    attempt_started = time.perf_counter()
+                    if trace is not None:
+                        trace["sent"] = 0
+                    try:
+                        async with self.session.request(method, url, trace_request_ctx=trace, **kwargs) as response:
+                            if trace is not None:
+                                trace["ttfb"] = time.perf_counter() - attempt_started
+                            content = await response.read()
+                            result = AsyncSunoResponse(response.status, dict(response.headers), content, str(response.url))
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                        if trace is not None:
+                            self._record(path, method, trace, started, attempt, None, type(error).__name__)
+                        raise
+            finally:
+                for f in files:
+                    f.close()
+            if result.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                if trace is not None:
+                    self._record(path, method, trace, started, attempt, result)
+                return result
+            retry_after = result.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff_factor * (2 ** attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _record(self, path: str, method: str, trace: Dict[str, Any], started: float, retries: int, result: Optional[AsyncSunoResponse], error: Optional[str] = None) -> None:
+        self.metrics.record(RequestSample(
+            endpoint=path,
+            method=method,
+            status=result.status_code if result is not None else 0,
+            connect_s=trace["connect"],
+            ttfb_s=trace["ttfb"],
+            total_s=time.perf_counter() - started,
+            bytes_sent=trace["sent"],
+            bytes_received=len(result.content) if result is not None else 0,
+            retries=retries,
+            error=error,
+        ))
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncSunoResponse:
+        return await self._cached(path, params, "GET", params=params)
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> AsyncSunoResponse:
+        if self.dedupe is not None and self.dedupe.applies(path):
+            return await self.dedupe.run_async(path, payload, lambda: self._cached(path, payload, "POST", json=payload))
+        return await self._cached(path, payload, "POST", json=payload)
+
+    async def _cached(self, path: str, key: Optional[Dict[str, Any]], method: str, **kwargs: Any) -> AsyncSunoResponse:
+        """Serve o pedido a partir da cache quando o endpoint é de leitura."""
+        use_cache = self.cache is not None and self.cache.cacheable(path)
+        if use_cache:
+            cached = self.cache.get(path, key)
+            if cached is not None:
+                return AsyncSunoResponse(*cached)
+        response = await self._request(method, path, **kwargs)
+        if use_cache:
+            self.cache.put(path, key, CachedResponse(response.status_code, response.headers, response.content, response.url))
+        return response
+
+    # 1. Geração de música
+    async def generate_music(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Cria uma música com base nos parâmetros fornecidos."""
+        return await self._post("/generate", params)
+
+    # 2. Extensão de música
+    async def extend_music(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Estende uma música existente."""
+        return await self._post("/generate/extend", params)
+
+    # 3. Upload e cover de áudio
+    async def upload_cover(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Carrega um áudio e gera um cover."""
+        return await self._post("/generate/upload-cover", params)
+
+    # 4. Upload e extensão de áudio
+    async def upload_extend(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Carrega um áudio e o estende."""
+        return await self._post("/generate/upload-extend", params)
+
+    # 5. Adicionar instrumental
+    async def add_instrumental(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Gera um acompanhamento instrumental."""
+        return await self._post("/generate/add-instrumental", params)
+
+    # 6. Adicionar vocais
+    async def add_vocals(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Adiciona vocais a um instrumental existente."""
+        return await self._post("/generate/add-vocals", params)
+
+    # 7. Obter detalhes de uma tarefa (poll)
+    async def get_task_info(self, task_id: str) -> AsyncSunoResponse:
+        """Recupera informações detalhadas de uma geração de música."""
+        return await self._get("/generate/record-info", {"taskId": task_id})
+
+    # 8. Obter letras com timestamps
+    async def get_timestamped_lyrics(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Obtém letras sincronizadas com tempo."""
+        return await self._post("/generate/get-timestamped-lyrics", params)
+
+    # 9. Potenciar estilo musical
+    async def boost_music_style(self, content: str) -> AsyncSunoResponse:
+        """Gera um estilo potenciado (modelos V4_5+)."""
+        return await self._post("/style/generate", {"content": content})
+
+    # 10. Gerar persona
+    async def generate_persona(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Cria uma persona personalizada."""
+        return await self._post("/generate/generate-persona", params)
+
+    # 11. Gerar capa de música
+    async def generate_music_cover(self, task_id: str, callback_url: str) -> AsyncSunoResponse:
+        """Solicita geração de capa."""
+        return await self._post("/suno/cover/generate", {"taskId": task_id, "callBackUrl": callback_url})
+
+    # 12. Obter detalhes da capa
+    async def get_music_cover_info(self, task_id: str) -> AsyncSunoResponse:
+        return await self._get("/suno/cover/record-info", {"taskId": task_id})
+
+    # 13. Gerar letras
+    async def generate_lyrics(self, prompt: str, callback_url: str) -> AsyncSunoResponse:
+        return await self._post("/lyrics", {"prompt": prompt, "callBackUrl": callback_url})
+
+    # 14. Obter detalhes das letras
+    async def get_lyrics_info(self, task_id: str) -> AsyncSunoResponse:
+        return await self._get("/lyrics/record-info", {"taskId": task_id})
+
+    # 15. Converter para WAV
+    async def convert_to_wav(self, task_id: str, audio_id: str, callback_url: str) -> AsyncSunoResponse:
+        payload = {"taskId": task_id, "audioId": audio_id, "callBackUrl": callback_url}
+        return await self._post("/wav/generate", payload)
+
+    # 16. Obter detalhes do WAV
+    async def get_wav_info(self, task_id: str) -> AsyncSunoResponse:
+        return await self._get("/wav/record-info", {"taskId": task_id})
+
+    # 17. Separação de vocais / stems
+    async def vocal_removal(self, params: Dict[str, Any]) -> AsyncSunoResponse:
+        """Separa vocal/instrumento ou múltiplos stems."""
+        return await self._post("/vocal-removal/generate", params)
+
+    # 18. Obter detalhes da separação
+    async def get_vocal_removal_info(self, task_id: str) -> AsyncSunoResponse:
+        return await self._get("/vocal-removal/record-info", {"taskId": task_id})
+
+    # 19. Criar vídeo musical
+    async def create_music_video(self, task_id: str, audio_id: str, callback_url: str, author: Optional[str] = None, domain_name: Optional[str] = None) -> AsyncSunoResponse:
+        payload = {
+            "taskId": task_id,
+            "audioId": audio_id,
+            "callBackUrl": callback_url
+        }
+        if author:
+            payload["author"] = author
+        if domain_name:
+            payload["domainName"] = domain_name
+        return await self._post("/mp4/generate", payload)
+
+    # 20. Obter detalhes do vídeo
+    async def get_music_video_info(self, task_id: str) -> AsyncSunoResponse:
+        return await self._get("/mp4/record-info", {"taskId": task_id})
+
+    # 21. Consultar saldo de créditos
+    async def get_remaining_credits(self) -> AsyncSunoResponse:
+        return await self._get("/generate/credit")
+
+    # 22. Upload Base64
+    async def base64_upload(self, base64_data: str, upload_path: str, file_name: Optional[str] = None) -> AsyncSunoResponse:
+        payload = {
+            "base64Data": base64_data,
+            "uploadPath": upload_path
+        }
+        if file_name:
+            payload["fileName"] = file_name
+        return await self._request("POST", "/api/file-base64-upload", self.upload_base_url, json=payload)
+
+    # 23. Upload via stream
+    async def stream_upload(self, file_path: str, upload_path: str, file_name: Optional[str] = None) -> AsyncSunoResponse:
+        def build_form() -> Tuple[aiohttp.FormData, List[IO[bytes]]]:
+            # Um ficheiro novo por tentativa: o aiohttp fecha o anterior depois de o enviar
+            f = open(file_path, "rb")
+            form = aiohttp.FormData()
+            form.add_field("uploadPath", upload_path)
+            if file_name:
+                form.add_field("fileName", file_name)
+            form.add_field("file", f, filename=file_name or os.path.basename(file_path))
+            return form, [f]
+        return await self._request("POST", "/api/file-stream-upload", self.upload_base_url, data_factory=build_form)
+
+    # 24. Upload via URL
+    async def url_upload(self, file_url: str, upload_path: str, file_name: Optional[str] = None) -> AsyncSunoResponse:
+        payload = {
+            "fileUrl": file_url,
+            "uploadPath": upload_path
+        }
+        if file_name:
+            payload["fileName"] = file_name
+        return await self._request("POST", "/api/file-url-upload", self.upload_base_url, json=payload)
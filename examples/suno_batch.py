@@ -0,0 +1,282 @@
+"""
+Geração em lote a partir de uma folha de prompts (JSONL ou CSV).
+
+Lê os prompts linha a linha (o ficheiro de entrada nunca é carregado
+inteiro em memória), submete-os com generate_music com concorrência
+limitada e escreve uma linha JSONL no ficheiro de saída assim que cada
+tarefa termina.
+
+Cada item passa por um ficheiro de checkpoint (JSONL, só acrescentado):
+`submitted` com o taskId logo após a submissão e `done`/`failed` no fim. Ao
+voltar a correr o mesmo comando, os itens terminados são ignorados e os
+itens já submetidos não são pagos de novo: o lote apenas espera pelo
+resultado do taskId registado.
+
+Cada linha de entrada contém os parâmetros de generate_music (prompt,
+customMode, instrumental, model, style, title, ...) e, opcionalmente, um
+campo `id`; sem `id`, é usado o número da linha.
+
+Com `--cache-dir`, um item com os mesmos parâmetros de um item já gerado
+(noutro lote) reutiliza o resultado guardado numa `GenerationCache`, sem
+gastar créditos; `cache: false` numa linha força uma nova geração.
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    export SUNO_API_KEY=...
+    python suno_batch.py prompts.csv results.jsonl --concurrency 20 \\
+        --callback-url https://seu-dominio.com/callback
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from generation_cache import GenerationCache, generation_key
+from suno_async_client import AsyncSunoClient
+from suno_client import API_BASE_URL
+from suno_poller import TaskPoller
+from suno_ratelimit import RateLimiter
+
+# Colunas CSV convertidas para booleano
+BOOLEAN_FIELDS = ("customMode", "instrumental", "cache")
+
+Item = Tuple[str, Dict[str, Any]]
+
+
+def item_key(params: Dict[str, Any]) -> str:
+    """Chave de cache de um item (o callBackUrl não altera o resultado)."""
+    config = {key: value for key, value in params.items() if key not in ("model", "prompt", "callBackUrl")}
+    return generation_key(f"suno:{params.get('model', '')}", params.get("prompt", ""), config)
+
+
+def _coerce_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key in BOOLEAN_FIELDS:
+            params[key] = value.strip().lower() in ("1", "true", "yes", "sim")
+        else:
+            params[key] = value
+    return params
+
+
+def read_items(path: str, input_format: Optional[str] = None) -> Iterator[Item]:
+    """Itera (id, parâmetros) a partir de um ficheiro JSONL ou CSV, uma linha de cada vez."""
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if input_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                params = _coerce_csv_row(row)
+                yield str(params.pop("id", f"line-{line_number}")), params
+            return
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            params = json.loads(line)
+            yield str(params.pop("id", f"line-{line_number}")), params
+
+
+class Checkpoint:
+    """Estado de cada item, num JSONL só acrescentado (seguro após um crash).
+
+    Args:
+      path: ficheiro de checkpoint
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.states: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última linha truncada por um crash
+                        continue
+                    self.states[entry["id"]] = entry
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, item_id: str, state: str, task_id: Optional[str] = None, error: Optional[str] = None) -> None:
+        entry = {"id": item_id, "state": state, "taskId": task_id}
+        if error:
+            entry["error"] = error
+        self.states[item_id] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class BatchRunner:
+    """Submete e acompanha um lote de gerações com concorrência limitada.
+
+    Args:
+      client: cliente assíncrono
+      poller: poller usado para esperar pelos resultados
+      output_path: ficheiro JSONL de resultados (acrescentado)
+      checkpoint: checkpoint do lote
+      callback_url: callBackUrl enviado quando a linha não tem um
+      concurrency: número máximo de itens em curso (submetidos e por terminar)
+      retry_failed: voltar a submeter itens que falharam numa execução anterior
+      cache: cache de resultados entre lotes (None = gerar sempre)
+    """
+
+    def __init__(
+        self,
+        client: AsyncSunoClient,
+        poller: TaskPoller,
+        output_path: str,
+        checkpoint: Checkpoint,
+        callback_url: str,
+        concurrency: int = 10,
+        retry_failed: bool = False,
+        cache: Optional[GenerationCache] = None,
+    ):
+        self.client = client
+        self.poller = poller
+        self.checkpoint = checkpoint
+        self.callback_url = callback_url
+        self.concurrency = concurrency
+        self.retry_failed = retry_failed
+        self.cache = cache
+        self.counts = {"done": 0, "failed": 0, "skipped": 0, "resumed": 0, "cached": 0}
+        self._output = open(output_path, "a", encoding="utf-8")
+
+    async def run(self, items: Iterator[Item]) -> Dict[str, int]:
+        """Processa os itens; a fila limitada faz com que a leitura acompanhe o ritmo dos workers."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                await self._process(*item)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            for item in items:
+                previous = self.checkpoint.states.get(item[0])
+                if previous and (previous["state"] == "done" or (previous["state"] == "failed" and not self.retry_failed)):
+                    self.counts["skipped"] += 1
+                    continue
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            self._output.close()
+        return self.counts
+
+    async def _process(self, item_id: str, params: Dict[str, Any]) -> None:
+        previous = self.checkpoint.states.get(item_id)
+        use_cache = params.pop("cache", True)
+        key = item_key(params) if self.cache is not None and use_cache else None
+        task_id = None
+        if key is not None:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                task_id = hit.data.get("taskId")
+                self._write_success(item_id, task_id, hit.data, cached=True)
+                self.checkpoint.record(item_id, "done", task_id)
+                self.counts["done"] += 1
+                self.counts["cached"] += 1
+                return
+        try:
+            if previous and previous["state"] == "submitted" and previous.get("taskId"):
+                task_id = previous["taskId"]
+                self.counts["resumed"] += 1
+            else:
+                response = await self.client.generate_music({"callBackUrl": self.callback_url, **params})
+                task_id = response.task_id
+                if response.code != 200 or not task_id:
+                    raise RuntimeError(response.msg or f"HTTP {response.status_code}")
+                self.checkpoint.record(item_id, "submitted", task_id)
+            data = await self.poller.watch("generate", task_id)
+        except Exception as error:
+            # Uma falha (rede, tarefa, resposta inválida) afeta só este item
+            self._write({"id": item_id, "taskId": task_id, "status": "failure", "error": str(error)})
+            self.checkpoint.record(item_id, "failed", task_id, str(error))
+            self.counts["failed"] += 1
+            return
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, [], data={**data, "taskId": task_id})
+        self._write_success(item_id, task_id, data)
+        self.checkpoint.record(item_id, "done", task_id)
+        self.counts["done"] += 1
+
+    def _write_success(self, item_id: str, task_id: Optional[str], data: Dict[str, Any], cached: bool = False) -> None:
+        tracks = (data.get("response") or {}).get("sunoData") or []
+        self._write({
+            "id": item_id,
+            "taskId": task_id,
+            "status": "success",
+            "cached": cached,
+            "audioIds": [track.get("id") for track in tracks],
+            "audioUrls": [track.get("audioUrl") for track in tracks],
+            "data": data,
+        })
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._output.flush()
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, int]:
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint")
+    limiter = RateLimiter() if not args.no_rate_limit else None
+    cache = GenerationCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 ** 2) if args.cache_dir else None
+    try:
+        async with AsyncSunoClient(api_key=args.api_key, base_url=args.base_url, rate_limiter=limiter) as client:
+            poller = TaskPoller(client, default_timeout=args.timeout)
+            runner = BatchRunner(
+                client, poller, args.output, checkpoint, args.callback_url,
+                concurrency=args.concurrency, retry_failed=args.retry_failed, cache=cache,
+            )
+            try:
+                return await runner.run(read_items(args.input, args.format))
+            finally:
+                await poller.close()
+    finally:
+        checkpoint.close()
+        if cache is not None:
+            cache.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Geração em lote de músicas com a Suno API")
+    parser.add_argument("input", help="ficheiro de prompts (.jsonl ou .csv)")
+    parser.add_argument("output", help="ficheiro JSONL de resultados")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="formato da entrada (por omissão, pela extensão)")
+    parser.add_argument("--checkpoint", help="ficheiro de checkpoint (por omissão, <output>.checkpoint)")
+    parser.add_argument("--api-key", default=os.environ.get("SUNO_API_KEY"))
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    parser.add_argument("--callback-url", default="https://example.com/callback")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=900.0, help="segundos até desistir de cada tarefa")
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--cache-dir", help="pasta da cache de resultados (por omissão, sem cache)")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="tamanho máximo da cache, em MB")
+    parser.add_argument("--no-rate-limit", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("defina --api-key ou SUNO_API_KEY")
+
+    counts = asyncio.run(_main(args))
+    print(json.dumps(counts), file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Benchmark dos clientes Suno contra o servidor falso local.
+
+Arranca `fake_suno_server.py` num processo separado (para não competir pelo
+GIL com o cliente medido) e mede, para cada cenário, pedidos por segundo,
+latência p50/p95/p99 e memória:
+
+- `sync`: SunoClient com N threads a partilhar a mesma sessão
+- `async`: AsyncSunoClient com N pedidos em voo
+- `polling`: TaskPoller a acompanhar muitas tarefas até SUCCESS
+- `upload_stream` / `upload_base64`: uploads em streaming de um ficheiro temporário
+
+O resultado é escrito em JSON, para comparar execuções. Com `--baseline`, os
+resultados são comparados com uma execução anterior e o processo termina com
+código 1 se algum cenário regredir mais do que `--max-regression`.
+
+Requisitos:
+- Instale as bibliotecas `requests` e `aiohttp`.
+
+Exemplo:
+    python suno_benchmark.py --requests 2000 --concurrency 50 --output bench.json
+    python suno_benchmark.py --baseline bench.json --max-regression 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from suno_async_client import AsyncSunoClient
+from suno_client import SunoClient
+from suno_poller import PollProfile, TaskPoller
+
+SCENARIOS = ("sync", "async", "polling", "upload_stream", "upload_base64")
+
+API_KEY = "benchmark"
+
+GENERATE_PARAMS = {
+    "prompt": "A calm piano melody",
+    "customMode": False,
+    "instrumental": True,
+    "model": "V4_5",
+    "callBackUrl": "http://127.0.0.1:9/unused",
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil (nearest-rank) de uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    """Métricas de um cenário a partir das latências individuais (segundos)."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+class MemoryProbe:
+    """Mede o pico de memória Python (tracemalloc, opcional) e o RSS máximo do processo."""
+
+    def __init__(self, trace: bool):
+        self.trace = trace
+        self.result: Dict[str, Any] = {}
+
+    def __enter__(self) -> "MemoryProbe":
+        if self.trace:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.result["python_peak_bytes"] = peak
+        if resource is not None:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss é em KiB no Linux e em bytes no macOS
+            self.result["max_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+
+
+def bench_sync(base_url: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    with SunoClient(api_key=API_KEY, base_url=base_url, pool_size=concurrency) as client:
+        def one(_: int) -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            response = client.generate_music(GENERATE_PARAMS)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if not response.ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+        return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def bench_async(base_url: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    async with AsyncSunoClient(api_key=API_KEY, base_url=base_url, pool_size=concurrency, max_in_flight=concurrency) as client:
+        async def one() -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            response = await client.generate_music(GENERATE_PARAMS)
+            latencies.append(time.perf_counter() - started)
+            if not response.ok:
+                errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def bench_polling(base_url: str, tasks: int, concurrency: int, completion_delay: float) -> Dict[str, Any]:
+    """Tempo desde o watch() até ao resultado, para `tasks` tarefas em simultâneo."""
+    profile = PollProfile(
+        initial_delay=completion_delay / 2,
+        min_interval=max(completion_delay / 20, 0.05),
+        max_interval=max(completion_delay / 4, 0.1),
+    )
+    async with AsyncSunoClient(api_key=API_KEY, base_url=base_url, pool_size=concurrency, max_in_flight=concurrency) as client:
+        created = await asyncio.gather(*(client.generate_music(GENERATE_PARAMS) for _ in range(tasks)))
+        task_ids = [response.json()["data"]["taskId"] for response in created if response.ok]
+        poller = TaskPoller(client, profiles={"generate": profile}, default_timeout=completion_delay * 10 + 30)
+        latencies: List[float] = []
+        errors = tasks - len(task_ids)
+
+        async def one(task_id: str) -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                await poller.watch("generate", task_id)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(task_id) for task_id in task_ids))
+        elapsed = time.perf_counter() - started
+        await poller.close()
+
+    result = summarize(latencies, elapsed, errors)
+    result["polls"] = poller.total_polls
+    result["polls_per_task"] = round(poller.total_polls / len(task_ids), 2) if task_ids else 0.0
+    return result
+
+
+def bench_upload(base_url: str, method: str, size_bytes: int, count: int) -> Dict[str, Any]:
+    """Envia `count` vezes um ficheiro de `size_bytes` com o método de upload indicado."""
+    latencies: List[float] = []
+    errors = 0
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        block = os.urandom(1024 * 1024)
+        remaining = size_bytes
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+        path = f.name
+    try:
+        with SunoClient(api_key=API_KEY, base_url=base_url) as client:
+            upload: Callable[..., Any] = getattr(client, method)
+            started = time.perf_counter()
+            for _ in range(count):
+                request_started = time.perf_counter()
+                response = upload(path, "benchmark")
+                latencies.append(time.perf_counter() - request_started)
+                if not response.ok:
+                    errors += 1
+            elapsed = time.perf_counter() - started
+    finally:
+        os.unlink(path)
+    result = summarize(latencies, elapsed, errors)
+    result["file_bytes"] = size_bytes
+    result["mb_per_s"] = round(size_bytes * count / elapsed / (1024 * 1024), 2) if elapsed > 0 else 0.0
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Arranca o servidor falso num subprocesso e espera que aceite ligações."""
+    port = _free_port()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_suno_server.py")
+    process = subprocess.Popen([
+        sys.executable, script,
+        "--port", str(port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--completion-delay", str(args.completion_delay),
+        "--seed", "1",
+    ], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, f"http://127.0.0.1:{port}/api/v1"
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("fake Suno server did not start")
+
+
+def run_scenario(name: str, base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    with MemoryProbe(args.trace_memory) as memory:
+        if name == "sync":
+            result = bench_sync(base_url, args.requests, args.concurrency)
+        elif name == "async":
+            result = asyncio.run(bench_async(base_url, args.requests, args.concurrency))
+        elif name == "polling":
+            result = asyncio.run(bench_polling(base_url, args.tasks, args.concurrency, args.completion_delay))
+        elif name == "upload_stream":
+            result = bench_upload(base_url, "stream_upload", int(args.upload_mb * 1024 * 1024), args.uploads)
+        else:
+            result = bench_upload(base_url, "base64_upload_stream", int(args.upload_mb * 1024 * 1024), args.uploads)
+    result.update(memory.result)
+    return result
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Lista as regressões de rps e p95 acima de `max_regression` (fração)."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["rps"] and result["rps"] < previous["rps"] * (1 - max_regression):
+            regressions.append(f"{name}: rps {previous['rps']} -> {result['rps']}")
+        if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos clientes Suno contra o servidor falso")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="cenários separados por vírgulas")
+    parser.add_argument("--base-url", help="usar um servidor já em execução em vez de arrancar um")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200, help="tarefas acompanhadas no cenário de polling")
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--upload-mb", type=float, default=16.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--completion-delay", type=float, default=2.0)
+    parser.add_argument("--trace-memory", action="store_true", help="medir o pico de memória com tracemalloc (mais lento)")
+    parser.add_argument("--output", help="ficheiro JSON de saída (por omissão, stdout)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = start_fake_server(args)
+    try:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            },
+            "scenarios": {},
+        }
+        for name in names:
+            report["scenarios"][name] = run_scenario(name, base_url, args)
+            print(f"{name}: {report['scenarios'][name]}", file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Cache TTL/LRU para os endpoints de leitura da Suno API.
+
+Dashboards e retries chamam get_task_info, get_timestamped_lyrics,
+get_remaining_credits e os restantes record-info com os mesmos argumentos
+muitas vezes por segundo. O `ResponseCache` guarda as respostas em memória
+(LRU com limite de entradas) e, opcionalmente, num ficheiro SQLite que
+sobrevive a reinícios.
+
+A validade depende do conteúdo da resposta:
+- tarefas terminadas (SUCCESS ou erro) são imutáveis e ficam em cache sem expirar
+- tarefas em curso, ou record-info sem estado reconhecível (ex.: `data` nulo
+  de uma tarefa ainda não registada), expiram ao fim de poucos segundos
+  (`pending_ttl`)
+- as letras com timestamps (sem estado de tarefa) ficam sem expirar
+- cada endpoint pode ter um TTL próprio (ex.: créditos)
+- respostas de erro (HTTP >= 400 ou `code` != 200) nunca são guardadas
+
+Exemplo:
+    cache = ResponseCache(max_entries=5000, sqlite_path="suno_cache.db")
+    client = SunoClient(api_key="...", cache=cache)
+    client.get_task_info(task_id)
+    print(cache.stats())
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from suno_status import classify_status, extract_status
+
+# TTL (segundos) de cada endpoint enquanto a tarefa está em curso.
+# None = usar `pending_ttl`.
+DEFAULT_TTLS: Dict[str, Optional[float]] = {
+    "/generate/record-info": None,
+    "/suno/cover/record-info": None,
+    "/lyrics/record-info": None,
+    "/wav/record-info": None,
+    "/vocal-removal/record-info": None,
+    "/mp4/record-info": None,
+    "/generate/get-timestamped-lyrics": None,
+    "/generate/credit": 10.0,
+}
+
+# Endpoints cujo resultado não tem estado de tarefa
+STATELESS_PATHS = ("/generate/credit",)
+
+# Endpoints sem estado de tarefa cujo resultado, uma vez devolvido, não muda
+PERMANENT_PATHS = ("/generate/get-timestamped-lyrics",)
+
+
+class CachedResponse(NamedTuple):
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    url: str
+
+
+def make_key(path: str, params: Optional[Dict[str, Any]]) -> str:
+    """Chave canónica de um pedido: caminho + argumentos ordenados."""
+    return path + "?" + json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+class ResponseCache:
+    """Cache de respostas com TTL por endpoint, LRU em memória e SQLite opcional.
+
+    Args:
+      max_entries: número máximo de respostas em memória
+      pending_ttl: segundos de validade de uma tarefa ainda em curso
+      ttls: TTLs por caminho de endpoint (sobrepõem DEFAULT_TTLS)
+      sqlite_path: ficheiro SQLite para a camada persistente (None = só memória)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        pending_ttl: float = 2.0,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.pending_ttl = pending_ttl
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "stores": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, status INTEGER, headers TEXT, content BLOB, url TEXT, expires REAL)"
+            )
+
+    def cacheable(self, path: str) -> bool:
+        """Indica se o endpoint é de leitura e pode ser guardado em cache."""
+        return path in self.ttls
+
+    def get(self, path: str, params: Optional[Dict[str, Any]]) -> Optional[CachedResponse]:
+        """Retorna a resposta guardada ainda válida, ou None."""
+        key = make_key(path, params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return response
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT status, headers, content, url, expires FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and (row[4] is None or row[4] > now):
+                    response = CachedResponse(row[0], json.loads(row[1]), row[2], row[3])
+                    self._remember(key, response, row[4])
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    return response
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, path: str, params: Optional[Dict[str, Any]], response: CachedResponse) -> None:
+        """Guarda a resposta com a validade adequada ao seu conteúdo."""
+        ttl = self._ttl_for(path, response)
+        if ttl is not None and ttl <= 0:
+            return
+        key = make_key(path, params)
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, response, expires)
+            self._counters["stores"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, status, headers, content, url, expires) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response.status_code, json.dumps(response.headers), response.content, response.url, expires),
+                )
+
+    def invalidate(self, path: str, params: Optional[Dict[str, Any]]) -> None:
+        """Remove uma resposta da memória e do disco."""
+        key = make_key(path, params)
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Esvazia a cache (memória e disco)."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def purge_expired(self) -> int:
+        """Remove do SQLite as entradas expiradas; retorna quantas foram removidas."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+            ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acertos/falhas e taxa de acerto."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, response: CachedResponse, expires: Optional[float]) -> None:
+        self._entries[key] = (response, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _ttl_for(self, path: str, response: CachedResponse) -> Optional[float]:
+        """TTL da resposta: None = permanente, 0 = não guardar."""
+        if response.status_code >= 400:
+            return 0
+        try:
+            body = json.loads(response.content)
+        except ValueError:
+            return 0
+        if not isinstance(body, dict) or body.get("code") != 200:
+            return 0
+        endpoint_ttl = self.ttls.get(path)
+        pending_ttl = endpoint_ttl if endpoint_ttl is not None else self.pending_ttl
+        if path in STATELESS_PATHS:
+            return pending_ttl
+        data = body.get("data")
+        if path in PERMANENT_PATHS:
+            return None if data else pending_ttl
+        if isinstance(data, dict):
+            status = extract_status(data)
+            if status is not None and classify_status(status) in ("success", "failure"):
+                return None
+        # Em curso ou sem estado (ex.: tarefa ainda não registada): expira
+        return pending_ttl
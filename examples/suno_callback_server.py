@@ -0,0 +1,218 @@
+"""
+Servidor local de callbacks (callBackUrl) da Suno API.
+
+Todas as funções de geração exigem um `callBackUrl`. O `CallbackServer` é um
+servidor HTTP asyncio embutido (aiohttp.web) que recebe esses POSTs e resolve
+um Future por taskId, pelo que a conclusão de uma tarefa passa a ser
+notificada pela Suno em vez de descoberta por polling.
+
+Se o callback não chegar dentro de `fallback_after` segundos (ex.: URL
+pública inacessível), a tarefa é entregue ao `TaskPoller`, e o primeiro
+resultado a chegar (callback ou polling) resolve o Future.
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    async with AsyncSunoClient(api_key="...") as client, \\
+            CallbackServer(public_url="https://seu-dominio.com", poller=TaskPoller(client)) as server:
+        params["callBackUrl"] = server.callback_url
+        task_id = (await client.generate_music(params)).json()["data"]["taskId"]
+        data = await server.expect("generate", task_id)
+"""
+import asyncio
+import secrets
+from aiohttp import web
+from typing import Any, Dict, Optional, Tuple
+
+from suno_poller import TaskFailedError, TaskPoller
+
+CALLBACK_PATH = "/suno/callback"
+
+# callbackType intermédios dos callbacks de geração de música
+PROGRESS_CALLBACK_TYPES = ("text", "first")
+
+# Máximo de callbacks guardados para tarefas ainda não registadas com expect()
+MAX_EARLY_CALLBACKS = 10000
+
+
+def extract_task_id(data: Dict[str, Any]) -> Optional[str]:
+    """Lê o taskId do `data` de um callback (`task_id` ou `taskId`)."""
+    return data.get("task_id") or data.get("taskId")
+
+
+class CallbackServer:
+    """Recebe callbacks da Suno API e resolve um Future por taskId.
+
+    Args:
+      host: interface onde o servidor escuta
+      port: porta local (0 = escolher uma porta livre)
+      public_url: URL pública que encaminha para este servidor (ex.: túnel);
+                  por omissão, http://host:port
+      poller: poller usado como fallback quando o callback não chega
+      fallback_after: segundos até recorrer ao poller
+      token: segredo incluído no callBackUrl e verificado em cada POST
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        public_url: Optional[str] = None,
+        poller: Optional[TaskPoller] = None,
+        fallback_after: float = 120.0,
+        token: Optional[str] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.poller = poller
+        self.fallback_after = fallback_after
+        self.token = token or secrets.token_urlsafe(16)
+        self.received = 0
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._early: Dict[str, Tuple[Dict[str, Any], Any, Any]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post(CALLBACK_PATH, self._handle)
+
+    async def __aenter__(self) -> "CallbackServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Inicia o servidor HTTP."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Para o servidor e cancela as tarefas ainda à espera."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for _, future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def callback_url(self) -> str:
+        """URL a usar como `callBackUrl` nos pedidos de geração."""
+        base = self.public_url or f"http://{self.host}:{self.port}"
+        return f"{base}{CALLBACK_PATH}?token={self.token}"
+
+    def expect(self, endpoint: str, task_id: str, timeout: Optional[float] = None) -> asyncio.Future:
+        """Retorna um Future resolvido com o `data` do callback de `task_id`.
+
+        Args:
+          endpoint: endpoint record-info usado no fallback ('generate', 'wav', ...)
+          task_id: ID da tarefa retornado pelo pedido de geração
+          timeout: segundos até falhar com TimeoutError (None = sem limite)
+
+        Se o fallback para o poller for usado, o Future é resolvido com o
+        `data` do record-info em vez do `data` do callback.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._pending.get(task_id)
+        if entry is not None:
+            return entry[1]
+        future = loop.create_future()
+        self._pending[task_id] = (endpoint, future)
+
+        early = self._early.pop(task_id, None)
+        if early is not None:
+            # O callback chegou antes de o chamador registar a tarefa
+            self._complete(task_id, *early)
+            return future
+
+        if self.poller is not None:
+            self._timers[task_id] = loop.call_later(self.fallback_after, self._fallback, task_id)
+        if timeout is not None:
+            loop.call_later(timeout, self._expire, task_id)
+        return future
+
+    @property
+    def pending(self) -> int:
+        """Número de tarefas à espera de callback."""
+        return len(self._pending)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        if request.query.get("token") != self.token:
+            return web.json_response({"status": "forbidden"}, status=403)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"status": "invalid"}, status=400)
+        self.received += 1
+
+        data = body.get("data") or {}
+        task_id = extract_task_id(data)
+        if task_id and data.get("callbackType") not in PROGRESS_CALLBACK_TYPES:
+            self._complete(task_id, data, body.get("code"), body.get("msg"))
+        # A Suno espera sempre 200 para não reenviar o callback
+        return web.json_response({"status": "received"})
+
+    def _complete(self, task_id: str, data: Dict[str, Any], code: Any = 200, msg: Any = None) -> None:
+        entry = self._pending.pop(task_id, None)
+        if entry is None:
+            if len(self._early) >= MAX_EARLY_CALLBACKS:
+                self._early.pop(next(iter(self._early)))
+            self._early[task_id] = (data, code, msg)
+            return
+        endpoint, future = entry
+        timer = self._timers.pop(task_id, None)
+        if timer is not None:
+            timer.cancel()
+        if future.done():
+            return
+        if code == 200 and data.get("callbackType") != "error":
+            future.set_result(data)
+            if self.poller is not None:
+                self.poller.resolve(endpoint, task_id, data)
+        else:
+            future.set_exception(TaskFailedError(endpoint, task_id, msg or code, data))
+            if self.poller is not None:
+                self.poller.cancel(endpoint, task_id)
+
+    def _fallback(self, task_id: str) -> None:
+        self._timers.pop(task_id, None)
+        entry = self._pending.get(task_id)
+        if entry is None or entry[1].done():
+            return
+        endpoint, future = entry
+        polled = self.poller.watch(endpoint, task_id, initial_delay=0)
+
+        def transfer(done: asyncio.Future) -> None:
+            self._pending.pop(task_id, None)
+            if future.done() or done.cancelled():
+                return
+            if done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                future.set_result(done.result())
+
+        polled.add_done_callback(transfer)
+
+    def _expire(self, task_id: str) -> None:
+        entry = self._pending.pop(task_id, None)
+        if entry is None:
+            return
+        endpoint, future = entry
+        timer = self._timers.pop(task_id, None)
+        if timer is not None:
+            timer.cancel()
+        if self.poller is not None:
+            self.poller.cancel(endpoint, task_id)
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError(f"callback for {task_id} timed out"))
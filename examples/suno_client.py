@@ -0,0 +1,374 @@
+"""
+Cliente Suno API com sessão HTTP partilhada.
+
+O `SunoClient` agrupa os 24 endpoints de `suno_api_examples.py` numa classe
+que mantém um `requests.Session` com pool de ligações keep-alive, timeouts
+por pedido e retry com backoff exponencial em respostas 405/429/5xx.
+Reutilizar o cliente evita pagar o handshake TCP+TLS em cada chamada.
+
+Requisitos:
+- Instale a biblioteca `requests` (ex.: pip install requests).
+
+Os métodos retornam um `SunoResponse` (subclasse do Response da biblioteca
+requests, ver `suno_result.py`), tal como as funções de `suno_api_examples.py`,
+com `json()` descodificado uma só vez.
+
+Exemplo:
+    with SunoClient(api_key="...", pool_size=20) as client:
+        response = client.generate_music({...})
+        task_id = response.json()["data"]["taskId"]
+"""
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Callable, Optional, Tuple, Union
+
+from suno_cache import CachedResponse, ResponseCache
+from suno_dedupe import RequestCoalescer
+from suno_metrics import MetricsRecorder, RequestSample, reset_connect_time, take_connect_time, time_connections
+from suno_ratelimit import RateLimiter
+from suno_result import SunoResponse, as_suno_response
+from suno_upload import Base64JsonStream, MultipartFileStream, ProgressCallback, UploadSource, source_name, source_size
+
+API_BASE_URL = "https://api.sunoapi.org/api/v1"
+
+# Até este tamanho, upload() envia em base64 (um só pedido JSON, sem multipart)
+BASE64_UPLOAD_MAX_BYTES = 2 * 1024 * 1024
+
+# 405 = limite de pedidos excedido, 429 = créditos insuficientes / rate limit
+RETRY_STATUSES = (405, 429, 500, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class PostSafeRetry(Retry):
+    """Retry que, nos POST, só repete por código de estado ou falha ao ligar.
+
+    Um timeout de leitura ou uma ligação cortada depois de o corpo ser enviado
+    não é repetido: o pedido pode já ter sido aceite (e ter gasto créditos).
+    Os GET continuam a ser repetidos em qualquer erro.
+    """
+
+    def increment(self, method: Optional[str] = None, url: Optional[str] = None, *args: Any, **kwargs: Any) -> Retry:
+        if method == "POST":
+            # read=False volta a lançar o erro original (ex.: ReadTimeout)
+            return Retry.increment(self.new(read=False, other=0), method, url, *args, **kwargs)
+        return super().increment(method, url, *args, **kwargs)
+
+
+def _response_from_cache(cached: CachedResponse) -> requests.Response:
+    """Reconstrói um requests.Response a partir de uma entrada da cache."""
+    response = SunoResponse()
+    response.status_code = cached.status_code
+    response.headers = CaseInsensitiveDict(cached.headers)
+    response._content = cached.content
+    response.url = cached.url
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+class SunoClient:
+    """Cliente Suno API com pool de ligações keep-alive e retry.
+
+    Args:
+      api_key: token Bearer da Suno API
+      base_url: URL base da API (ex.: https://api.sunoapi.org/api/v1)
+      pool_size: número máximo de ligações mantidas abertas por host
+      timeout: timeout por pedido em segundos, ou tupla (connect, read)
+      max_retries: número máximo de novas tentativas por pedido
+      backoff_factor: fator do backoff exponencial entre tentativas
+      cache: cache opcional para os endpoints de leitura (ver `suno_cache.py`)
+      rate_limiter: limitador opcional; os pedidos esperam localmente pela sua vez
+      metrics: recolha opcional de métricas por endpoint (ver `suno_metrics.py`)
+      dedupe: agrupamento opcional de pedidos de geração duplicados (ver `suno_dedupe.py`)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = API_BASE_URL,
+        pool_size: int = 10,
+        timeout: Timeout = (5.0, 60.0),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        dedupe: Optional[RequestCoalescer] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.upload_base_url = self.base_url.replace("/api/v1", "")
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.dedupe = dedupe
+
+        retry = PostSafeRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        if metrics is not None:
+            time_connections(adapter)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Connection": "keep-alive",
+        })
+
+    def __enter__(self) -> "SunoClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha todas as ligações do pool."""
+        self.session.close()
+
+    def _send(self, method: str, path: str, url: str, **kwargs: Any) -> requests.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(path)
+        if self.metrics is None:
+            return as_suno_response(self.session.request(method, url, timeout=self.timeout, **kwargs))
+
+        reset_connect_time()
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as error:
+            self.metrics.record(RequestSample(
+                path, method, 0, take_connect_time(), 0.0, time.perf_counter() - started, 0, 0, 0, type(error).__name__
+            ))
+            raise
+        retries = getattr(response.raw, "retries", None)
+        self.metrics.record(RequestSample(
+            endpoint=path,
+            method=method,
+            status=response.status_code,
+            connect_s=take_connect_time(),
+            ttfb_s=response.elapsed.total_seconds(),
+            total_s=time.perf_counter() - started,
+            bytes_sent=int(response.request.headers.get("Content-Length") or 0),
+            bytes_received=len(response.content),
+            retries=len(retries.history) if retries is not None else 0,
+        ))
+        return as_suno_response(response)
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        return self._cached(path, params, lambda: self._send("GET", path, f"{self.base_url}{path}", params=params))
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> requests.Response:
+        send = lambda: self._cached(path, payload, lambda: self._send("POST", path, f"{self.base_url}{path}", json=payload))
+        if self.dedupe is not None and self.dedupe.applies(path):
+            return self.dedupe.run(path, payload, send)
+        return send()
+
+    def _cached(self, path: str, params: Optional[Dict[str, Any]], send: Callable[[], requests.Response]) -> requests.Response:
+        """Serve o pedido a partir da cache quando o endpoint é de leitura."""
+        if self.cache is None or not self.cache.cacheable(path):
+            return send()
+        cached = self.cache.get(path, params)
+        if cached is not None:
+            return _response_from_cache(cached)
+        response = send()
+        self.cache.put(path, params, CachedResponse(response.status_code, dict(response.headers), response.content, response.url))
+        return response
+
+    def _post_upload(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._send("POST", path, f"{self.upload_base_url}{path}", **kwargs)
+
+    # 1. Geração de música
+    def generate_music(self, params: Dict[str, Any]) -> requests.Response:
+        """Cria uma música com base nos parâmetros fornecidos."""
+        return self._post("/generate", params)
+
+    # 2. Extensão de música
+    def extend_music(self, params: Dict[str, Any]) -> requests.Response:
+        """Estende uma música existente."""
+        return self._post("/generate/extend", params)
+
+    # 3. Upload e cover de áudio
+    def upload_cover(self, params: Dict[str, Any]) -> requests.Response:
+        """Carrega um áudio e gera um cover."""
+        return self._post("/generate/upload-cover", params)
+
+    # 4. Upload e extensão de áudio
+    def upload_extend(self, params: Dict[str, Any]) -> requests.Response:
+        """Carrega um áudio e o estende."""
+        return self._post("/generate/upload-extend", params)
+
+    # 5. Adicionar instrumental
+    def add_instrumental(self, params: Dict[str, Any]) -> requests.Response:
+        """Gera um acompanhamento instrumental."""
+        return self._post("/generate/add-instrumental", params)
+
+    # 6. Adicionar vocais
+    def add_vocals(self, params: Dict[str, Any]) -> requests.Response:
+        """Adiciona vocais a um instrumental existente."""
+        return self._post("/generate/add-vocals", params)
+
+    # 7. Obter detalhes de uma tarefa (poll)
+    def get_task_info(self, task_id: str) -> requests.Response:
+        """Recupera informações detalhadas de uma geração de música."""
+        return self._get("/generate/record-info", {"taskId": task_id})
+
+    # 8. Obter letras com timestamps
+    def get_timestamped_lyrics(self, params: Dict[str, Any]) -> requests.Response:
+        """Obtém letras sincronizadas com tempo."""
+        return self._post("/generate/get-timestamped-lyrics", params)
+
+    # 9. Potenciar estilo musical
+    def boost_music_style(self, content: str) -> requests.Response:
+        """Gera um estilo potenciado (modelos V4_5+)."""
+        return self._post("/style/generate", {"content": content})
+
+    # 10. Gerar persona
+    def generate_persona(self, params: Dict[str, Any]) -> requests.Response:
+        """Cria uma persona personalizada."""
+        return self._post("/generate/generate-persona", params)
+
+    # 11. Gerar capa de música
+    def generate_music_cover(self, task_id: str, callback_url: str) -> requests.Response:
+        """Solicita geração de capa."""
+        return self._post("/suno/cover/generate", {"taskId": task_id, "callBackUrl": callback_url})
+
+    # 12. Obter detalhes da capa
+    def get_music_cover_info(self, task_id: str) -> requests.Response:
+        return self._get("/suno/cover/record-info", {"taskId": task_id})
+
+    # 13. Gerar letras
+    def generate_lyrics(self, prompt: str, callback_url: str) -> requests.Response:
+        return self._post("/lyrics", {"prompt": prompt, "callBackUrl": callback_url})
+
+    # 14. Obter detalhes das letras
+    def get_lyrics_info(self, task_id: str) -> requests.Response:
+        return self._get("/lyrics/record-info", {"taskId": task_id})
+
+    # 15. Converter para WAV
+    def convert_to_wav(self, task_id: str, audio_id: str, callback_url: str) -> requests.Response:
+        payload = {"taskId": task_id, "audioId": audio_id, "callBackUrl": callback_url}
+        return self._post("/wav/generate", payload)
+
+    # 16. Obter detalhes do WAV
+    def get_wav_info(self, task_id: str) -> requests.Response:
+        return self._get("/wav/record-info", {"taskId": task_id})
+
+    # 17. Separação de vocais / stems
+    def vocal_removal(self, params: Dict[str, Any]) -> requests.Response:
+        """Separa vocal/instrumento ou múltiplos stems."""
+        return self._post("/vocal-removal/generate", params)
+
+    # 18. Obter detalhes da separação
+    def get_vocal_removal_info(self, task_id: str) -> requests.Response:
+        return self._get("/vocal-removal/record-info", {"taskId": task_id})
+
+    # 19. Criar vídeo musical
+    def create_music_video(self, task_id: str, audio_id: str, callback_url: str, author: Optional[str] = None, domain_name: Optional[str] = None) -> requests.Response:
+        payload = {
+            "taskId": task_id,
+            "audioId": audio_id,
+            "callBackUrl": callback_url
+        }
+        if author:
+            payload["author"] = author
+        if domain_name:
+            payload["domainName"] = domain_name
+        return self._post("/mp4/generate", payload)
+
+    # 20. Obter detalhes do vídeo
+    def get_music_video_info(self, task_id: str) -> requests.Response:
+        return self._get("/mp4/record-info", {"taskId": task_id})
+
+    # 21. Consultar saldo de créditos
+    def get_remaining_credits(self) -> requests.Response:
+        return self._get("/generate/credit")
+
+    # 22. Upload Base64
+    def base64_upload(self, base64_data: str, upload_path: str, file_name: Optional[str] = None) -> requests.Response:
+        payload = {
+            "base64Data": base64_data,
+            "uploadPath": upload_path
+        }
+        if file_name:
+            payload["fileName"] = file_name
+        return self._post_upload("/api/file-base64-upload", json=payload)
+
+    # 23. Upload via stream
+    def stream_upload(self, file_path: UploadSource, upload_path: str, file_name: Optional[str] = None, progress: Optional[ProgressCallback] = None) -> requests.Response:
+        """Envia o ficheiro em streaming, sem carregar o corpo multipart em memória.
+
+        Args:
+          progress: função opcional chamada com (bytes_enviados, total)
+        """
+        data = {
+            "uploadPath": upload_path
+        }
+        if file_name:
+            data["fileName"] = file_name
+        with MultipartFileStream(file_path, data, file_name=file_name, progress=progress) as body:
+            return self._post_upload("/api/file-stream-upload", data=body, headers={"Content-Type": body.content_type})
+
+    # 22b. Upload Base64 em streaming
+    def base64_upload_stream(self, source: UploadSource, upload_path: str, file_name: Optional[str] = None, progress: Optional[ProgressCallback] = None) -> requests.Response:
+        """Envia para file-base64-upload codificando a origem em blocos.
+
+        Equivalente a `base64_upload`, mas a string base64 nunca é montada em
+        memória: o corpo JSON é gerado à medida que é enviado.
+
+        Args:
+          source: caminho, ficheiro binário ou buffer
+          progress: função opcional chamada com (bytes_enviados, total)
+        """
+        fields = {"uploadPath": upload_path}
+        if file_name:
+            fields["fileName"] = file_name
+        with Base64JsonStream(source, fields, progress=progress) as body:
+            return self._post_upload("/api/file-base64-upload", data=body, headers={"Content-Type": body.content_type})
+
+    # 24. Upload via URL
+    def url_upload(self, file_url: str, upload_path: str, file_name: Optional[str] = None) -> requests.Response:
+        payload = {
+            "fileUrl": file_url,
+            "uploadPath": upload_path
+        }
+        if file_name:
+            payload["fileName"] = file_name
+        return self._post_upload("/api/file-url-upload", json=payload)
+
+    # Upload com escolha automática da estratégia
+    def upload(self, source: UploadSource, upload_path: str, file_name: Optional[str] = None, progress: Optional[ProgressCallback] = None, base64_max_bytes: int = BASE64_UPLOAD_MAX_BYTES) -> requests.Response:
+        """Envia um ficheiro escolhendo o endpoint de upload mais barato.
+
+        - URL http(s): `url_upload` (a Suno descarrega o ficheiro diretamente)
+        - até `base64_max_bytes`: `base64_upload_stream` (um pedido JSON)
+        - acima disso: `stream_upload` (multipart em streaming)
+
+        Em nenhum caso o ficheiro é carregado inteiro em memória.
+
+        Args:
+          source: URL, caminho, ficheiro binário ou buffer
+          upload_path: pasta de destino no armazenamento da Suno
+          file_name: nome do ficheiro (por omissão, o da origem)
+          progress: função opcional chamada com (bytes_enviados, total)
+        """
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            return self.url_upload(source, upload_path, file_name)
+        file_name = file_name or source_name(source)
+        if source_size(source) <= base64_max_bytes:
+            return self.base64_upload_stream(source, upload_path, file_name, progress)
+        return self.stream_upload(source, upload_path, file_name, progress)
@@ -0,0 +1,184 @@
+"""
+Agrupamento de pedidos duplicados (singleflight) para os endpoints pagos.
+
+Duplos cliques e retries do lado do cliente enviam muitas vezes o mesmo
+payload para generate_music, convert_to_wav ou vocal_removal, e cada envio
+gasta créditos. A Suno API não aceita uma chave de idempotência, por isso o
+`RequestCoalescer` faz a deduplicação do nosso lado:
+
+- o payload é canonicalizado (JSON com chaves ordenadas) e resumido em SHA-256
+- chamadas idênticas em simultâneo partilham um único pedido em curso
+- respostas bem-sucedidas ficam memorizadas durante `window` segundos, e uma
+  chamada idêntica dentro dessa janela recebe a mesma resposta (o mesmo taskId)
+- erros não são memorizados: a chamada seguinte volta a tentar
+
+A API dos clientes não muda: basta `SunoClient(dedupe=RequestCoalescer())` ou
+`AsyncSunoClient(dedupe=...)`.
+
+Exemplo:
+    client = SunoClient(api_key="...", dedupe=RequestCoalescer(window=60))
+    a = client.generate_music(params)
+    b = client.generate_music(dict(params))  # mesma resposta, sem novo pedido
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Endpoints que criam tarefas (e gastam créditos)
+DEDUPE_PATHS = (
+    "/generate",
+    "/generate/extend",
+    "/generate/upload-cover",
+    "/generate/upload-extend",
+    "/generate/add-instrumental",
+    "/generate/add-vocals",
+    "/generate/generate-persona",
+    "/style/generate",
+    "/suno/cover/generate",
+    "/lyrics",
+    "/wav/generate",
+    "/vocal-removal/generate",
+    "/mp4/generate",
+)
+
+
+def payload_key(path: str, payload: Optional[Dict[str, Any]]) -> str:
+    """SHA-256 do caminho e do payload canonicalizado."""
+    canonical = json.dumps(payload or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{path}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+def _succeeded(response: Any) -> bool:
+    if getattr(response, "status_code", 500) >= 400:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get("code") == 200
+
+
+class _Flight:
+    """Pedido síncrono em curso, partilhado pelas threads que esperam por ele."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Partilha pedidos idênticos em curso e memoriza os resultados recentes.
+
+    Args:
+      window: segundos durante os quais uma resposta bem-sucedida é reutilizada
+      max_entries: número máximo de respostas memorizadas
+      paths: endpoints abrangidos (por omissão, DEDUPE_PATHS)
+    """
+
+    def __init__(self, window: float = 30.0, max_entries: int = 10000, paths: Tuple[str, ...] = DEDUPE_PATHS):
+        self.window = window
+        self.max_entries = max_entries
+        self.paths = frozenset(paths)
+        self.coalesced = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._recent: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, asyncio.Future] = {}
+
+    def applies(self, path: str) -> bool:
+        return path in self.paths
+
+    def run(self, path: str, payload: Optional[Dict[str, Any]], send: Callable[[], Any]) -> Any:
+        """Executa `send()` uma única vez por payload (versão com threads)."""
+        key = payload_key(path, payload)
+        with self._lock:
+            recent = self._lookup(key)
+            if recent is not None:
+                return recent
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = send()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None:
+                    self._remember(key, flight.result)
+            flight.done.set()
+        return flight.result
+
+    async def run_async(self, path: str, payload: Optional[Dict[str, Any]], send: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de `run`."""
+        key = payload_key(path, payload)
+        with self._lock:
+            recent = self._lookup(key)
+        if recent is not None:
+            return recent
+        flight = self._async_flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            # shield: o cancelamento de um seguidor não cancela o pedido partilhado
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._async_flights[key] = flight
+        try:
+            result = await send()
+        except BaseException as error:
+            if isinstance(error, asyncio.CancelledError):
+                flight.cancel()
+            elif not flight.done():
+                flight.set_exception(error)
+                # Evitar "exception was never retrieved" quando não há seguidores
+                flight.exception()
+            raise
+        finally:
+            self._async_flights.pop(key, None)
+        with self._lock:
+            self._remember(key, result)
+        flight.set_result(result)
+        return result
+
+    def forget(self, path: str, payload: Optional[Dict[str, Any]]) -> None:
+        """Esquece a resposta memorizada de um payload (ex.: para forçar um novo pedido)."""
+        with self._lock:
+            self._recent.pop(payload_key(path, payload), None)
+
+    def _lookup(self, key: str) -> Any:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            del self._recent[key]
+            return None
+        self.replayed += 1
+        return response
+
+    def _remember(self, key: str, response: Any) -> None:
+        if self.window <= 0 or not _succeeded(response):
+            return
+        self._recent[key] = (time.monotonic() + self.window, response)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
@@ -0,0 +1,361 @@
+"""
+Download paralelo dos ficheiros gerados pela Suno API (MP3, WAV, stems, MP4).
+
+Os record-info de geração, WAV, separação de vocais e vídeo devolvem URLs
+(audioUrl, audioWavUrl, vocalUrl, videoUrl, ...) que costumam ser descarregados
+um a um com um GET do corpo inteiro. O `Downloader`:
+
+- descarrega muitos ficheiros em simultâneo (`max_files`)
+- divide ficheiros grandes em pedidos HTTP Range paralelos (`connections_per_file`)
+- escreve cada bloco diretamente na sua posição do ficheiro (pré-alocado,
+  `os.pwrite`), sem guardar ficheiros inteiros em memória
+- retoma downloads interrompidos: os segmentos concluídos ficam registados em
+  `<destino>.part.json` e não voltam a ser pedidos
+- verifica o tamanho final e, opcionalmente, o SHA-256
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    data = await poller.watch("wav", task_id)
+    async with Downloader() as downloader:
+        results = await downloader.download_record("wav", data, "downloads/")
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import aiohttp
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_SEGMENT_SIZE = 8 * 1024 * 1024
+
+# Campos com URLs de ficheiros em `data.response` de cada record-info
+ASSET_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "generate": ("audioUrl",),
+    "wav": ("audioWavUrl", "audio_wav_url"),
+    "vocal-removal": (
+        "vocalUrl", "instrumentalUrl", "backingVocalsUrl", "drumsUrl", "bassUrl", "guitarUrl",
+        "keyboardUrl", "percussionUrl", "stringsUrl", "synthUrl", "fxUrl", "brassUrl", "woodwindsUrl",
+    ),
+    "mp4": ("videoUrl", "video_url"),
+    "cover": ("images",),
+}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class Asset(NamedTuple):
+    """Ficheiro a descarregar."""
+    url: str
+    file_name: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+
+class DownloadResult(NamedTuple):
+    path: str
+    size: int
+    sha256: Optional[str]
+    resumed_bytes: int
+
+
+class DownloadError(Exception):
+    """O download falhou ou o ficheiro não corresponde ao esperado."""
+
+
+def _file_name(url: str, fallback: str) -> str:
+    name = os.path.basename(urlparse(url).path)
+    return name or fallback
+
+
+def record_assets(endpoint: str, data: Dict[str, Any]) -> List[Asset]:
+    """Lista os ficheiros referidos pelo `data` de um record-info concluído.
+
+    Args:
+      endpoint: 'generate', 'wav', 'vocal-removal', 'mp4' ou 'cover'
+      data: `data` devolvido pelo record-info (ou pelo TaskPoller)
+    """
+    response = data.get("response") or {}
+    task_id = data.get("taskId") or data.get("task_id") or "asset"
+    assets: List[Asset] = []
+    if endpoint == "generate":
+        for index, track in enumerate(response.get("sunoData") or []):
+            url = track.get("audioUrl")
+            if url:
+                assets.append(Asset(url, _file_name(url, f"{track.get('id') or task_id}-{index}.mp3")))
+        return assets
+    for field in ASSET_FIELDS.get(endpoint, ()):
+        value = response.get(field)
+        for url in value if isinstance(value, list) else [value]:
+            if isinstance(url, str) and url.startswith(("http://", "https://")):
+                assets.append(Asset(url, _file_name(url, f"{task_id}-{field}")))
+    return assets
+
+
+def _write_at(fd: int, data: bytes, offset: int, lock: threading.Lock) -> None:
+    if hasattr(os, "pwrite"):
+        os.pwrite(fd, data, offset)
+        return
+    # Windows: sem pwrite, serializar seek + write
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+def _sha256_file(path: str, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _State:
+    """Segmentos já escritos de um download, persistidos em `<destino>.part.json`."""
+
+    def __init__(self, path: str, url: str, size: int, validator: Optional[str]):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.validator = validator
+        self.done: List[Tuple[int, int]] = []
+
+    @classmethod
+    def load(cls, path: str, url: str, size: int, validator: Optional[str]) -> "_State":
+        state = cls(path, url, size, validator)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return state
+        if saved.get("url") == url and saved.get("size") == size and saved.get("validator") == validator:
+            state.done = [tuple(segment) for segment in saved.get("done", [])]
+        return state
+
+    def completed_bytes(self) -> int:
+        return sum(end - start for start, end in self.done)
+
+    def mark(self, start: int, end: int) -> None:
+        self.done.append((start, end))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": self.url, "size": self.size, "validator": self.validator, "done": self.done}, f)
+        os.replace(tmp_path, self.path)
+
+
+class Downloader:
+    """Downloads concorrentes, com pedidos Range paralelos e retoma.
+
+    Args:
+      session: sessão aiohttp a usar (por omissão, uma sessão própria sem
+               o cabeçalho Authorization da Suno)
+      max_files: número máximo de ficheiros a descarregar em simultâneo
+      connections_per_file: pedidos Range paralelos por ficheiro
+      segment_size: tamanho de cada segmento Range (ficheiros menores usam um só pedido)
+      chunk_size: tamanho dos blocos lidos da rede e escritos no disco
+      max_retries: novas tentativas por segmento em erros de rede
+      checksum: calcular o SHA-256 do ficheiro final
+    """
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_files: int = 8,
+        connections_per_file: int = 4,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = 3,
+        checksum: bool = True,
+    ):
+        self._session = session
+        self._owns_session = session is None
+        self.connections_per_file = connections_per_file
+        self.segment_size = segment_size
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.checksum = checksum
+        self._files = asyncio.Semaphore(max_files)
+        self._write_lock = threading.Lock()
+
+    async def __aenter__(self) -> "Downloader":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=60))
+        return self._session
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def download_record(self, endpoint: str, data: Dict[str, Any], directory: str, progress: Optional[ProgressCallback] = None) -> List[DownloadResult]:
+        """Descarrega todos os ficheiros de um record-info para `directory`."""
+        assets = record_assets(endpoint, data)
+        return await self.download_all(assets, directory, progress)
+
+    async def download_all(self, assets: List[Asset], directory: str, progress: Optional[ProgressCallback] = None) -> List[DownloadResult]:
+        """Descarrega vários ficheiros em paralelo; o resultado segue a ordem de `assets`."""
+        os.makedirs(directory, exist_ok=True)
+        return list(await asyncio.gather(*(
+            self.download(asset.url, os.path.join(directory, asset.file_name), asset.size, asset.sha256, progress)
+            for asset in assets
+        )))
+
+    async def download(
+        self,
+        url: str,
+        path: str,
+        expected_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> DownloadResult:
+        """Descarrega `url` para `path`, retomando um download parcial se existir.
+
+        Args:
+          url: URL do ficheiro
+          path: caminho de destino (escrito em `<path>.part` e renomeado no fim)
+          expected_size: tamanho esperado em bytes (verificado no fim)
+          sha256: hash esperado (hex); força o cálculo do SHA-256
+          progress: função chamada com (bytes_escritos, total)
+        """
+        async with self._files:
+            size, ranges, validator = await self._probe(url)
+            if expected_size is not None and size is not None and size != expected_size:
+                raise DownloadError(f"{url}: server reports {size} bytes, expected {expected_size}")
+
+            part_path = f"{path}.part"
+            state_path = f"{part_path}.json"
+            if size is not None and ranges:
+                state = _State.load(state_path, url, size, validator)
+                if not state.done or not os.path.exists(part_path):
+                    state = _State(state_path, url, size, validator)
+                resumed = state.completed_bytes()
+                await self._download_ranges(url, part_path, state, progress)
+            else:
+                # Sem suporte a Range: um só GET, sem retoma
+                resumed = 0
+                size = await self._download_whole(url, part_path, progress)
+
+            actual = os.path.getsize(part_path)
+            if actual != (expected_size if expected_size is not None else size):
+                raise DownloadError(f"{url}: downloaded {actual} bytes, expected {expected_size or size}")
+            digest = None
+            if self.checksum or sha256:
+                digest = await asyncio.get_running_loop().run_in_executor(None, _sha256_file, part_path, self.chunk_size)
+                if sha256 and digest != sha256.lower():
+                    os.remove(part_path)
+                    if os.path.exists(state_path):
+                        os.remove(state_path)
+                    raise DownloadError(f"{url}: sha256 mismatch ({digest} != {sha256})")
+            os.replace(part_path, path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            return DownloadResult(path, actual, digest, resumed)
+
+    async def _probe(self, url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+        """Descobre tamanho, suporte a Range e ETag/Last-Modified com um GET de 1 byte."""
+        async with self.session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            if response.status >= 400:
+                raise DownloadError(f"{url}: HTTP {response.status}")
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            content_range = response.headers.get("Content-Range", "")
+            if response.status == 206 and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                if total.isdigit():
+                    return int(total), True, validator
+            length = response.headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() and response.status == 200 else None), False, validator
+
+    async def _download_ranges(self, url: str, part_path: str, state: _State, progress: Optional[ProgressCallback]) -> None:
+        pending = []
+        done = sorted(state.done)
+        for start in range(0, state.size, self.segment_size):
+            end = min(start + self.segment_size, state.size)
+            if (start, end) not in done:
+                pending.append((start, end))
+
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            if os.fstat(fd).st_size != state.size:
+                # Pré-alocar o ficheiro para que cada segmento escreva na sua posição
+                if hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(fd, 0, state.size)
+                    except OSError:
+                        os.ftruncate(fd, state.size)
+                else:
+                    os.ftruncate(fd, state.size)
+            written = [state.completed_bytes()]
+            queue: asyncio.Queue = asyncio.Queue()
+            for segment in pending:
+                queue.put_nowait(segment)
+
+            async def worker() -> None:
+                while not queue.empty():
+                    start, end = queue.get_nowait()
+                    await self._fetch_segment(url, fd, start, end, written, state.size, progress)
+                    state.mark(start, end)
+
+            workers = [asyncio.ensure_future(worker()) for _ in range(min(self.connections_per_file, len(pending)))]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # Parar os restantes segmentos antes de fechar o ficheiro
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+        finally:
+            os.close(fd)
+
+    async def _fetch_segment(self, url: str, fd: int, start: int, end: int, written: List[int], total: int, progress: Optional[ProgressCallback]) -> None:
+        attempt = 0
+        offset = start
+        while True:
+            try:
+                async with self.session.get(url, headers={"Range": f"bytes={offset}-{end - 1}"}) as response:
+                    if response.status >= 500 or response.status == 429:
+                        raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
+                    if response.status != 206:
+                        raise DownloadError(f"{url}: expected 206 for range {offset}-{end - 1}, got {response.status}")
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        chunk = chunk[:end - offset]
+                        # Escrita síncrona: blocos pequenos vão para a page cache sem bloquear o loop de forma visível
+                        _write_at(fd, chunk, offset, self._write_lock)
+                        offset += len(chunk)
+                        written[0] += len(chunk)
+                        if progress is not None:
+                            progress(written[0], total)
+                if offset < end:
+                    raise aiohttp.ClientPayloadError(f"range {start}-{end - 1} ended at {offset}")
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Retomar o segmento a partir do último byte escrito
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(0.5 * (2 ** attempt))
+
+    async def _download_whole(self, url: str, part_path: str, progress: Optional[ProgressCallback]) -> int:
+        async with self.session.get(url) as response:
+            if response.status >= 400:
+                raise DownloadError(f"{url}: HTTP {response.status}")
+            total = response.content_length or 0
+            written = 0
+            with open(part_path, "wb") as f:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if progress is not None:
+                        progress(written, total or written)
+        return written
@@ -0,0 +1,212 @@
+"""
+Índice compacto para letras com timestamps (get_timestamped_lyrics).
+
+A resposta de get_timestamped_lyrics traz um dict por palavra
+(`alignedWords: [{"word", "startS", "endS", ...}]`), e procurar a palavra
+atual percorrendo essa lista em cada frame custa O(n). O `LyricsIndex` guarda
+as mesmas informações em arrays paralelos:
+
+- `starts` / `ends`: array('d') com os tempos de cada palavra
+- `word_ids`: array('I') com o índice de cada palavra numa tabela de palavras
+  únicas (strings internadas com sys.intern, partilhadas entre faixas)
+
+A palavra num instante é encontrada por procura binária (O(log n)), várias
+consultas ordenadas são resolvidas numa só passagem, e as letras podem ser
+exportadas em SRT, LRC ou WebVTT. `to_bytes()`/`from_bytes()` produzem uma
+representação binária compacta, barata de guardar em cache para milhares
+de faixas.
+
+Exemplo:
+    body = client.get_timestamped_lyrics({"taskId": task_id, "audioId": audio_id}).json()
+    index = LyricsIndex.from_response(body)
+    index.word_at(12.3)
+    open("song.srt", "w").write(index.to_srt())
+"""
+import bisect
+import re
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Cabeçalho da serialização: magic, nº de palavras, nº de palavras únicas
+_MAGIC = b"SLX1"
+_HEADER = struct.Struct("<4sII")
+
+# Marcadores de secção como [Verse], [Chorus 2]
+_SECTION = re.compile(r"\[[^\]]*\]")
+
+Line = Tuple[float, float, str]
+
+
+def _clean(word: str) -> str:
+    return _SECTION.sub("", word).strip()
+
+
+def _clock(seconds: float, separator: str) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class LyricsIndex:
+    """Palavras com timestamps em arrays paralelos, ordenadas pelo início.
+
+    Args:
+      starts: início de cada palavra (segundos)
+      ends: fim de cada palavra (segundos)
+      word_ids: índice de cada palavra em `words`
+      words: tabela de palavras únicas
+    """
+
+    __slots__ = ("starts", "ends", "word_ids", "words")
+
+    def __init__(self, starts: array, ends: array, word_ids: array, words: List[str]):
+        self.starts = starts
+        self.ends = ends
+        self.word_ids = word_ids
+        self.words = words
+
+    @classmethod
+    def from_words(cls, aligned_words: Iterable[Dict[str, Any]]) -> "LyricsIndex":
+        """Constrói o índice a partir da lista `alignedWords`."""
+        entries = sorted(
+            (float(item["startS"]), float(item["endS"]), item.get("word") or "")
+            for item in aligned_words
+        )
+        table: Dict[str, int] = {}
+        words: List[str] = []
+        starts, ends, word_ids = array("d"), array("d"), array("I")
+        for start, end, word in entries:
+            word_id = table.get(word)
+            if word_id is None:
+                word_id = table[word] = len(words)
+                words.append(sys.intern(word))
+            starts.append(start)
+            ends.append(end)
+            word_ids.append(word_id)
+        return cls(starts, ends, word_ids, words)
+
+    @classmethod
+    def from_response(cls, body: Dict[str, Any]) -> "LyricsIndex":
+        """Constrói o índice a partir do JSON de get_timestamped_lyrics (corpo ou `data`)."""
+        data = body.get("data", body) if isinstance(body, dict) else {}
+        return cls.from_words((data or {}).get("alignedWords") or [])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def word(self, index: int) -> str:
+        return self.words[self.word_ids[index]]
+
+    def index_at(self, seconds: float) -> int:
+        """Índice da palavra a ser cantada em `seconds`, ou -1."""
+        i = bisect.bisect_right(self.starts, seconds) - 1
+        if i >= 0 and seconds < self.ends[i]:
+            return i
+        return -1
+
+    def word_at(self, seconds: float) -> Optional[str]:
+        """Palavra a ser cantada em `seconds`, ou None entre palavras."""
+        i = self.index_at(seconds)
+        return self.word(i) if i >= 0 else None
+
+    def indices_at(self, times: Sequence[float]) -> array:
+        """`index_at` para muitos instantes; instantes ordenados são resolvidos numa só passagem."""
+        result = array("i", [-1]) * len(times)
+        starts, ends, count = self.starts, self.ends, len(self.starts)
+        if all(times[k] <= times[k + 1] for k in range(len(times) - 1)):
+            i = -1
+            for k, seconds in enumerate(times):
+                while i + 1 < count and starts[i + 1] <= seconds:
+                    i += 1
+                if i >= 0 and seconds < ends[i]:
+                    result[k] = i
+            return result
+        for k, seconds in enumerate(times):
+            result[k] = self.index_at(seconds)
+        return result
+
+    def span(self, start: float, end: float) -> Tuple[int, int]:
+        """Intervalo [lo, hi) de índices das palavras que começam em [start, end)."""
+        return bisect.bisect_left(self.starts, start), bisect.bisect_left(self.starts, end)
+
+    def words_between(self, start: float, end: float) -> List[str]:
+        lo, hi = self.span(start, end)
+        words, ids = self.words, self.word_ids
+        return [words[ids[i]] for i in range(lo, hi)]
+
+    def lines(self) -> List[Line]:
+        """Agrupa as palavras em linhas (quebras `\\n` da letra), sem marcadores de secção.
+
+        A posição da quebra conta: a Suno junta-a muitas vezes ao início da
+        palavra seguinte (`"[Verse]\\nHello"`), e aí a linha anterior fecha
+        antes de a palavra entrar; uma quebra no fim fecha a linha depois dela.
+        """
+        lines: List[Line] = []
+        current: List[str] = []
+        line_start = line_end = 0.0
+        for i in range(len(self.starts)):
+            segments = self.word(i).split("\n")
+            for j, segment in enumerate(segments):
+                if j > 0 and current:
+                    lines.append((line_start, line_end, " ".join(current)))
+                    current = []
+                text = _clean(segment)
+                if text:
+                    if not current:
+                        line_start = self.starts[i]
+                    current.append(text)
+                    line_end = self.ends[i]
+        if current:
+            lines.append((line_start, line_end, " ".join(current)))
+        return lines
+
+    def to_srt(self) -> str:
+        blocks = [
+            f"{n}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{text}\n"
+            for n, (start, end, text) in enumerate(self.lines(), 1)
+        ]
+        return "\n".join(blocks)
+
+    def to_vtt(self) -> str:
+        blocks = [f"{_clock(start, '.')} --> {_clock(end, '.')}\n{text}\n" for start, end, text in self.lines()]
+        return "WEBVTT\n\n" + "\n".join(blocks)
+
+    def to_lrc(self) -> str:
+        out = []
+        for start, _, text in self.lines():
+            minutes, centis = divmod(int(round(start * 100)), 6000)
+            out.append(f"[{minutes:02d}:{centis // 100:02d}.{centis % 100:02d}]{text}")
+        return "\n".join(out) + "\n"
+
+    def to_bytes(self) -> bytes:
+        """Serialização compacta: cabeçalho + arrays em binário + tabela de palavras."""
+        table = "\0".join(self.words).encode("utf-8")
+        arrays = [self.starts, self.ends, self.word_ids]
+        if sys.byteorder == "big":
+            # Guardar sempre em little-endian
+            arrays = [array(values.typecode, values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        return b"".join([_HEADER.pack(_MAGIC, len(self.starts), len(self.words))] + [v.tobytes() for v in arrays] + [table])
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "LyricsIndex":
+        magic, count, unique = _HEADER.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("not a serialized LyricsIndex")
+        offset = _HEADER.size
+        arrays = []
+        for typecode in ("d", "d", "I"):
+            values = array(typecode)
+            size = values.itemsize * count
+            values.frombytes(payload[offset:offset + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            arrays.append(values)
+            offset += size
+        words = [sys.intern(w) for w in payload[offset:].decode("utf-8").split("\0")] if unique else []
+        return cls(arrays[0], arrays[1], arrays[2], words)
@@ -0,0 +1,218 @@
+"""
+Métricas por endpoint para os clientes Suno.
+
+Quando as gerações ficam lentas, é preciso saber se o tempo vai para
+DNS/TCP/TLS, para a fila do servidor, para a transferência de um upload ou
+para o nosso próprio polling. Com `metrics=MetricsRecorder()`, o `SunoClient`
+e o `AsyncSunoClient` registam para cada pedido:
+
+- tempo de ligação (DNS + TCP + TLS; 0 quando a ligação do pool é reutilizada)
+- tempo até ao primeiro byte (cabeçalhos da resposta)
+- latência total (incluindo retries)
+- bytes enviados e recebidos
+- código HTTP e número de retries
+
+Os valores são agregados em histogramas de buckets fixos (sem guardar as
+amostras), exportados em formato OpenMetrics por `render()`, e podem também
+ser emitidos como uma linha JSON por pedido num logger. O custo por pedido é
+uma procura binária e alguns incrementos sob um lock, pelo que pode ficar
+ativo em produção.
+
+Exemplo:
+    metrics = MetricsRecorder(logger=logging.getLogger("suno.metrics"))
+    client = SunoClient(api_key="...", metrics=metrics)
+    client.get_remaining_credits()
+    print(metrics.render())
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Limites superiores (segundos) dos buckets dos histogramas de tempo
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# Histogramas exportados: campo da amostra -> (nome da métrica, descrição)
+HISTOGRAMS: Dict[str, Tuple[str, str]] = {
+    "connect_s": ("suno_request_connect_seconds", "Time spent opening connections (DNS, TCP, TLS)"),
+    "ttfb_s": ("suno_request_ttfb_seconds", "Time until response headers were received"),
+    "total_s": ("suno_request_duration_seconds", "Total request latency including retries"),
+}
+
+
+class RequestSample(NamedTuple):
+    """Medições de um pedido (já com os retries incluídos)."""
+    endpoint: str
+    method: str
+    status: int
+    connect_s: float
+    ttfb_s: float
+    total_s: float
+    bytes_sent: int
+    bytes_received: int
+    retries: int
+    error: Optional[str] = None
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, buckets: Tuple[float, ...], value: float) -> None:
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRecorder:
+    """Agrega amostras de pedidos em histogramas e contadores por endpoint.
+
+    Args:
+      buckets: limites superiores dos buckets de tempo (segundos)
+      logger: logger opcional; cada pedido é emitido como uma linha JSON (INFO)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, logger: Optional[logging.Logger] = None):
+        self.buckets = tuple(sorted(buckets))
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._retries: Dict[Tuple[str, str], int] = {}
+        self._sent: Dict[Tuple[str, str], int] = {}
+        self._received: Dict[Tuple[str, str], int] = {}
+
+    def record(self, sample: RequestSample) -> None:
+        """Regista um pedido."""
+        key = (sample.endpoint, sample.method)
+        status = str(sample.status) if sample.status else (sample.error or "error")
+        with self._lock:
+            for field in HISTOGRAMS:
+                histogram = self._histograms.get((field,) + key)
+                if histogram is None:
+                    histogram = self._histograms[(field,) + key] = _Histogram(self.buckets)
+                histogram.observe(self.buckets, getattr(sample, field))
+            self._requests[key + (status,)] = self._requests.get(key + (status,), 0) + 1
+            self._retries[key] = self._retries.get(key, 0) + sample.retries
+            self._sent[key] = self._sent.get(key, 0) + sample.bytes_sent
+            self._received[key] = self._received.get(key, 0) + sample.bytes_received
+        if self.logger is not None and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(json.dumps({"event": "suno_request", "ts": time.time(), **sample._asdict()}))
+
+    def reset(self) -> None:
+        """Apaga todas as métricas agregadas."""
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+            self._retries.clear()
+            self._sent.clear()
+            self._received.clear()
+
+    def render(self) -> str:
+        """Exporta as métricas em formato de texto OpenMetrics."""
+        with self._lock:
+            histograms = {k: (list(v.counts), v.sum) for k, v in self._histograms.items()}
+            requests = dict(self._requests)
+            counters = [
+                ("suno_request_retries", "Retries performed by the client", dict(self._retries)),
+                ("suno_request_sent_bytes", "Request payload bytes sent", dict(self._sent)),
+                ("suno_request_received_bytes", "Response payload bytes received", dict(self._received)),
+            ]
+
+        lines: List[str] = []
+        for field, (name, help_text) in HISTOGRAMS.items():
+            lines += [f"# TYPE {name} histogram", f"# UNIT {name} seconds", f"# HELP {name} {help_text}."]
+            for (hist_field, endpoint, method), (counts, total) in sorted(histograms.items()):
+                if hist_field != field:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(endpoint=endpoint, method=method, le=le)} {cumulative}")
+                lines.append(f"{name}_count{_labels(endpoint=endpoint, method=method)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(endpoint=endpoint, method=method)} {total}")
+
+        lines += ["# TYPE suno_requests counter", "# HELP suno_requests Requests by endpoint and final status."]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f"suno_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+        for name, help_text, values in counters:
+            lines += [f"# TYPE {name} counter", f"# HELP {name} {help_text}."]
+            for (endpoint, method), value in sorted(values.items()):
+                lines.append(f"{name}_total{_labels(endpoint=endpoint, method=method)} {value}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Escreve `render()` num ficheiro (ex.: para o textfile collector)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+# Tempo de ligação acumulado pela thread atual (o urllib3 liga na thread do pedido)
+_connect_time = threading.local()
+
+
+def reset_connect_time() -> None:
+    _connect_time.value = 0.0
+
+
+def take_connect_time() -> float:
+    """Retorna e limpa o tempo de ligação acumulado pela thread atual."""
+    value = getattr(_connect_time, "value", 0.0)
+    _connect_time.value = 0.0
+    return value
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.value = getattr(_connect_time, "value", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.value = getattr(_connect_time, "value", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def time_connections(adapter) -> None:
+    """Faz um HTTPAdapter da biblioteca requests medir o tempo de ligação."""
+    adapter.poolmanager.pool_classes_by_scheme = {
+        "http": _TimedHTTPConnectionPool,
+        "https": _TimedHTTPSConnectionPool,
+    }
@@ -0,0 +1,273 @@
+"""
+Pipelines declarativos de vários passos sobre a Suno API.
+
+Um trabalho típico encadeia generate_music -> convert_to_wav / vocal_removal /
+generate_music_cover / create_music_video, e cada passo precisa do taskId e
+do audioId do anterior. O `Pipeline` descreve esses passos como um grafo
+(cada passo declara de que passo depende), executa em paralelo os ramos
+independentes (ex.: capa, WAV e MP4 depois da geração) e passa os
+resultados para a frente automaticamente.
+
+O estado de cada passo é gravado num ficheiro de checkpoint JSON: um passo
+concluído não volta a correr, e um passo já submetido (taskId conhecido) não
+volta a ser pago — ao retomar, o pipeline apenas espera pelo resultado. Um
+passo cuja tarefa falhou fica marcado como `failed` e é submetido de novo
+na execução seguinte.
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    pipeline = Pipeline.from_spec([
+        {"name": "song", "type": "generate", "params": {"prompt": "...", "customMode": False}},
+        {"name": "wav", "type": "wav", "source": "song"},
+        {"name": "stems", "type": "vocal_removal", "source": "song", "separation": "split_stem"},
+        {"name": "art", "type": "cover", "source": "song"},
+        {"name": "video", "type": "video", "source": "song"},
+    ], checkpoint_path="job-42.json")
+
+    async with AsyncSunoClient(api_key="...") as client:
+        poller = TaskPoller(client)
+        results = await pipeline.run(client, poller, callback_url="https://seu-dominio.com/callback")
+"""
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from suno_async_client import AsyncSunoClient
+from suno_poller import TaskFailedError, TaskPoller
+
+
+class PipelineError(Exception):
+    """Um ou mais passos do pipeline falharam."""
+
+    def __init__(self, failures: Dict[str, BaseException]):
+        names = ", ".join(sorted(failures))
+        super().__init__(f"pipeline steps failed: {names}")
+        self.failures = failures
+
+
+class StepContext:
+    """Informação disponível a um passo quando é submetido."""
+
+    def __init__(self, results: Dict[str, Dict[str, Any]], task_ids: Dict[str, str], callback_url: str):
+        self.results = results
+        self.task_ids = task_ids
+        self.callback_url = callback_url
+
+    def audio_id(self, step: str, track: int = 0) -> str:
+        """audioId da faixa `track` produzida pelo passo `step`."""
+        return track_ids(self.results[step])[track]
+
+
+def track_ids(data: Dict[str, Any]) -> List[str]:
+    """IDs das faixas de um `data` de record-info de geração."""
+    response = data.get("response") or {}
+    tracks = response.get("sunoData") or data.get("data") or []
+    return [track["id"] for track in tracks if isinstance(track, dict) and "id" in track]
+
+
+Submit = Callable[[AsyncSunoClient, StepContext], Awaitable[Any]]
+
+
+class Step:
+    """Um passo do pipeline.
+
+    Args:
+      name: nome único do passo
+      submit: corrotina (client, ctx) -> resposta do pedido de criação da tarefa
+      endpoint: endpoint record-info usado para esperar pelo resultado
+      after: passos de que este depende
+    """
+
+    def __init__(self, name: str, submit: Submit, endpoint: str, after: Iterable[str] = ()):
+        self.name = name
+        self.submit = submit
+        self.endpoint = endpoint
+        self.after = tuple(after)
+
+
+def generate_step(name: str, params: Dict[str, Any]) -> Step:
+    """Gera música com generate_music."""
+    async def submit(client: AsyncSunoClient, ctx: StepContext) -> Any:
+        return await client.generate_music({"callBackUrl": ctx.callback_url, **params})
+    return Step(name, submit, "generate")
+
+
+def wav_step(name: str, source: str, track: int = 0) -> Step:
+    """Converte para WAV uma faixa gerada pelo passo `source`."""
+    async def submit(client: AsyncSunoClient, ctx: StepContext) -> Any:
+        return await client.convert_to_wav(ctx.task_ids[source], ctx.audio_id(source, track), ctx.callback_url)
+    return Step(name, submit, "wav", after=[source])
+
+
+def vocal_removal_step(name: str, source: str, separation: str = "separate_vocal", track: int = 0) -> Step:
+    """Separa vocais ('separate_vocal') ou stems ('split_stem')."""
+    async def submit(client: AsyncSunoClient, ctx: StepContext) -> Any:
+        return await client.vocal_removal({
+            "taskId": ctx.task_ids[source],
+            "audioId": ctx.audio_id(source, track),
+            "type": separation,
+            "callBackUrl": ctx.callback_url,
+        })
+    return Step(name, submit, "vocal-removal", after=[source])
+
+
+def cover_step(name: str, source: str) -> Step:
+    """Gera a capa da música do passo `source`."""
+    async def submit(client: AsyncSunoClient, ctx: StepContext) -> Any:
+        return await client.generate_music_cover(ctx.task_ids[source], ctx.callback_url)
+    return Step(name, submit, "cover", after=[source])
+
+
+def video_step(name: str, source: str, track: int = 0, author: Optional[str] = None, domain_name: Optional[str] = None) -> Step:
+    """Cria o vídeo MP4 de uma faixa do passo `source`."""
+    async def submit(client: AsyncSunoClient, ctx: StepContext) -> Any:
+        return await client.create_music_video(
+            ctx.task_ids[source], ctx.audio_id(source, track), ctx.callback_url, author, domain_name
+        )
+    return Step(name, submit, "mp4", after=[source])
+
+
+# Tipo de passo na especificação declarativa -> fábrica
+STEP_TYPES: Dict[str, Callable[..., Step]] = {
+    "generate": generate_step,
+    "wav": wav_step,
+    "vocal_removal": vocal_removal_step,
+    "cover": cover_step,
+    "video": video_step,
+}
+
+
+class Pipeline:
+    """Grafo de passos executado com paralelismo entre ramos independentes.
+
+    Args:
+      steps: passos do pipeline (dependências declaradas em `Step.after`)
+      checkpoint_path: ficheiro JSON onde o estado dos passos é gravado
+    """
+
+    def __init__(self, steps: Iterable[Step], checkpoint_path: Optional[str] = None):
+        self.steps: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Passo duplicado: {step.name}")
+            self.steps[step.name] = step
+        for step in self.steps.values():
+            for dependency in step.after:
+                if dependency not in self.steps:
+                    raise ValueError(f"{step.name} depende de um passo inexistente: {dependency}")
+        self._check_acyclic()
+        self.checkpoint_path = checkpoint_path
+        self.state: Dict[str, Dict[str, Any]] = self._load_checkpoint()
+
+    @classmethod
+    def from_spec(cls, spec: List[Dict[str, Any]], checkpoint_path: Optional[str] = None) -> "Pipeline":
+        """Constrói o pipeline a partir de uma lista de dicts {"name", "type", ...}."""
+        steps = []
+        for entry in spec:
+            options = dict(entry)
+            factory = STEP_TYPES[options.pop("type")]
+            steps.append(factory(**options))
+        return cls(steps, checkpoint_path)
+
+    async def run(
+        self,
+        client: AsyncSunoClient,
+        poller: TaskPoller,
+        callback_url: str,
+        wait: Optional[Callable[[str, str], Awaitable[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Executa o pipeline e retorna o `data` final de cada passo.
+
+        Args:
+          client: cliente assíncrono usado para submeter os passos
+          poller: poller usado para esperar pelos resultados
+          callback_url: callBackUrl enviado em todos os pedidos
+          wait: alternativa ao poller, ex.: `CallbackServer.expect`
+        """
+        wait = wait or (lambda endpoint, task_id: poller.watch(endpoint, task_id))
+        results = {name: entry["data"] for name, entry in self.state.items() if entry.get("done")}
+        # Tarefas que falharam não são retomadas: o passo é submetido de novo
+        task_ids = {
+            name: entry["task_id"] for name, entry in self.state.items()
+            if entry.get("task_id") and not entry.get("failed")
+        }
+        ctx = StepContext(results, task_ids, callback_url)
+        finished = {name: asyncio.get_running_loop().create_future() for name in self.steps}
+        failures: Dict[str, BaseException] = {}
+
+        async def run_step(step: Step) -> None:
+            try:
+                for dependency in step.after:
+                    await finished[dependency]
+                if step.name not in results:
+                    if step.name not in task_ids:
+                        task_ids[step.name] = self._task_id(step, await step.submit(client, ctx))
+                        self._save(step.name, {"task_id": task_ids[step.name]})
+                    try:
+                        results[step.name] = await wait(step.endpoint, task_ids[step.name])
+                    except TaskFailedError as error:
+                        # Outros erros (ex.: timeout) mantêm o taskId: a tarefa pode ainda terminar
+                        self._save(step.name, {"task_id": task_ids[step.name], "failed": True, "error": str(error)})
+                        raise
+                    self._save(step.name, {"task_id": task_ids[step.name], "done": True, "data": results[step.name]})
+                finished[step.name].set_result(None)
+            except BaseException as error:
+                failures[step.name] = error
+                finished[step.name].set_exception(error)
+                if isinstance(error, asyncio.CancelledError):
+                    raise
+
+        await asyncio.gather(*(run_step(step) for step in self.steps.values()), return_exceptions=True)
+        for future in finished.values():
+            if future.done() and not future.cancelled():
+                future.exception()
+        # Só reportar as falhas de origem, não os passos saltados por dependência
+        root_failures = {
+            name: error for name, error in failures.items()
+            if not any(dep in failures for dep in self.steps[name].after)
+        }
+        if root_failures:
+            raise PipelineError(root_failures)
+        return results
+
+    def _task_id(self, step: Step, response: Any) -> str:
+        body = response.json()
+        data = body.get("data") or {}
+        if body.get("code") != 200 or not data.get("taskId"):
+            raise RuntimeError(f"{step.name}: submission failed: {body.get('msg') or body}")
+        return data["taskId"]
+
+    def _check_acyclic(self) -> None:
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo no pipeline em: {name}")
+            visiting.add(name)
+            for dependency in self.steps[name].after:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("steps", {})
+
+    def _save(self, name: str, entry: Dict[str, Any]) -> None:
+        self.state[name] = entry
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.state}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
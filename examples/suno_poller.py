@@ -0,0 +1,284 @@
+"""
+Poller multiplexado para os endpoints record-info da Suno API.
+
+Em vez de cada chamador escrever o seu próprio ciclo `while True: get_task_info
+...; time.sleep(5)`, o `TaskPoller` aceita muitos pares (endpoint, taskId) e
+agenda todas as consultas num único event loop. Cada tarefa tem backoff
+adaptativo: a primeira consulta só acontece quando a tarefa pode realmente
+estar pronta, o intervalo cresce enquanto o estado não muda e volta a encurtar
+quando a tarefa avança (ex.: TEXT_SUCCESS -> FIRST_SUCCESS), que é quando a
+conclusão está próxima.
+
+Requisitos:
+- Instale a biblioteca `aiohttp` (ex.: pip install aiohttp).
+
+Exemplo:
+    async with AsyncSunoClient(api_key="...") as client:
+        poller = TaskPoller(client)
+        futures = [poller.watch("generate", task_id) for task_id in task_ids]
+        results = await asyncio.gather(*futures)
+        await poller.close()
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from suno_async_client import AsyncSunoClient
+from suno_status import classify_status, extract_status
+
+
+class PollProfile:
+    """Parâmetros de polling de um endpoint.
+
+    Args:
+      initial_delay: segundos até à primeira consulta
+      min_interval: intervalo mínimo entre consultas
+      max_interval: intervalo máximo entre consultas
+      growth: fator de crescimento do intervalo enquanto o estado não muda
+    """
+
+    def __init__(self, initial_delay: float, min_interval: float, max_interval: float, growth: float = 1.5):
+        self.initial_delay = initial_delay
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.growth = growth
+
+
+# Perfis por endpoint, calibrados pelos tempos típicos de cada tipo de tarefa
+DEFAULT_PROFILES: Dict[str, PollProfile] = {
+    "generate": PollProfile(initial_delay=20.0, min_interval=3.0, max_interval=20.0),
+    "cover": PollProfile(initial_delay=10.0, min_interval=3.0, max_interval=15.0),
+    "lyrics": PollProfile(initial_delay=5.0, min_interval=2.0, max_interval=10.0),
+    "wav": PollProfile(initial_delay=10.0, min_interval=3.0, max_interval=15.0),
+    "vocal-removal": PollProfile(initial_delay=20.0, min_interval=5.0, max_interval=30.0),
+    "mp4": PollProfile(initial_delay=30.0, min_interval=5.0, max_interval=30.0),
+}
+
+# Nome do endpoint -> método do AsyncSunoClient
+ENDPOINT_METHODS = {
+    "generate": "get_task_info",
+    "cover": "get_music_cover_info",
+    "lyrics": "get_lyrics_info",
+    "wav": "get_wav_info",
+    "vocal-removal": "get_vocal_removal_info",
+    "mp4": "get_music_video_info",
+}
+
+
+class TaskFailedError(Exception):
+    """A tarefa terminou num estado de erro."""
+
+    def __init__(self, endpoint: str, task_id: str, status: Any, data: Dict[str, Any]):
+        super().__init__(f"{endpoint} task {task_id} failed: {status}")
+        self.endpoint = endpoint
+        self.task_id = task_id
+        self.status = status
+        self.data = data
+
+
+class _Watch:
+    """Estado de polling de um par (endpoint, taskId)."""
+
+    def __init__(self, endpoint: str, task_id: str, profile: PollProfile, deadline: Optional[float]):
+        self.endpoint = endpoint
+        self.task_id = task_id
+        self.profile = profile
+        self.deadline = deadline
+        self.started = time.monotonic()
+        self.interval = profile.min_interval
+        self.last_status: Any = None
+        self.polls = 0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.callbacks: List[Callable[[Dict[str, Any]], Any]] = []
+
+    def next_interval(self, status: Any) -> float:
+        """Calcula o próximo intervalo a partir do estado observado."""
+        if status != self.last_status and self.last_status is not None:
+            # A tarefa avançou: a conclusão está próxima, voltar ao ritmo mínimo
+            self.interval = self.profile.min_interval
+        else:
+            self.interval = min(self.interval * self.profile.growth, self.profile.max_interval)
+        self.last_status = status
+        return self.interval
+
+
+class TaskPoller:
+    """Agenda consultas record-info de muitas tarefas num único event loop.
+
+    Args:
+      client: cliente assíncrono usado para as consultas
+      profiles: perfis de polling por endpoint (sobrepõem DEFAULT_PROFILES)
+      default_timeout: segundos até desistir de uma tarefa (None = sem limite)
+    """
+
+    def __init__(
+        self,
+        client: AsyncSunoClient,
+        profiles: Optional[Dict[str, PollProfile]] = None,
+        default_timeout: Optional[float] = 900.0,
+    ):
+        self.client = client
+        self.profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self.default_timeout = default_timeout
+        self.total_polls = 0
+        self._watches: Dict[Tuple[str, str], _Watch] = {}
+        self._heap: List[Tuple[float, int, _Watch]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+    def watch(
+        self,
+        endpoint: str,
+        task_id: str,
+        callback: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        timeout: Optional[float] = None,
+        initial_delay: Optional[float] = None,
+    ) -> asyncio.Future:
+        """Começa a acompanhar uma tarefa e retorna um Future com o `data` final.
+
+        Args:
+          endpoint: 'generate', 'cover', 'lyrics', 'wav', 'vocal-removal' ou 'mp4'
+          task_id: ID da tarefa
+          callback: função (ou corrotina) chamada com o `data` final em caso de sucesso
+          timeout: segundos até desistir (por omissão `default_timeout`)
+          initial_delay: sobrepõe o atraso da primeira consulta do perfil
+
+        Pedidos repetidos para o mesmo par partilham o mesmo Future.
+        """
+        if endpoint not in ENDPOINT_METHODS:
+            raise ValueError(f"Endpoint desconhecido: {endpoint}")
+        key = (endpoint, task_id)
+        existing = self._watches.get(key)
+        if existing is not None:
+            if callback:
+                existing.callbacks.append(callback)
+            return existing.future
+
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        entry = _Watch(endpoint, task_id, self.profiles[endpoint], deadline)
+        if callback:
+            entry.callbacks.append(callback)
+        self._watches[key] = entry
+        delay = entry.profile.initial_delay if initial_delay is None else initial_delay
+        self._schedule(entry, delay)
+        self._ensure_running()
+        return entry.future
+
+    def resolve(self, endpoint: str, task_id: str, data: Dict[str, Any]) -> bool:
+        """Conclui uma tarefa com um resultado obtido por outra via (ex.: callback).
+
+        Retorna True se a tarefa estava a ser acompanhada.
+        """
+        entry = self._watches.get((endpoint, task_id))
+        if entry is None:
+            return False
+        self._finish(entry, data)
+        return True
+
+    def cancel(self, endpoint: str, task_id: str) -> None:
+        """Deixa de acompanhar uma tarefa e cancela o seu Future."""
+        entry = self._watches.pop((endpoint, task_id), None)
+        if entry is not None and not entry.future.done():
+            entry.future.cancel()
+
+    @property
+    def pending(self) -> int:
+        """Número de tarefas ainda em acompanhamento."""
+        return len(self._watches)
+
+    async def close(self) -> None:
+        """Para o agendador e cancela as tarefas ainda pendentes."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for task in list(self._inflight):
+            task.cancel()
+        for entry in list(self._watches.values()):
+            if not entry.future.done():
+                entry.future.cancel()
+        self._watches.clear()
+        self._heap.clear()
+
+    def _schedule(self, entry: _Watch, delay: float) -> None:
+        due = time.monotonic() + delay
+        if entry.deadline is not None:
+            due = min(due, entry.deadline)
+        heapq.heappush(self._heap, (due, next(self._seq), entry))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, entry = heapq.heappop(self._heap)
+                if entry.future.done():
+                    continue
+                task = asyncio.get_running_loop().create_task(self._poll(entry))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, entry: _Watch) -> None:
+        if entry.deadline is not None and time.monotonic() >= entry.deadline:
+            self._fail(entry, asyncio.TimeoutError(f"{entry.endpoint} task {entry.task_id} timed out"))
+            return
+
+        method: Callable[[str], Awaitable[Any]] = getattr(self.client, ENDPOINT_METHODS[entry.endpoint])
+        entry.polls += 1
+        self.total_polls += 1
+        try:
+            response = await method(entry.task_id)
+            body = response.json()
+        except Exception:
+            # Erro de rede ou resposta inválida: tentar de novo com o intervalo atual
+            self._schedule(entry, entry.next_interval(entry.last_status))
+            return
+
+        if entry.future.done():
+            return
+        data = body.get("data") or {}
+        status = extract_status(data)
+        outcome = classify_status(status)
+        if outcome == "success":
+            self._finish(entry, data)
+        elif outcome == "failure":
+            self._fail(entry, TaskFailedError(entry.endpoint, entry.task_id, status, data))
+        else:
+            self._schedule(entry, entry.next_interval(status))
+
+    def _finish(self, entry: _Watch, data: Dict[str, Any]) -> None:
+        self._watches.pop((entry.endpoint, entry.task_id), None)
+        if entry.future.done():
+            return
+        entry.future.set_result(data)
+        for callback in entry.callbacks:
+            result = callback(data)
+            if asyncio.iscoroutine(result):
+                task = asyncio.get_running_loop().create_task(result)
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    def _fail(self, entry: _Watch, error: BaseException) -> None:
+        self._watches.pop((entry.endpoint, entry.task_id), None)
+        if not entry.future.done():
+            entry.future.set_exception(error)
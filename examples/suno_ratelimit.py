@@ -0,0 +1,320 @@
+"""
+Limitador de pedidos e admissão por créditos para a Suno API.
+
+A Suno aceita no máximo 20 pedidos por 10 segundos (405 quando excedido) e
+responde 429 quando os créditos não chegam. Em vez de descobrir esses limites
+com pedidos que falham, o `RateLimiter` mantém um token bucket por família
+de endpoints (generate, wav, mp4, vocal-removal, uploads) mais um bucket
+global, e os pedidos esperam localmente pela sua vez.
+
+O `CreditScheduler` fica à frente dos pedidos de geração: consulta
+periodicamente get_remaining_credits, e só admite um trabalho quando o saldo
+(menos o que já foi reservado) cobre o seu custo. Se o trabalho mais
+prioritário não couber, tenta os seguintes que caibam; os restantes ficam em
+espera até o saldo ser atualizado.
+
+Exemplo:
+    limiter = RateLimiter()
+    client = SunoClient(api_key="...", rate_limiter=limiter)
+
+    async with AsyncSunoClient(api_key="...", rate_limiter=limiter) as client:
+        scheduler = CreditScheduler(client)
+        future = scheduler.submit(client.generate_music, params, priority=10)
+        response = await future
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# Família de cada endpoint (caminho relativo à URL base)
+ENDPOINT_FAMILIES: Dict[str, str] = {
+    "/generate": "generate",
+    "/generate/extend": "generate",
+    "/generate/upload-cover": "generate",
+    "/generate/upload-extend": "generate",
+    "/generate/add-instrumental": "generate",
+    "/generate/add-vocals": "generate",
+    "/generate/generate-persona": "generate",
+    "/style/generate": "generate",
+    "/lyrics": "generate",
+    "/suno/cover/generate": "generate",
+    "/wav/generate": "wav",
+    "/mp4/generate": "mp4",
+    "/vocal-removal/generate": "vocal-removal",
+    "/api/file-base64-upload": "uploads",
+    "/api/file-stream-upload": "uploads",
+    "/api/file-url-upload": "uploads",
+}
+
+# (pedidos, segundos) por família; o bucket global segue o limite da Suno
+DEFAULT_LIMITS: Dict[str, Tuple[int, float]] = {
+    "generate": (10, 10.0),
+    "wav": (5, 10.0),
+    "mp4": (5, 10.0),
+    "vocal-removal": (5, 10.0),
+    "uploads": (5, 10.0),
+}
+GLOBAL_LIMIT: Tuple[int, float] = (20, 10.0)
+
+# Custo em créditos por método do cliente (ver README: Credits Cost)
+JOB_COSTS: Dict[str, int] = {
+    "generate_music": 12,
+    "extend_music": 12,
+    "upload_cover": 12,
+    "upload_extend": 12,
+    "add_instrumental": 12,
+    "add_vocals": 12,
+}
+VOCAL_REMOVAL_COSTS = {"separate_vocal": 1, "split_stem": 5}
+
+
+def endpoint_family(path: str) -> Optional[str]:
+    """Família de um endpoint; None para consultas (record-info, créditos)."""
+    return ENDPOINT_FAMILIES.get(path)
+
+
+class TokenBucket:
+    """Token bucket thread-safe com reserva antecipada.
+
+    Cada `reserve()` consome os tokens de imediato (o saldo pode ficar
+    negativo) e retorna quanto tempo o chamador deve esperar, o que mantém a
+    ordem de chegada sem filas explícitas.
+
+    Args:
+      rate: tokens repostos por segundo
+      capacity: máximo de tokens acumulados (tamanho da rajada)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Reserva `tokens` e retorna os segundos de espera até poderem ser usados."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Token buckets por família de endpoints mais um bucket global.
+
+    Args:
+      limits: (pedidos, segundos) por família (sobrepõem DEFAULT_LIMITS)
+      global_limit: (pedidos, segundos) partilhados por todos os pedidos,
+                    incluindo consultas; None para desativar
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        global_limit: Optional[Tuple[int, float]] = GLOBAL_LIMIT,
+    ):
+        self.buckets: Dict[str, TokenBucket] = {
+            family: TokenBucket(count / period, count)
+            for family, (count, period) in {**DEFAULT_LIMITS, **(limits or {})}.items()
+        }
+        self.global_bucket = TokenBucket(global_limit[0] / global_limit[1], global_limit[0]) if global_limit else None
+        self.waited = 0.0
+
+    def _reserve(self, path: str) -> float:
+        delay = 0.0
+        bucket = self.buckets.get(endpoint_family(path) or "")
+        if bucket is not None:
+            delay = bucket.reserve()
+        if self.global_bucket is not None:
+            delay = max(delay, self.global_bucket.reserve())
+        self.waited += delay
+        return delay
+
+    def acquire(self, path: str) -> None:
+        """Bloqueia a thread até o pedido para `path` poder ser enviado."""
+        delay = self._reserve(path)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, path: str) -> None:
+        """Versão assíncrona de `acquire`."""
+        delay = self._reserve(path)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def estimate_cost(fn: Callable[..., Any], args: Tuple[Any, ...]) -> int:
+    """Custo em créditos de uma chamada ao cliente, quando conhecido (0 caso contrário)."""
+    name = getattr(fn, "__name__", "")
+    if name == "vocal_removal" and args and isinstance(args[0], dict):
+        return VOCAL_REMOVAL_COSTS.get(args[0].get("type"), 1)
+    return JOB_COSTS.get(name, 0)
+
+
+class _Job:
+    def __init__(self, fn: Callable[..., Awaitable[Any]], args: Tuple[Any, ...], kwargs: Dict[str, Any], cost: int, future: asyncio.Future):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cost = cost
+        self.future = future
+
+
+class CreditScheduler:
+    """Admite trabalhos por prioridade apenas quando o saldo de créditos os cobre.
+
+    Args:
+      client: cliente assíncrono (usado para consultar o saldo)
+      refresh_interval: segundos entre consultas a get_remaining_credits
+      max_concurrent: número máximo de trabalhos admitidos em curso
+    """
+
+    def __init__(self, client: Any, refresh_interval: float = 30.0, max_concurrent: int = 50):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_concurrent = max_concurrent
+        self.balance: Optional[float] = None
+        self.reserved = 0
+        self._sampled_at = 0.0
+        self._queue: List[Tuple[int, int, _Job]] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        # O event loop só guarda referências fracas às tasks: sem este set, um
+        # trabalho em curso pode ser recolhido pelo GC e o seu Future nunca resolver
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args: Any, priority: int = 0, cost: Optional[int] = None, **kwargs: Any) -> asyncio.Future:
+        """Coloca uma chamada em fila; retorna um Future com o seu resultado.
+
+        Args:
+          fn: método assíncrono do cliente (ex.: client.generate_music)
+          priority: maior valor = admitido primeiro
+          cost: créditos necessários (por omissão, estimado a partir de `fn`)
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(fn, args, kwargs, estimate_cost(fn, args) if cost is None else cost, future)
+        heapq.heappush(self._queue, (-priority, next(self._seq), job))
+        self._ensure_running()
+        self._wakeup.set()
+        return future
+
+    @property
+    def available(self) -> Optional[float]:
+        """Créditos ainda não reservados, segundo a última amostra."""
+        if self.balance is None:
+            return None
+        return self.balance - self.reserved
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def refresh(self) -> None:
+        """Consulta o saldo.
+
+        As reservas dos trabalhos admitidos mantêm-se: o custo de um trabalho
+        ainda em fila no cliente ou em curso não está refletido no saldo.
+        """
+        response = await self.client.get_remaining_credits()
+        body = response.json()
+        if body.get("code") == 200 and isinstance(body.get("data"), (int, float)):
+            self.balance = body["data"]
+        self._sampled_at = time.monotonic()
+
+    async def close(self) -> None:
+        """Para a admissão, cancela os trabalhos em fila e espera pelos já admitidos."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for _, _, job in self._queue:
+            if not job.future.done():
+                job.future.cancel()
+        self._queue.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _ensure_running(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def _pick(self) -> Optional[_Job]:
+        """Retira o trabalho mais prioritário que cabe no saldo disponível."""
+        available = self.available
+        held = []
+        picked = None
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            if item[2].future.done():
+                continue
+            if item[2].cost <= available:
+                picked = item[2]
+                break
+            held.append(item)
+        for item in held:
+            heapq.heappush(self._queue, item)
+        return picked
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if self._queue and time.monotonic() - self._sampled_at >= self.refresh_interval:
+                try:
+                    await self.refresh()
+                except Exception:
+                    self._sampled_at = time.monotonic()
+            while self._queue and self._running < self.max_concurrent and self.balance is not None:
+                job = self._pick()
+                if job is None:
+                    break
+                self.reserved += job.cost
+                self._running += 1
+                task = asyncio.get_running_loop().create_task(self._execute(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            if not self._queue:
+                await self._wakeup.wait()
+                continue
+            wait = max(0.0, self.refresh_interval - (time.monotonic() - self._sampled_at))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: _Job) -> None:
+        succeeded = False
+        try:
+            result = await job.fn(*job.args, **job.kwargs)
+            succeeded = True
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as error:
+            if not job.future.done():
+                job.future.set_exception(error)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            # A reserva passa a custo gasto: até à próxima amostra, o saldo
+            # memorizado desconta-o (a amostra seguinte traz o valor real)
+            self.reserved -= job.cost
+            if succeeded and self.balance is not None:
+                self.balance -= job.cost
+            self._running -= 1
+            if self._wakeup is not None:
+                self._wakeup.set()
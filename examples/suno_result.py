@@ -0,0 +1,146 @@
+"""
+Respostas da Suno API com JSON descodificado uma única vez.
+
+Quem faz polling chama `response.json()` várias vezes sobre o mesmo corpo
+(verificar `code`, ler o estado, depois extrair os URLs), e cada chamada
+volta a fazer o parsing de um record-info que pode ter dezenas de KB. O
+`SunoResult` é um mixin para os objetos de resposta dos clientes que:
+
+- descodifica o corpo apenas na primeira chamada a `json()` e guarda o resultado
+- usa `orjson` quando está instalado (várias vezes mais rápido que `json`)
+- expõe os campos mais usados como propriedades: `code`, `msg`, `data`,
+  `task_id`, `status`, `outcome`, `audio_ids` e `audio_urls`
+
+O dict devolvido por `json()` é partilhado entre chamadas; quem o quiser
+alterar deve copiá-lo primeiro.
+
+Requisitos opcionais:
+- pip install orjson
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from suno_status import classify_status, extract_status
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_MISSING = object()
+
+
+def _decode_error(error: json.JSONDecodeError, content: bytes) -> requests.exceptions.JSONDecodeError:
+    doc = error.doc if isinstance(error.doc, str) else content.decode("utf-8", "replace")
+    return requests.exceptions.JSONDecodeError(error.msg, doc, error.pos)
+
+
+def loads(content: bytes) -> Any:
+    """Descodifica JSON com orjson, se disponível, ou com a biblioteca padrão.
+
+    Em ambos os casos, um corpo inválido levanta
+    `requests.exceptions.JSONDecodeError` (subclasse de `json.JSONDecodeError`),
+    como o `requests.Response.json()`.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
+    except json.JSONDecodeError as error:
+        # orjson.JSONDecodeError também é um json.JSONDecodeError
+        raise _decode_error(error, content) from None
+
+
+class SunoResult:
+    """Mixin com `json()` memorizado e acesso direto aos campos da Suno API.
+
+    A classe concreta tem de expor o corpo em `content` (bytes).
+    """
+
+    _decoded: Any = _MISSING
+
+    def json(self, **kwargs: Any) -> Any:
+        """Corpo JSON, descodificado apenas uma vez.
+
+        Argumentos extra (ex.: `object_hook`) desativam a cache e usam sempre o
+        `json` da biblioteca padrão. Um corpo inválido levanta
+        `requests.exceptions.JSONDecodeError`, com ou sem orjson.
+        """
+        if kwargs:
+            try:
+                return json.loads(self.content, **kwargs)
+            except json.JSONDecodeError as error:
+                raise _decode_error(error, self.content) from None
+        if self._decoded is _MISSING:
+            self._decoded = loads(self.content)
+        return self._decoded
+
+    def _body(self) -> Dict[str, Any]:
+        try:
+            body = self.json()
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    @property
+    def code(self) -> Optional[int]:
+        """`code` da Suno API (200 = sucesso), independente do código HTTP."""
+        return self._body().get("code")
+
+    @property
+    def msg(self) -> Optional[str]:
+        return self._body().get("msg")
+
+    @property
+    def data(self) -> Any:
+        return self._body().get("data")
+
+    @property
+    def task_id(self) -> Optional[str]:
+        """taskId de uma resposta de criação de tarefa ou de record-info."""
+        data = self.data
+        if isinstance(data, dict):
+            return data.get("taskId") or data.get("task_id")
+        return None
+
+    @property
+    def status(self) -> Any:
+        """Estado da tarefa (`status` ou `successFlag`) num record-info."""
+        data = self.data
+        return extract_status(data) if isinstance(data, dict) else None
+
+    @property
+    def outcome(self) -> str:
+        """'success', 'failure' ou 'pending' (ver `suno_status.classify_status`)."""
+        return classify_status(self.status)
+
+    def _tracks(self) -> List[Dict[str, Any]]:
+        data = self.data
+        if not isinstance(data, dict):
+            return []
+        response = data.get("response") or {}
+        tracks = response.get("sunoData") if isinstance(response, dict) else None
+        return [track for track in tracks or [] if isinstance(track, dict)]
+
+    @property
+    def audio_ids(self) -> List[str]:
+        """audioId das faixas de um record-info de geração."""
+        return [track["id"] for track in self._tracks() if track.get("id")]
+
+    @property
+    def audio_urls(self) -> List[str]:
+        """audioUrl das faixas de um record-info de geração."""
+        return [track["audioUrl"] for track in self._tracks() if track.get("audioUrl")]
+
+
+class SunoResponse(SunoResult, requests.Response):
+    """requests.Response com `json()` memorizado e os campos de `SunoResult`."""
+
+
+def as_suno_response(response: requests.Response) -> SunoResponse:
+    """Converte no local um requests.Response num SunoResponse (sem copiar o corpo)."""
+    if not isinstance(response, SunoResponse):
+        response.__class__ = SunoResponse
+    return response
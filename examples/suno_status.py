@@ -0,0 +1,37 @@
+"""
+Estados das tarefas da Suno API (record-info e callbacks).
+
+Os endpoints record-info reportam o estado em `status` (geração, letras) ou
+em `successFlag` (WAV, stems, vídeo, capa). Estas funções normalizam ambos.
+"""
+from typing import Any, Dict
+
+# Estados intermédios, por ordem de progresso
+PROGRESS_STATUSES = ("PENDING", "TEXT_SUCCESS", "FIRST_SUCCESS")
+SUCCESS_STATUSES = ("SUCCESS", "complete")
+FAILURE_STATUSES = ("CALLBACK_EXCEPTION", "SENSITIVE_WORD_ERROR")
+
+
+def extract_status(data: Dict[str, Any]) -> Any:
+    """Lê o estado de um `data` de record-info (`status` ou `successFlag`)."""
+    status = data.get("status")
+    if status is None:
+        status = data.get("successFlag")
+    return status
+
+
+def classify_status(status: Any) -> str:
+    """Classifica um estado como 'success', 'failure' ou 'pending'.
+
+    Aceita os estados textuais (SUCCESS, *_FAILED, ...) e o `successFlag`
+    numérico de alguns endpoints (0 = pendente, 1 = sucesso, >1 = erro).
+    """
+    if isinstance(status, int):
+        if status == 1:
+            return "success"
+        return "failure" if status > 1 else "pending"
+    if status in SUCCESS_STATUSES:
+        return "success"
+    if status in FAILURE_STATUSES or (isinstance(status, str) and status.endswith("FAILED")):
+        return "failure"
+    return "pending"
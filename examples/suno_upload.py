@@ -0,0 +1,278 @@
+"""
+Corpos de upload em streaming para os endpoints de upload da Suno API.
+
+O `files=` da biblioteca requests monta todo o corpo multipart em memória
+antes de enviar, pelo que um WAV de 500 MB ocupa 500 MB de RSS. Do mesmo
+modo, `base64_upload` obriga a ter a string base64 inteira em memória (~1.33x
+o ficheiro), copiada de novo pela serialização JSON. Os corpos deste módulo
+são gerados sob pedido: só os pequenos blocos de cabeçalho e rodapé ficam em
+memória, e a origem é lida (e, no caso do base64, codificada) em blocos
+apenas quando o socket os pede. A memória fica constante qualquer que seja o
+tamanho do ficheiro.
+
+- `MultipartFileStream`: corpo multipart/form-data para file-stream-upload
+- `Base64JsonStream`: corpo JSON com `base64Data` para file-base64-upload
+
+Os corpos declaram o seu tamanho (Content-Length) e suportam `tell()`/`seek()`,
+pelo que o retry do urllib3 consegue rebobinar e reenviar o corpo. Os
+endpoints da Suno não aceitam uploads parciais, por isso uma nova tentativa
+recomeça do início do ficheiro em vez de continuar do último byte enviado.
+
+A origem pode ser um caminho, um objeto binário com `seek()` (ex.: ficheiro
+aberto) ou um buffer (bytes, bytearray, memoryview).
+
+Exemplo:
+    with MultipartFileStream("stem.wav", {"uploadPath": "stems"}, progress=print) as body:
+        session.post(url, data=body, headers={"Content-Type": body.content_type})
+"""
+import abc
+import base64
+import io
+import json
+import os
+import uuid
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+UploadSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def is_buffer(source: UploadSource) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def source_size(source: UploadSource) -> int:
+    """Tamanho em bytes de uma origem de upload, sem a ler."""
+    if is_buffer(source):
+        return memoryview(source).nbytes
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size - position
+
+
+def source_name(source: UploadSource) -> Optional[str]:
+    """Nome de ficheiro de uma origem de upload, se existir."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    name = getattr(source, "name", None)
+    return os.path.basename(name) if isinstance(name, str) else None
+
+
+class _Source:
+    """Acesso aleatório, em blocos, a um caminho, ficheiro ou buffer."""
+
+    def __init__(self, source: UploadSource):
+        self._buffer: Optional[memoryview] = None
+        self._file: Optional[BinaryIO] = None
+        self._owns_file = False
+        self._base = 0
+        if is_buffer(source):
+            self._buffer = memoryview(source).cast("B")
+        elif isinstance(source, (str, os.PathLike)):
+            self._file = open(source, "rb")
+            self._owns_file = True
+        else:
+            self._file = source
+            self._base = source.tell()
+        self.size = source_size(source)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        if self._buffer is not None:
+            return bytes(self._buffer[offset:offset + size])
+        position = self._base + offset
+        if self._file.tell() != position:
+            self._file.seek(position)
+        return self._file.read(size)
+
+    def close(self) -> None:
+        if self._owns_file:
+            self._file.close()
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+
+    @property
+    def closed(self) -> bool:
+        if self._file is not None:
+            return self._owns_file and self._file.closed
+        return self._buffer is None
+
+
+class _StreamBody(abc.ABC):
+    """Corpo HTTP composto por cabeçalho + conteúdo lido sob pedido + rodapé."""
+
+    content_type = "application/octet-stream"
+
+    def __init__(self, source: UploadSource, chunk_size: int, progress: Optional[ProgressCallback]):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._source = _Source(source)
+        self._head = b""
+        self._tail = b""
+        self._pos = 0
+
+    def _finish_layout(self, head: bytes, tail: bytes, middle_size: int) -> None:
+        self._head = head
+        self._tail = tail
+        self._middle_size = middle_size
+        self.len = len(head) + middle_size + len(tail)
+
+    @abc.abstractmethod
+    def _read_middle(self, offset: int, size: int) -> bytes:
+        """Lê `size` bytes do conteúdo já codificado, a partir de `offset`."""
+
+    def __len__(self) -> int:
+        return self.len
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha a origem (apenas se foi aberta por este corpo)."""
+        self._source.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._source.closed
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.len
+        self._pos = max(0, min(offset, self.len))
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.len - self._pos
+        out = bytearray()
+        head_end = len(self._head)
+        middle_end = head_end + self._middle_size
+        while size > 0 and self._pos < self.len:
+            if self._pos < head_end:
+                chunk = self._head[self._pos:self._pos + size]
+            elif self._pos < middle_end:
+                chunk = self._read_middle(self._pos - head_end, min(size, middle_end - self._pos))
+                if not chunk:
+                    raise IOError("origem encurtada durante o upload")
+            else:
+                start = self._pos - middle_end
+                chunk = self._tail[start:start + size]
+            out += chunk
+            self._pos += len(chunk)
+            size -= len(chunk)
+        if out and self.progress is not None:
+            self.progress(self._pos, self.len)
+        return bytes(out)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class MultipartFileStream(_StreamBody):
+    """Corpo multipart/form-data lido em blocos a partir da origem.
+
+    Args:
+      source: caminho, ficheiro binário ou buffer a enviar
+      fields: campos de texto enviados antes do ficheiro
+      field_name: nome do campo do ficheiro
+      file_name: nome do ficheiro no multipart (por omissão, o da origem)
+      chunk_size: tamanho dos blocos lidos da origem
+      progress: função chamada com (bytes_enviados, total) após cada bloco
+    """
+
+    def __init__(
+        self,
+        source: UploadSource,
+        fields: Optional[Dict[str, str]] = None,
+        field_name: str = "file",
+        file_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        super().__init__(source, chunk_size, progress)
+        self.boundary = uuid.uuid4().hex
+        self.file_size = self._source.size
+
+        parts = []
+        for name, value in (fields or {}).items():
+            parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        parts.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote(field_name)}"; '
+            f'filename="{_quote(file_name or source_name(source) or "file")}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        )
+        head = "".join(parts).encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self._finish_layout(head, tail, self.file_size)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _read_middle(self, offset: int, size: int) -> bytes:
+        return self._source.read_at(offset, size)
+
+
+class Base64JsonStream(_StreamBody):
+    """Corpo JSON `{..., "base64Data": "<base64>"}` codificado em blocos.
+
+    O base64 é produzido bloco a bloco (grupos de 3 bytes -> 4 caracteres), pelo
+    que nem a string base64 nem o JSON completo chegam a existir em memória.
+
+    Args:
+      source: caminho, ficheiro binário ou buffer a codificar
+      fields: restantes campos do JSON (ex.: uploadPath, fileName)
+      data_field: nome do campo com os dados em base64
+      chunk_size: tamanho aproximado dos blocos codificados
+      progress: função chamada com (bytes_enviados, total) após cada bloco
+    """
+
+    content_type = "application/json"
+
+    def __init__(
+        self,
+        source: UploadSource,
+        fields: Optional[Dict[str, str]] = None,
+        data_field: str = "base64Data",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        super().__init__(source, chunk_size, progress)
+        members = [f"{json.dumps(k)}: {json.dumps(v)}" for k, v in (fields or {}).items()]
+        members.append(f'{json.dumps(data_field)}: "')
+        head = ("{" + ", ".join(members)).encode("utf-8")
+        encoded_size = 4 * ((self._source.size + 2) // 3)
+        self._finish_layout(head, b'"}', encoded_size)
+
+    def _read_middle(self, offset: int, size: int) -> bytes:
+        # Cada grupo de 4 caracteres codifica 3 bytes da origem
+        group, skip = divmod(offset, 4)
+        groups = (skip + size + 3) // 4
+        raw = self._source.read_at(group * 3, groups * 3)
+        return base64.b64encode(raw)[skip:skip + size]
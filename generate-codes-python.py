@@ -1,126 +1,789 @@
 #!/usr/bin/env python3
 """
-🎫 GERADOR DE 170 CÓDIGOS DE ACESSO EXCLUSIVOS - DUA IA
+🎫 GERADOR DE CÓDIGOS DE ACESSO EXCLUSIVOS - DUA IA
 Gera códigos únicos formato DUA-XXXX-XXX
+
+Os códigos não são sorteados: um contador (0, 1, 2, ...) passa por uma
+permutação secreta de todo o espaço DUA-XXXX-XXX (36^7 códigos), pelo que
+contadores diferentes dão sempre códigos diferentes, sem conjunto de
+repetidos nem tentativas falhadas. A permutação é uma rede de Feistel com
+chave (gerada com `secrets` e guardada em --key-file); sem a chave, os
+códigos não são previsíveis.
+
+Com a mesma chave, o espaço pode ser dividido em shards (--shard 3/16) e
+cada shard gerado de forma determinística, em máquinas ou dias diferentes.
+Execuções que partilham o mesmo registo (--registry) não correm em paralelo:
+a segunda espera que a primeira termine e continua a partir do registo dela.
+
+Os códigos são exportados em streaming (lote a lote, memória constante)
+para TXT, JSON Lines, CSV, COPY do Postgres (psql -f, uma única operação
+em bloco) e/ou INSERTs de várias linhas para o SQL Editor do Supabase.
+
+Com --check-char os códigos ganham um carácter de controlo (DUA-XXXX-XXXC,
+ISO 7064 MOD 37,36), e erros de digitação são recusados sem ir à base de dados.
+O subcomando `index` constrói um índice binário ordenado (e, opcionalmente,
+um filtro de Bloom) dos códigos emitidos, que é lido com mmap: a
+pré-validação corre no próprio processo sem carregar a lista inteira.
+
+Uso:
+    python3 generate-codes-python.py                      # 170 códigos novos, TXT
+    python3 generate-codes-python.py --quantity 1000000 --shard 0/8 --format copy,csv
+    python3 generate-codes-python.py index CODIGOS_*.txt *.sql --bloom dua-codes.bloom
+    python3 generate-codes-python.py lookup DUA-03BN-9QT --bloom dua-codes.bloom
+    python3 generate-codes-python.py --quantity 50000 --format sql
+    python3 generate-codes-python.py --no-incremental --start 0   # reexportar um intervalo
+
+Por omissão (modo incremental), os códigos dos lotes anteriores (os ficheiros
+de 170 códigos do repositório e o registo dua-codes.idx) são excluídos, o
+contador continua onde a última execução parou e o registo é atualizado no
+fim: duas execuções seguidas nunca emitem os mesmos códigos. Com
+--no-incremental o registo é ignorado e --start é obrigatório (reproduz
+deliberadamente um intervalo de contadores já conhecido).
+
+⚠️  Guarde o ficheiro da chave fora do git: quem o tiver consegue
+    reproduzir todos os códigos.
 """
 
-import random
+import argparse
+import bisect
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import secrets
 import string
+import struct
+import sys
+from array import array
 from datetime import datetime
 
-def generate_code():
-    """Gera código formato DUA-XXXX-XXX"""
-    chars = string.ascii_uppercase + string.digits
-    part2 = ''.join(random.choices(chars, k=4))
-    part3 = ''.join(random.choices(chars, k=3))
-    return f"DUA-{part2}-{part3}"
-
-def generate_unique_codes(quantity=170):
-    """Gera conjunto de códigos únicos"""
-    codes = set()
-    attempts = 0
-    max_attempts = quantity * 10
-    
+# Ordem ASCII (0-9, A-Z): a codificação inteira de um código é int(..., 36)
+ALPHABET = string.digits + string.ascii_uppercase
+CODE_LENGTH = 7
+SPACE = len(ALPHABET) ** CODE_LENGTH  # 36^7 = 78.364.164.096 códigos
+HALF = 6 ** CODE_LENGTH               # 36^7 = HALF^2: Feistel equilibrada, sem cycle-walking
+ROUNDS = 8
+BATCH_SIZE = 100_000
+DEFAULT_KEY_FILE = 'dua-codes.key'
+
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+_TRIPLES = None
+
+
+def check_char(body):
+    """Carácter de controlo ISO 7064 MOD 37,36 dos 7 caracteres do código
+
+    Deteta qualquer carácter trocado e quase todas as trocas de dois caracteres vizinhos.
+    """
+    p = 36
+    for c in body:
+        s = (p + ALPHABET.index(c)) % 36 or 36
+        p = (2 * s) % 37
+    return ALPHABET[(1 - p) % 36]
+
+
+def encode_code(number, check=False):
+    """Converte um inteiro em [0, 36^7) no código DUA-XXXX-XXX (DUA-XXXX-XXXC com check)"""
+    global _TRIPLES
+    if _TRIPLES is None:
+        _TRIPLES = [pair + c for pair in _PAIRS for c in ALPHABET]
+    head, tail = divmod(number, 46656)
+    head = _PAIRS[head // 1296] + _PAIRS[head % 1296]
+    tail = _TRIPLES[tail]
+    if check:
+        return f"DUA-{head}-{tail}{check_char(head + tail)}"
+    return f"DUA-{head}-{tail}"
+
+
+def decode_code(code, check=None):
+    """Converte um código no seu inteiro (ValueError se inválido)
+
+    Aceita DUA-XXXX-XXX e DUA-XXXX-XXXC; check=True exige o carácter de
+    controlo e check=False recusa-o.
+    """
+    code = code.strip().upper()
+    if len(code) not in (12, 13) or code[:4] != 'DUA-' or code[8] != '-':
+        raise ValueError(f"invalid access code: {code!r}")
+    body = code[4:8] + code[9:12]
+    if not all(c in ALPHABET for c in code[4:8] + code[9:]):
+        raise ValueError(f"invalid access code: {code!r}")
+    has_check = len(code) == 13
+    if check is not None and has_check != check:
+        raise ValueError(f"invalid access code: {code!r}")
+    if has_check and code[12] != check_char(body):
+        raise ValueError(f"check character mismatch: {code!r}")
+    return int(body, 36)
+
+
+def load_or_create_key(path=DEFAULT_KEY_FILE):
+    """Lê a chave da permutação ou cria uma nova com o CSPRNG do sistema"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return bytes.fromhex(f.read().strip())
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(key.hex() + '\n')
+    print(f"🔑 Nova chave criada: {path} (guarde-a em lugar seguro)")
+    return key
+
+
+class CodePermutation:
+    """Permutação com chave de [0, 36^7), aplicada em lotes
+
+    Cada ronda da Feistel usa uma tabela de HALF valores pseudoaleatórios
+    derivada da chave com SHAKE-256, o que torna cada ronda uma simples
+    consulta por elemento do lote.
+    """
+
+    def __init__(self, key, rounds=ROUNDS):
+        if len(key) < 16:
+            raise ValueError("permutation key must have at least 16 bytes")
+        self.tables = []
+        for r in range(rounds):
+            stream = hashlib.shake_256(b'dua-codes' + bytes([r]) + key).digest(4 * HALF)
+            values = array('I')
+            values.frombytes(stream)
+            self.tables.append(array('I', [v % HALF for v in values]))
+
+    def permute(self, numbers):
+        """Aplica a permutação a uma lista de inteiros"""
+        left = [n // HALF for n in numbers]
+        right = [n % HALF for n in numbers]
+        for table in self.tables:
+            left, right = right, [(l + table[r]) % HALF for l, r in zip(left, right)]
+        return [l * HALF + r for l, r in zip(left, right)]
+
+    def invert(self, numbers):
+        """Inversa de permute: devolve o contador que originou cada código"""
+        left = [n // HALF for n in numbers]
+        right = [n % HALF for n in numbers]
+        for table in reversed(self.tables):
+            left, right = [(r - table[l]) % HALF for l, r in zip(left, right)], left
+        return [l * HALF + r for l, r in zip(left, right)]
+
+
+def shard_range(shard, shards):
+    """Intervalo [início, fim) de contadores do shard `shard` de `shards`"""
+    if not 0 <= shard < shards:
+        raise ValueError(f"shard must be in [0, {shards})")
+    return shard * SPACE // shards, (shard + 1) * SPACE // shards
+
+
+def generate_code_batches(permutation, start=0, quantity=170, batch_size=BATCH_SIZE, stop=SPACE, check=False):
+    """Gera os códigos dos contadores [start, start + quantity), em lotes"""
+    if start < 0 or start + quantity > stop:
+        raise ValueError(f"cannot generate {quantity} codes from counter {start}: only {stop - start} left")
+    for offset in range(start, start + quantity, batch_size):
+        counters = range(offset, min(offset + batch_size, start + quantity))
+        yield [encode_code(n, check) for n in permutation.permute(counters)]
+
+
+def generate_unique_codes(quantity=170, key=None, start=0):
+    """Gera conjunto de códigos únicos (sempre exatamente `quantity`)"""
+    permutation = CodePermutation(key or secrets.token_bytes(32))
+
     print(f"\n🔄 Gerando {quantity} códigos únicos...\n")
-    
-    while len(codes) < quantity and attempts < max_attempts:
-        code = generate_code()
-        if code not in codes:
-            codes.add(code)
-            if len(codes) % 10 == 0:
-                print(f"   ✓ {len(codes)} códigos gerados...")
-        attempts += 1
-    
-    return sorted(list(codes))
 
-def export_codes(codes):
-    """Exporta códigos para TXT e JSON"""
-    timestamp = datetime.now().strftime('%Y-%m-%d')
-    
-    # Criar TXT
-    txt_lines = [
-        '═══════════════════════════════════════════════════════════',
-        '   🎫 CÓDIGOS DE ACESSO EXCLUSIVOS - DUA IA',
-        '═══════════════════════════════════════════════════════════',
-        '',
-        f'Data de Geração: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}',
-        f'Total de Códigos: {len(codes)}',
-        f'Validade: Uso único por código',
-        '',
-        '⚠️  IMPORTANTE: Apenas 170 códigos disponíveis!',
-        '   Cada código dá acesso TOTAL à plataforma DUA IA',
-        '',
-        '───────────────────────────────────────────────────────────',
-        '   CÓDIGOS DE ACESSO (170 EXCLUSIVOS)',
-        '───────────────────────────────────────────────────────────',
-        '',
-    ]
-    
-    for i, code in enumerate(codes, 1):
-        txt_lines.append(f'{str(i).zfill(3)}. {code}')
-    
-    txt_lines.extend([
-        '',
-        '───────────────────────────────────────────────────────────',
-        '   BENEFÍCIOS POR CÓDIGO',
-        '───────────────────────────────────────────────────────────',
-        '',
-        '✅ Acesso completo à plataforma DUA IA',
-        '✅ 5.000 tokens iniciais',
-        '✅ 1.000 DUA Coins',
-        '✅ Tier Premium automático',
-        '✅ Acesso a todos os estúdios',
-        '✅ Chat AI ilimitado',
-        '✅ Design Studio completo',
-        '✅ Voice AI premium',
-        '',
-        '───────────────────────────────────────────────────────────',
-        '   COMO USAR',
-        '───────────────────────────────────────────────────────────',
-        '',
-        '1. Acesse: https://dua.pt/acesso',
-        '2. Insira o código de acesso',
-        '3. Insira seu email',
-        '4. Receba o magic link por email',
-        '5. Faça login e aproveite!',
-        '',
-        '⚠️  ATENÇÃO:',
-        '   • Cada código só pode ser usado UMA VEZ',
-        '   • Após uso, o código fica inativo',
-        '   • Guarde seu código em lugar seguro',
-        '',
-        '═══════════════════════════════════════════════════════════',
-    ])
-    
-    txt_content = '\n'.join(txt_lines)
-    txt_file = f'CODIGOS_ACESSO_DUA_{timestamp}.txt'
-    
-    with open(txt_file, 'w', encoding='utf-8') as f:
-        f.write(txt_content)
-    
-    print(f"\n📄 Arquivo gerado: {txt_file}")
-    print(f"   Total de códigos: {len(codes)}")
-    
-    return txt_file
+    codes = []
+    for batch in generate_code_batches(permutation, start, quantity):
+        codes.extend(batch)
+        print(f"   ✓ {len(codes)} códigos gerados...")
+
+    return sorted(codes)
+
+TXT_FOOTER = [
+    '',
+    '───────────────────────────────────────────────────────────',
+    '   BENEFÍCIOS POR CÓDIGO',
+    '───────────────────────────────────────────────────────────',
+    '',
+    '✅ Acesso completo à plataforma DUA IA',
+    '✅ 5.000 tokens iniciais',
+    '✅ 1.000 DUA Coins',
+    '✅ Tier Premium automático',
+    '✅ Acesso a todos os estúdios',
+    '✅ Chat AI ilimitado',
+    '✅ Design Studio completo',
+    '✅ Voice AI premium',
+    '',
+    '───────────────────────────────────────────────────────────',
+    '   COMO USAR',
+    '───────────────────────────────────────────────────────────',
+    '',
+    '1. Acesse: https://dua.pt/acesso',
+    '2. Insira o código de acesso',
+    '3. Insira seu email',
+    '4. Receba o magic link por email',
+    '5. Faça login e aproveite!',
+    '',
+    '⚠️  ATENÇÃO:',
+    '   • Cada código só pode ser usado UMA VEZ',
+    '   • Após uso, o código fica inativo',
+    '   • Guarde seu código em lugar seguro',
+    '',
+    '═══════════════════════════════════════════════════════════',
+]
+
+EXPORT_FORMATS = ('txt', 'jsonl', 'csv', 'copy', 'sql')
+INSERT_BATCH = 1000
+
+
+class TxtExporter:
+    """Lista numerada para distribuição, com cabeçalho e instruções"""
+
+    extension = 'txt'
+
+    def __init__(self, f, total):
+        self.f = f
+        self.count = 0
+        self.width = max(3, len(str(total)))
+        f.write('\n'.join([
+            '═══════════════════════════════════════════════════════════',
+            '   🎫 CÓDIGOS DE ACESSO EXCLUSIVOS - DUA IA',
+            '═══════════════════════════════════════════════════════════',
+            '',
+            f'Data de Geração: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}',
+            f'Total de Códigos: {total}',
+            f'Validade: Uso único por código',
+            '',
+            f'⚠️  IMPORTANTE: Apenas {total} códigos disponíveis!',
+            '   Cada código dá acesso TOTAL à plataforma DUA IA',
+            '',
+            '───────────────────────────────────────────────────────────',
+            f'   CÓDIGOS DE ACESSO ({total} EXCLUSIVOS)',
+            '───────────────────────────────────────────────────────────',
+            '',
+            '',
+        ]))
+
+    def write(self, codes):
+        start = self.count + 1
+        self.f.write(''.join(f'{str(i).zfill(self.width)}. {code}\n' for i, code in enumerate(codes, start)))
+        self.count += len(codes)
+
+    def close(self):
+        self.f.write('\n'.join(TXT_FOOTER))
+
+
+class JsonlExporter:
+    """Um objeto JSON por linha: {"code": "DUA-XXXX-XXX"}"""
+
+    extension = 'jsonl'
+
+    def __init__(self, f, total):
+        self.f = f
+
+    def write(self, codes):
+        self.f.write(''.join(f'{{"code":"{code}"}}\n' for code in codes))
+
+    def close(self):
+        pass
+
+
+class CsvExporter:
+    """CSV com uma coluna `code`"""
+
+    extension = 'csv'
+
+    def __init__(self, f, total):
+        self.f = f
+        f.write('code\n')
+
+    def write(self, codes):
+        self.f.write(''.join(f'{code}\n' for code in codes))
+
+    def close(self):
+        pass
+
+
+class CopyExporter:
+    """Ficheiro para `psql -f`: um único COPY ... FROM stdin com todos os códigos"""
+
+    extension = 'copy.sql'
+
+    def __init__(self, f, total):
+        self.f = f
+        f.write(f'-- {total} códigos de acesso DUA - executar com: psql "$DATABASE_URL" -f <ficheiro>\n')
+        f.write('COPY public.invite_codes (code, active) FROM stdin;\n')
+
+    def write(self, codes):
+        self.f.write(''.join(f'{code}\tt\n' for code in codes))
+
+    def close(self):
+        self.f.write('\\.\n')
+
+
+class InsertExporter:
+    """INSERTs de várias linhas (INSERT_BATCH por instrução), para o SQL Editor do Supabase"""
+
+    extension = 'sql'
+
+    def __init__(self, f, total):
+        self.f = f
+        self.pending = []
+        f.write(f'-- {total} códigos de acesso DUA\nBEGIN;\n')
+
+    def write(self, codes):
+        self.pending.extend(codes)
+        while len(self.pending) >= INSERT_BATCH:
+            self._flush(self.pending[:INSERT_BATCH])
+            del self.pending[:INSERT_BATCH]
+
+    def _flush(self, codes):
+        values = ',\n'.join(f"('{code}', true)" for code in codes)
+        self.f.write(f'INSERT INTO public.invite_codes (code, active) VALUES\n{values}\nON CONFLICT (code) DO NOTHING;\n')
+
+    def close(self):
+        if self.pending:
+            self._flush(self.pending)
+        self.f.write('COMMIT;\n')
+
+
+EXPORTERS = {
+    'txt': TxtExporter,
+    'jsonl': JsonlExporter,
+    'csv': CsvExporter,
+    'copy': CopyExporter,
+    'sql': InsertExporter,
+}
+
+
+def export_codes(batches, total, formats=('txt',), prefix=None):
+    """Exporta os códigos, lote a lote, para TXT, JSONL, CSV, COPY e/ou INSERT
+
+    Cada lote é escrito em todos os ficheiros e descartado, pelo que a
+    memória usada não depende do número de códigos.
+    """
+    prefix = prefix or f'CODIGOS_ACESSO_DUA_{datetime.now().strftime("%Y-%m-%d")}'
+    files, exporters = [], []
+    try:
+        for name in formats:
+            exporter = EXPORTERS[name]
+            f = open(f'{prefix}.{exporter.extension}', 'w', encoding='utf-8', newline='')
+            files.append(f)
+            exporters.append(exporter(f, total))
+
+        written = 0
+        for codes in batches:
+            for exporter in exporters:
+                exporter.write(codes)
+            written += len(codes)
+            print(f"   ✓ {written} códigos exportados...")
+
+        for exporter in exporters:
+            exporter.close()
+    finally:
+        for f in files:
+            f.close()
+
+    paths = [f.name for f in files]
+    for path in paths:
+        print(f"\n📄 Arquivo gerado: {path}")
+    print(f"   Total de códigos: {written}")
+
+    return paths
+
+CODE_PATTERN = re.compile(r'DUA-([0-9A-Z]{4})-([0-9A-Z]{3})[0-9A-Z]?\b')
+DEFAULT_INDEX_FILE = 'dua-codes.idx'
+# Lotes já emitidos, excluídos no modo --incremental
+ISSUED_FILES = (
+    '170_CODIGOS_LISTA_SIMPLES.txt',
+    'insert-170-codes.sql',
+    'INSERT_170_CODIGOS_DUA.sql',
+    'CODIGOS_ACESSO_DUA_2025-11-07.txt',
+)
+INDEX_MAGIC = b'DUAX'
+INDEX_HEADER = struct.Struct('<4sIQ')   # magic, versão, nº de códigos
+BLOOM_MAGIC = b'DUAB'
+BLOOM_HEADER = struct.Struct('<4sIQ')   # magic, nº de funções de hash, nº de bits
+SORT_SHIFT = 29                         # 146 intervalos de 2^29 valores
+
+
+def read_issued_codes(paths):
+    """Inteiros dos códigos em ficheiros TXT/CSV/JSONL/SQL, ordenados e sem repetidos
+
+    Os valores são distribuídos por intervalos (arrays de uint64) e cada um
+    é ordenado à parte, para nunca ter todos os códigos numa lista Python.
+    """
+    buckets = [array('Q') for _ in range(((SPACE - 1) >> SORT_SHIFT) + 1)]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            while True:
+                lines = f.readlines(1 << 20)
+                if not lines:
+                    break
+                for head, tail in CODE_PATTERN.findall(''.join(lines)):
+                    number = int(head + tail, 36)
+                    buckets[number >> SORT_SHIFT].append(number)
+
+    numbers = array('Q')
+    for bucket in buckets:
+        numbers.extend(sorted(set(bucket)))
+        del bucket[:]
+    return numbers
+
+
+def merge_codes(a, b):
+    """União de dois arrays ordenados de códigos, intervalo a intervalo"""
+    if not b:
+        return a
+    if not a:
+        return b
+    merged = array('Q')
+    for high in range(((SPACE - 1) >> SORT_SHIFT) + 1):
+        lo, hi = high << SORT_SHIFT, (high + 1) << SORT_SHIFT
+        part_a = a[bisect.bisect_left(a, lo):bisect.bisect_left(a, hi)]
+        part_b = b[bisect.bisect_left(b, lo):bisect.bisect_left(b, hi)]
+        if not part_b or not part_a:
+            merged.extend(part_a or part_b)
+        else:
+            merged.extend(sorted(set(part_a).union(part_b)))
+    return merged
+
+
+def write_index(path, numbers):
+    """Grava o índice: cabeçalho + uint64 little-endian ordenados (substituição atómica)"""
+    if sys.byteorder == 'big':
+        numbers = array('Q', numbers)
+        numbers.byteswap()
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, 1, len(numbers)))
+        numbers.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def read_index(path):
+    """Carrega um índice inteiro para um array('Q')"""
+    with open(path, 'rb') as f:
+        magic, _, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"not an access-code index: {path}")
+        numbers = array('Q')
+        numbers.fromfile(f, count)
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    return numbers
+
+
+class CodeIndex:
+    """Índice ordenado de códigos emitidos, lido com mmap (procura binária, O(log n))
+
+    Só as páginas visitadas pela procura são lidas do disco.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, count = INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"not an access-code index: {path}")
+        self.count = count
+        view = memoryview(self._map)[INDEX_HEADER.size:INDEX_HEADER.size + 8 * count]
+        self._numbers = view.cast('Q') if sys.byteorder == 'little' else array('Q', view.tobytes())
+        if sys.byteorder == 'big':
+            self._numbers.byteswap()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, code):
+        number = code if isinstance(code, int) else decode_code(code)
+        i = bisect.bisect_left(self._numbers, number)
+        return i < self.count and self._numbers[i] == number
+
+    def close(self):
+        if isinstance(self._numbers, memoryview):
+            self._numbers.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CodeRegistry:
+    """Registo persistente dos códigos já emitidos, para gerar só códigos novos
+
+    Guarda o índice ordenado de todos os códigos emitidos (o mesmo formato
+    do subcomando `index`) e, em <path>.json, o próximo contador de cada
+    shard. Os códigos gerados que já constem do registo são ignorados.
+
+    O registo fica bloqueado (lock exclusivo em <path>.lock) desde a leitura
+    até `close()`: uma segunda execução espera, em vez de ler um registo que
+    vai ser substituído e perder os códigos emitidos entretanto.
+
+    Args:
+      path: ficheiro do índice (criado na primeira execução)
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self.state_path = f'{path}.json'
+        self._lock = self._acquire(f'{path}.lock')
+        self.numbers = read_index(path) if os.path.exists(path) else array('Q')
+        self.counters = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.counters = json.load(f).get('next', {})
+        self.new = array('Q')
+        self.skipped = 0
+
+    @staticmethod
+    def _acquire(lock_path):
+        f = open(lock_path, 'a+b')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    print(f"⏳ Registo em uso por outra execução; a aguardar ({lock_path})", file=sys.stderr)
+                    fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            f.close()
+            raise
+        # libertado por close() ou, se o processo terminar, pelo sistema operativo
+        return f
+
+    def close(self):
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __contains__(self, number):
+        i = bisect.bisect_left(self.numbers, number)
+        return i < len(self.numbers) and self.numbers[i] == number
+
+    def add_files(self, paths):
+        """Junta ao registo os códigos de exportações anteriores"""
+        self.numbers = merge_codes(self.numbers, read_issued_codes(paths))
+
+    def generate(self, permutation, quantity, start=0, stop=SPACE, shard='all', check=False, batch_size=BATCH_SIZE):
+        """Gera `quantity` códigos novos, em lotes, a partir do contador guardado para o shard"""
+        counter = max(self.counters.get(shard, start), start)
+        remaining = quantity
+        while remaining:
+            if counter >= stop:
+                raise ValueError(f"shard {shard} exhausted after {quantity - remaining} new codes")
+            counters = range(counter, min(counter + min(remaining, batch_size), stop))
+            fresh = [n for n in permutation.permute(counters) if n not in self]
+            self.skipped += len(counters) - len(fresh)
+            self.new.extend(fresh)
+            counter += len(counters)
+            self.counters[shard] = counter
+            remaining -= len(fresh)
+            yield [encode_code(n, check) for n in fresh]
+
+    def save(self):
+        """Grava o índice com os códigos novos e os contadores"""
+        self.numbers = merge_codes(self.numbers, array('Q', sorted(self.new)))
+        self.new = array('Q')
+        write_index(self.path, self.numbers)
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'next': self.counters, 'count': len(self.numbers)}, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+def _bloom_positions(number, hashes, bits):
+    """Posições do código no filtro (splitmix64 + double hashing)"""
+    z = (number * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    z ^= z >> 31
+    h1, h2 = z >> 32, (z & 0xFFFFFFFF) | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def write_bloom(path, numbers, error_rate=0.001):
+    """Grava um filtro de Bloom dos códigos (cerca de 14 bits por código a 0,1%)"""
+    count = max(len(numbers), 1)
+    bits = max(64, int(-count * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / count * math.log(2)))
+    table = bytearray((bits + 7) // 8)
+    for number in numbers:
+        for bit in _bloom_positions(number, hashes, bits):
+            table[bit >> 3] |= 1 << (bit & 7)
+    with open(path, 'wb') as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, hashes, bits))
+        f.write(table)
+
+
+class BloomFilter:
+    """Filtro de Bloom lido com mmap: O(1), sem falsos negativos"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.hashes, self.bits = BLOOM_HEADER.unpack_from(self._map)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"not an access-code Bloom filter: {path}")
+
+    def __contains__(self, code):
+        number = code if isinstance(code, int) else decode_code(code)
+        table, offset = self._map, BLOOM_HEADER.size
+        return all(table[offset + (bit >> 3)] & (1 << (bit & 7)) for bit in _bloom_positions(number, self.hashes, self.bits))
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prevalidate(code, index, bloom=None, check=None):
+    """Pré-validação local: 'invalid', 'unknown' (não emitido) ou 'issued'
+
+    Só os códigos 'issued' precisam de ir à base de dados.
+    """
+    try:
+        number = decode_code(code, check)
+    except ValueError:
+        return 'invalid'
+    if bloom is not None and number not in bloom:
+        return 'unknown'
+    return 'issued' if number in index else 'unknown'
+
+
+def build_index(args):
+    print(f"\n🔄 A ler códigos de {len(args.files)} ficheiro(s)...")
+    numbers = read_issued_codes(args.files)
+    write_index(args.index, numbers)
+    print(f"\n📇 Índice gerado: {args.index} ({len(numbers)} códigos, {8 * len(numbers) + INDEX_HEADER.size} bytes)")
+    if args.bloom:
+        write_bloom(args.bloom, numbers, args.error_rate)
+        print(f"🌸 Filtro de Bloom: {args.bloom} ({os.path.getsize(args.bloom)} bytes)")
+
+
+def lookup_codes(args):
+    bloom = BloomFilter(args.bloom) if args.bloom else None
+    with CodeIndex(args.index) as index:
+        for code in args.codes:
+            print(f"{code}\t{prevalidate(code, index, bloom, args.check)}")
+    if bloom is not None:
+        bloom.close()
+
+def parse_shard(value):
+    """Converte '3/16' em (3, 16)"""
+    shard, _, shards = value.partition('/')
+    return int(shard), int(shards)
+
 
 def main():
+    parser = argparse.ArgumentParser(description='Gerador de códigos de acesso DUA-XXXX-XXX')
+    parser.add_argument('--quantity', type=int, default=170, help='número de códigos (por omissão, 170)')
+    parser.add_argument('--key-file', default=DEFAULT_KEY_FILE, help='chave da permutação (criada se não existir)')
+    parser.add_argument('--shard', type=parse_shard, help='gerar dentro do shard I/N do espaço, ex.: 3/16')
+    parser.add_argument('--start', type=int, help='primeiro contador (relativo ao shard; obrigatório com --no-incremental)')
+    parser.add_argument('--format', default='txt',
+                        help=f'formatos separados por vírgulas: {",".join(EXPORT_FORMATS)} (por omissão, txt)')
+    parser.add_argument('--output-prefix', help='prefixo dos ficheiros (por omissão, CODIGOS_ACESSO_DUA_<data>)')
+    parser.add_argument('--check-char', action='store_true', help='acrescentar o carácter de controlo (DUA-XXXX-XXXC)')
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                        help='excluir os códigos já emitidos e atualizar o registo --registry (por omissão)')
+    parser.add_argument('--registry', default=DEFAULT_INDEX_FILE, help='índice dos códigos emitidos')
+    parser.add_argument('--issued', nargs='*',
+                        help='exportações anteriores a excluir (por omissão, os lotes de 170 do repositório)')
+    commands = parser.add_subparsers(dest='command')
+
+    index_parser = commands.add_parser('index', help='construir o índice binário dos códigos emitidos')
+    index_parser.add_argument('files', nargs='+', help='exportações TXT/CSV/JSONL/SQL com códigos')
+    index_parser.add_argument('--index', default=DEFAULT_INDEX_FILE)
+    index_parser.add_argument('--bloom', help='gravar também um filtro de Bloom neste ficheiro')
+    index_parser.add_argument('--error-rate', type=float, default=0.001, help='falsos positivos do filtro de Bloom')
+
+    lookup_parser = commands.add_parser('lookup', help='pré-validar códigos com o índice')
+    lookup_parser.add_argument('codes', nargs='+')
+    lookup_parser.add_argument('--index', default=DEFAULT_INDEX_FILE)
+    lookup_parser.add_argument('--bloom')
+    lookup_parser.add_argument('--check', action=argparse.BooleanOptionalAction, default=None,
+                               help='exigir (--check) ou recusar (--no-check) o carácter de controlo')
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        return build_index(args)
+    if args.command == 'lookup':
+        return lookup_codes(args)
+
+    formats = [name.strip() for name in args.format.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        parser.error(f'formato desconhecido: {", ".join(unknown)}')
+
     print('\n╔═══════════════════════════════════════════════════════════╗')
-    print('║   🎫 GERADOR DE CÓDIGOS - DUA IA (170 EXCLUSIVOS)        ║')
+    print('║   🎫 GERADOR DE CÓDIGOS - DUA IA                          ║')
     print('╚═══════════════════════════════════════════════════════════╝')
-    
-    # Gerar códigos
-    codes = generate_unique_codes(170)
-    
-    # Exportar
-    txt_file = export_codes(codes)
+
+    if not args.incremental and args.start is None:
+        parser.error('--no-incremental exige --start (sem registo, o mesmo --start volta a emitir os mesmos códigos)')
+    key = load_or_create_key(args.key_file)
+    start, stop = shard_range(*args.shard) if args.shard else (0, SPACE)
+    args.start = args.start or 0
+    if start + args.start + args.quantity > stop:
+        parser.error(f'o intervalo pedido excede o shard ({stop - start} contadores)')
+    first = start + args.start
+
+    registry = None
+    if args.incremental:
+        # O lock do registo cobre a leitura, a geração e a gravação
+        registry = CodeRegistry(args.registry)
+        if args.issued is None:
+            here = os.path.dirname(os.path.abspath(__file__))
+            args.issued = [path for path in (os.path.join(here, name) for name in ISSUED_FILES) if os.path.exists(path)]
+        registry.add_files(args.issued)
+        shard = '/'.join(map(str, args.shard)) if args.shard else 'all'
+        first = max(registry.counters.get(shard, first), first)
+        print(f"\n📇 Registo: {len(registry)} códigos já emitidos ({args.registry})")
+        # Verificar antes de exportar, para não deixar ficheiros parciais
+        if stop - first < args.quantity:
+            parser.error(f'restam apenas {stop - first} contadores no shard {shard} ({args.quantity} pedidos)')
+
+    # Gerar e exportar, lote a lote
+    print(f"\n🔄 Gerando {args.quantity} códigos únicos...\n")
+    permutation = CodePermutation(key)
+    if registry is not None:
+        batches = registry.generate(permutation, args.quantity, first, stop, shard, args.check_char)
+    else:
+        batches = generate_code_batches(permutation, first, args.quantity, check=args.check_char)
+    paths = export_codes(batches, args.quantity, formats, args.output_prefix)
+    last = registry.counters[shard] - 1 if registry is not None else first + args.quantity - 1
+    if registry is not None:
+        registry.save()
+        registry.close()
+        print(f"\n📇 Registo atualizado: {len(registry)} códigos ({registry.skipped} repetidos ignorados)")
     
     print('\n╔═══════════════════════════════════════════════════════════╗')
     print('║   ✅ CÓDIGOS GERADOS COM SUCESSO                          ║')
     print('╚═══════════════════════════════════════════════════════════╝')
     print(f'\n📊 Resumo:')
-    print(f'   • Total de códigos: {len(codes)}')
-    print(f'   • Formato: DUA-XXXX-XXX')
-    print(f'   • Arquivo: {txt_file}')
+    print(f'   • Total de códigos: {args.quantity}')
+    print(f'   • Formato: {"DUA-XXXX-XXXC" if args.check_char else "DUA-XXXX-XXX"}')
+    print(f'   • Contadores: {first} a {last}')
+    print(f'   • Arquivos: {", ".join(paths)}')
     print(f'   • Status: ✅ PRONTO PARA USO\n')
 
 if __name__ == '__main__':
@@ -0,0 +1,509 @@
+"""
+Catálogo de pacotes de créditos DUA no Stripe, criado em processo.
+
+Substitui o `stripe products create` (CLI) e o `curl` lançados por cada
+produto e preço em create-stripe-products.py e create-stripe-live-products.py.
+O `StripeCatalog` fala diretamente com a API REST do Stripe:
+
+- um único `requests.Session` com pool de ligações keep-alive
+- os pacotes são criados em paralelo (produto e depois preço, por pacote)
+- cada POST leva um `Idempotency-Key` derivado do próprio pedido, por isso
+  os retries (429/5xx/erros de rede) e uma nova execução logo após um crash
+  devolvem o mesmo objeto em vez de criar um duplicado (o Stripe guarda as
+  chaves durante 24h)
+- o URL base é configurável (`base_url` ou STRIPE_API_BASE), para testar
+  contra um servidor local
+
+Modo `sync` (reconciliação): em vez de criar tudo de novo, lista os
+produtos e preços existentes (com paginação, 100 por página), associa-os
+aos pacotes pelo metadata[pack_id], calcula a diferença e faz só os
+pedidos necessários: criar o que falta, atualizar nome/descrição/créditos,
+criar um preço novo quando o valor muda (os valores dos preços do Stripe
+são imutáveis), e arquivar preços antigos, duplicados e pacotes que
+saíram do catálogo. Sem alterações, uma execução faz apenas os pedidos de
+listagem. No fim, grava o stripe-products.env a partir do estado real.
+Produtos sem metadata[pack_id] (ex.: criados à mão) nunca são alterados,
+exceto os listados em MANUAL_PRODUCTS: o Starter de teste, criado à mão,
+e os 6 produtos live criados pelo antigo script de curl são adotados no
+primeiro sync (recebem o metadata[pack_id]) em vez de duplicados.
+
+O sync só aceita a chave do modo do catálogo (`test` usa STRIPE_TEST_API_KEY
+e tem de ser sk_test_, `live` usa STRIPE_API_KEY e tem de ser sk_live_), e
+recusa aplicar alterações se algum objeto listado for de outro modo: os dois
+catálogos usam os mesmos pack_id.
+
+    python3 stripe_catalog.py sync --catalog test --dry-run
+    python3 stripe_catalog.py sync --catalog live --env-file stripe-live-products.env
+    python3 stripe_catalog.py sync --catalog packs.json --mode test
+
+Requisitos:
+- Instale a biblioteca `requests` (ex.: pip install requests).
+
+Exemplo:
+    with StripeCatalog(load_api_key()) as catalog:
+        created, errors = catalog.create_all(PACKS)
+"""
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+STRIPE_API_BASE = os.environ.get("STRIPE_API_BASE", "https://api.stripe.com/v1")
+
+# 409 = pedido idempotente ainda em curso no Stripe
+RETRY_STATUSES = (409, 429, 500, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class Pack(NamedTuple):
+    """Pacote de créditos: um produto com um preço único em EUR."""
+
+    pack_id: str
+    name: str
+    description: str
+    credits: int
+    price_eur: float
+
+    @property
+    def unit_amount(self) -> int:
+        """Preço em cêntimos."""
+        return int(round(self.price_eur * 100))
+
+    def metadata(self) -> Dict[str, str]:
+        return {"metadata[pack_id]": self.pack_id, "metadata[credits]": str(self.credits)}
+
+
+# Pacotes DUA Premium (modo de teste); o Starter foi criado manualmente
+PACKS = [
+    Pack("basic", "DUA Premium - Pack Basic", "350 créditos para IA", 350, 10.00),
+    Pack("standard", "DUA Premium - Pack Standard", "550 créditos para IA (+10% bônus)", 550, 15.00),
+    Pack("plus", "DUA Premium - Pack Plus", "1150 créditos para IA (+15% bônus)", 1150, 30.00),
+    Pack("pro", "DUA Premium - Pack Pro", "2400 créditos para IA (+20% bônus)", 2400, 60.00),
+    Pack("premium", "DUA Premium - Pack Premium", "6250 créditos para IA (+25% bônus)", 6250, 150.00),
+]
+
+# Starter do modo de teste (criado à mão antes deste módulo; o sync adota-o, ver MANUAL_PRODUCTS)
+STARTER = Pack("starter", "DUA Premium - Pack Starter", "170 créditos para IA", 170, 5.00)
+
+# Pacotes em live mode
+LIVE_PACKS = [
+    Pack(name.lower(), name, f"{credits} créditos DUA", credits, price_eur)
+    for name, price_eur, credits in (
+        ("Starter", 5, 170),
+        ("Basic", 15, 570),
+        ("Standard", 30, 1250),
+        ("Plus", 60, 2650),
+        ("Pro", 100, 4700),
+        ("Premium", 150, 6250),
+    )
+]
+
+
+CATALOGS = {
+    "test": [STARTER] + PACKS,
+    "live": LIVE_PACKS,
+}
+
+# Produtos criados sem metadata[pack_id] (à mão ou pelo antigo script de curl)
+# que o sync adota, por modo (ver STRIPE_LIVE_MODE_100_PERCENT.md)
+MANUAL_PRODUCTS: Dict[str, Dict[str, str]] = {
+    "test": {"starter": "prod_TOs8oftD7TGtI1"},
+    "live": {
+        "starter": "prod_TOsoJpHI1xJ4hF",
+        "basic": "prod_TOso3I5rZhMTmU",
+        "standard": "prod_TOsoNDQ21Zq9vC",
+        "plus": "prod_TOsoOFRvZm79rN",
+        "pro": "prod_TOsodGpULxoyJp",
+        "premium": "prod_TOsoIVsTUzSJSl",
+    },
+}
+
+# Variável com a chave de cada modo
+KEY_NAMES = {"test": ("STRIPE_TEST_API_KEY",), "live": ("STRIPE_API_KEY",)}
+
+
+class Change(NamedTuple):
+    """Um pedido de escrita calculado pelo modo sync."""
+
+    action: str  # create | update | archive
+    kind: str  # product | price
+    pack_id: str
+    object_id: Optional[str]
+    data: Dict[str, str]
+
+
+def load_catalog(name: str) -> List[Pack]:
+    """Catálogo pelo nome ("test", "live") ou a partir de um ficheiro JSON com a lista de pacotes."""
+    if name in CATALOGS:
+        return CATALOGS[name]
+    with open(name, "r", encoding="utf-8") as f:
+        return [Pack(**item) for item in json.load(f)]
+
+
+def _product_fields(pack: Pack) -> Dict[str, str]:
+    return {"name": pack.name, "description": pack.description, **pack.metadata()}
+
+
+def _field(obj: Dict[str, Any], key: str) -> Any:
+    if key.startswith("metadata["):
+        return (obj.get("metadata") or {}).get(key[len("metadata["):-1])
+    return obj.get(key)
+
+
+def _changed(obj: Dict[str, Any], fields: Dict[str, str]) -> Dict[str, str]:
+    return {key: value for key, value in fields.items() if _field(obj, key) != value}
+
+
+def write_env(path: str, state: Dict[str, Dict[str, Any]]) -> None:
+    """Grava as variáveis NEXT_PUBLIC_STRIPE_PRICE_* / STRIPE_PRODUCT_* de cada pacote."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# ═══════════════════════════════════════════════════════════════════════════\n")
+        f.write("# STRIPE PRODUCTS - DUA PREMIUM CREDIT PACKS\n")
+        f.write("# ═══════════════════════════════════════════════════════════════════════════\n\n")
+        for pack_id, data in sorted(state.items()):
+            f.write(f"# {pack_id.upper()} - €{data['price_eur']:.2f} / {data['credits']} créditos\n")
+            f.write(f"NEXT_PUBLIC_STRIPE_PRICE_{pack_id.upper()}={data['price_id']}\n")
+            f.write(f"STRIPE_PRODUCT_{pack_id.upper()}={data['product_id']}\n\n")
+
+
+class StripeError(Exception):
+    """Erro devolvido pela API do Stripe (depois dos retries)."""
+
+    def __init__(self, status: int, message: str, code: Optional[str] = None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.code = code
+
+
+def load_api_key(env_file: str = ".env.local", names: Sequence[str] = ("STRIPE_API_KEY", "STRIPE_SECRET_KEY")) -> str:
+    """Chave secreta do Stripe, do ambiente ou do ficheiro .env.local."""
+    for name in names:
+        if os.environ.get(name):
+            return os.environ[name]
+    if os.path.exists(env_file):
+        with open(env_file, "r", encoding="utf-8") as f:
+            for line in f:
+                name, _, value = line.strip().partition("=")
+                if name in names and value:
+                    return value.strip().strip('"')
+    raise RuntimeError(f"Stripe API key not found: set {' or '.join(names)} or add it to {env_file}")
+
+
+KEY_PREFIXES = {"test": ("sk_test_", "rk_test_"), "live": ("sk_live_", "rk_live_")}
+
+
+def check_key_mode(api_key: str, mode: str) -> None:
+    """Recusa uma chave que não é do modo pedido ("test" ou "live")."""
+    if not api_key.startswith(KEY_PREFIXES[mode]):
+        raise ValueError(f"expected a {mode}-mode Stripe key ({KEY_PREFIXES[mode][0]}...), got {api_key[:8]}...")
+
+
+def idempotency_key(path: str, data: Dict[str, Any], salt: str = "") -> str:
+    """Chave determinística: o mesmo pedido (com o mesmo `salt`) tem sempre a mesma chave."""
+    body = urlencode(sorted(data.items()))
+    return "dua-" + hashlib.sha256(f"{salt}{path}?{body}".encode("utf-8")).hexdigest()[:40]
+
+
+class StripeCatalog:
+    """Cliente da API do Stripe para o catálogo de pacotes.
+
+    Args:
+      api_key: chave secreta (sk_test_... ou sk_live_...)
+      base_url: URL base da API
+      pool_size: ligações mantidas abertas e pacotes criados em paralelo
+      timeout: timeout por pedido em segundos, ou tupla (connect, read)
+      max_retries: número máximo de novas tentativas por pedido
+      backoff_factor: fator do backoff exponencial entre tentativas
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = STRIPE_API_BASE,
+        pool_size: int = 8,
+        timeout: Timeout = (5.0, 30.0),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        # Os POST podem ser repetidos porque levam sempre Idempotency-Key
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.auth = (api_key, "")
+        # Atualizações e arquivos usam chaves desta execução: um retry repete a
+        # chave, mas a mesma alteração feita de novo noutra execução não é ignorada
+        self.run_id = secrets.token_hex(8)
+
+    def __enter__(self) -> "StripeCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha todas as ligações do pool."""
+        self.session.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Any] = None,
+        idempotency_salt: str = "",
+    ) -> Dict[str, Any]:
+        headers = {}
+        if method == "POST":
+            headers["Idempotency-Key"] = idempotency_key(path, data or {}, idempotency_salt)
+        response = self.session.request(
+            method, f"{self.base_url}{path}", data=data, params=params, headers=headers, timeout=self.timeout
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code >= 400:
+            error = body.get("error") or {}
+            raise StripeError(response.status_code, error.get("message") or response.reason, error.get("code"))
+        return body
+
+    def list_all(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Todos os objetos de um endpoint de listagem, 100 por página."""
+        items: List[Dict[str, Any]] = []
+        params = {"limit": 100, **(params or {})}
+        while True:
+            page = self.request("GET", path, params=params)
+            items.extend(page.get("data") or [])
+            if not page.get("has_more") or not items:
+                return items
+            params["starting_after"] = items[-1]["id"]
+
+    def create_product(self, pack: Pack) -> Dict[str, Any]:
+        return self.request("POST", "/products", _product_fields(pack))
+
+    def create_price(self, pack: Pack, product_id: str) -> Dict[str, Any]:
+        return self.request("POST", "/prices", {"product": product_id, **self._price_fields(pack)})
+
+    @staticmethod
+    def _price_fields(pack: Pack) -> Dict[str, str]:
+        return {"unit_amount": str(pack.unit_amount), "currency": "eur", **pack.metadata()}
+
+    def create_pack(self, pack: Pack) -> Dict[str, Any]:
+        """Cria o produto e o preço de um pacote."""
+        product = self.create_product(pack)
+        price = self.create_price(pack, product["id"])
+        return {
+            "product_id": product["id"],
+            "price_id": price["id"],
+            "credits": pack.credits,
+            "price_eur": pack.price_eur,
+            "livemode": product.get("livemode", False),
+        }
+
+    def create_all(
+        self,
+        packs: List[Pack],
+        on_done: Optional[Callable[[Pack, Optional[Dict[str, Any]], Optional[Exception]], None]] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+        """Cria os pacotes em paralelo; devolve (criados, erros) indexados por pack_id."""
+        created: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, Exception] = {}
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            futures = {executor.submit(self.create_pack, pack): pack for pack in packs}
+            for future in as_completed(futures):
+                pack = futures[future]
+                try:
+                    created[pack.pack_id] = future.result()
+                except (StripeError, requests.RequestException) as error:
+                    errors[pack.pack_id] = error
+                if on_done is not None:
+                    on_done(pack, created.get(pack.pack_id), errors.get(pack.pack_id))
+        return created, errors
+
+    def plan(
+        self,
+        packs: List[Pack],
+        mode: Optional[str] = None,
+    ) -> Tuple[List[Change], Dict[str, Dict[str, Any]]]:
+        """Compara o catálogo com o Stripe; devolve (alterações, estado dos pacotes já existentes).
+
+        Com `mode` ("test"/"live"), falha se algum objeto listado for do outro
+        modo e adota os produtos de MANUAL_PRODUCTS[mode].
+        """
+        products = self.list_all("/products")
+        prices = self.list_all("/prices")
+        adopt: Dict[str, str] = {}
+        if mode is not None:
+            livemode = mode == "live"
+            for obj in products + prices:
+                if obj.get("livemode", livemode) != livemode:
+                    raise ValueError(f"{obj.get('id')} is not a {mode}-mode object; refusing to sync the {mode} catalog")
+            adopt = MANUAL_PRODUCTS.get(mode, {})
+
+        # Produtos geridos por pacote: ativos primeiro, depois os mais antigos
+        managed: Dict[str, List[Dict[str, Any]]] = {}
+        for product in sorted(products, key=lambda p: (not p.get("active"), p.get("created", 0))):
+            pack_id = _field(product, "metadata[pack_id]")
+            if not pack_id:
+                # Produto manual: adotado pelo id (o update acrescenta o metadata[pack_id])
+                pack_id = next((key for key, product_id in adopt.items() if product_id == product["id"]), None)
+            if pack_id:
+                managed.setdefault(pack_id, []).append(product)
+        prices_by_product: Dict[str, List[Dict[str, Any]]] = {}
+        for price in sorted(prices, key=lambda p: (not p.get("active"), p.get("created", 0))):
+            prices_by_product.setdefault(price.get("product"), []).append(price)
+
+        changes: List[Change] = []
+        state: Dict[str, Dict[str, Any]] = {}
+        for pack in packs:
+            candidates = managed.pop(pack.pack_id, [])
+            for duplicate in candidates[1:]:
+                if duplicate.get("active"):
+                    changes.append(Change("archive", "product", pack.pack_id, duplicate["id"], {"active": "false"}))
+            if not candidates:
+                changes.append(Change("create", "product", pack.pack_id, None, _product_fields(pack)))
+                changes.append(Change("create", "price", pack.pack_id, None, self._price_fields(pack)))
+                continue
+
+            product = candidates[0]
+            update = _changed(product, _product_fields(pack))
+            if not product.get("active"):
+                update["active"] = "true"
+            if update:
+                changes.append(Change("update", "product", pack.pack_id, product["id"], update))
+            state[pack.pack_id] = {"product_id": product["id"], "price_id": None}
+
+            product_prices = prices_by_product.get(product["id"], [])
+            match = next((
+                price for price in product_prices
+                if price.get("unit_amount") == pack.unit_amount and price.get("currency") == "eur"
+            ), None)
+            if match is None:
+                changes.append(Change("create", "price", pack.pack_id, None, {"product": product["id"], **self._price_fields(pack)}))
+            else:
+                state[pack.pack_id]["price_id"] = match["id"]
+                update = _changed(match, pack.metadata())
+                if not match.get("active"):
+                    update["active"] = "true"
+                if update:
+                    changes.append(Change("update", "price", pack.pack_id, match["id"], update))
+            for price in product_prices:
+                if price is not match and price.get("active"):
+                    changes.append(Change("archive", "price", pack.pack_id, price["id"], {"active": "false"}))
+
+        # Pacotes que saíram do catálogo
+        for pack_id, leftovers in managed.items():
+            for product in leftovers:
+                if product.get("active"):
+                    changes.append(Change("archive", "product", pack_id, product["id"], {"active": "false"}))
+        return changes, state
+
+    def apply(self, changes: List[Change], state: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Executa as alterações em paralelo: primeiro os produtos, depois os preços."""
+        state = {pack_id: dict(entry) for pack_id, entry in state.items()}
+
+        def run(change: Change) -> Dict[str, Any]:
+            path = f"/{change.kind}s"
+            if change.action == "create":
+                data = dict(change.data)
+                if change.kind == "price" and "product" not in data:
+                    data["product"] = state[change.pack_id]["product_id"]
+                return self.request("POST", path, data)
+            return self.request("POST", f"{path}/{change.object_id}", change.data, idempotency_salt=self.run_id)
+
+        for kind in ("product", "price"):
+            batch = [change for change in changes if change.kind == kind]
+            if not batch:
+                continue
+            with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                for change, result in zip(batch, executor.map(run, batch)):
+                    if change.action == "create":
+                        state.setdefault(change.pack_id, {})[f"{kind}_id"] = result["id"]
+        return state
+
+    def sync(
+        self,
+        packs: List[Pack],
+        dry_run: bool = False,
+        mode: Optional[str] = None,
+    ) -> Tuple[List[Change], Dict[str, Dict[str, Any]]]:
+        """Reconcilia o Stripe com o catálogo; devolve (alterações, estado final por pack_id).
+
+        `mode` ("test"/"live") obriga a chave e os objetos listados a serem desse modo.
+        """
+        if mode is not None:
+            check_key_mode(self.api_key, mode)
+        changes, state = self.plan(packs, mode)
+        if not dry_run:
+            state = self.apply(changes, state)
+        for pack in packs:
+            if pack.pack_id in state:
+                state[pack.pack_id].update(credits=pack.credits, price_eur=pack.price_eur)
+        return changes, state
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Catálogo de pacotes de créditos DUA no Stripe")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = commands.add_parser("sync", help="reconciliar o Stripe com o catálogo")
+    sync_parser.add_argument("--catalog", default="test", help="test, live ou um ficheiro JSON com a lista de pacotes")
+    sync_parser.add_argument("--mode", choices=sorted(KEY_NAMES), help="modo da chave (por omissão, o do catálogo test/live)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="mostrar as alterações sem as aplicar")
+    sync_parser.add_argument("--env-file", default="stripe-products.env")
+    sync_parser.add_argument("--base-url", default=STRIPE_API_BASE)
+    args = parser.parse_args(argv)
+
+    mode = args.mode or (args.catalog if args.catalog in CATALOGS else None)
+    if mode is None:
+        parser.error("--mode test|live é obrigatório com um catálogo em ficheiro")
+    if args.catalog in CATALOGS and mode != args.catalog:
+        parser.error(f"o catálogo {args.catalog} não pode ser sincronizado em modo {mode}")
+
+    packs = load_catalog(args.catalog)
+    api_key = load_api_key(names=KEY_NAMES[mode])
+    try:
+        with StripeCatalog(api_key, base_url=args.base_url) as catalog:
+            changes, state = catalog.sync(packs, dry_run=args.dry_run, mode=mode)
+    except ValueError as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    for change in changes:
+        target = change.object_id or "(novo)"
+        print(f"  {change.action:8} {change.kind:8} {change.pack_id:10} {target}")
+    if not changes:
+        print("✓ Stripe já está sincronizado com o catálogo")
+    if args.dry_run:
+        print(f"\n{len(changes)} alteração(ões) por aplicar (--dry-run)")
+        return 0
+    write_env(args.env_file, state)
+    print(f"\n✓ {len(changes)} alteração(ões) aplicadas; {args.env_file} atualizado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())